@@ -2,6 +2,7 @@ from openai import OpenAI
 from config import OPENAI_API_KEY
 from utils import prompt_templates, token_manager
 from tools import prediction_tools
+from tools.leagues import DEFAULT_LEAGUE, league_in_text
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
@@ -28,6 +29,34 @@ def _generate_response(messages: list , stream: bool = True) -> str:
         print(f"응답 생성 중 오류 발생: {e}")
         return "경기 예측 중 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
 
+def _format_prob(value) -> str:
+    return f"{value:.1%}" if value is not None else "N/A"
+
+def _format_goals(value) -> str:
+    return f"{value:.2f}" if value is not None else "N/A"
+
+def _format_h2h(h2h: dict) -> str:
+    """상대 전적을 프롬프트용 문자열로 (기록이 없으면 그 사실을 명시)"""
+    if not h2h:
+        return "            - 최근 맞대결 기록 없음 (상대 전적을 추측하지 마세요)"
+
+    def record(r):
+        return (f"{r['matches']}경기 {r['wins']}승 {r['draws']}무 {r['losses']}패, "
+                f"득실 {r['goals_for']}-{r['goals_against']}, xG {r['xg_for']:.1f}-{r['xg_against']:.1f}")
+
+    lines = [
+        f"            - {h2h['team']} 기준 통산: {record(h2h['overall'])}",
+        f"            - {h2h['team']} 홈 경기: {record(h2h['at_home'])}",
+        f"            - {h2h['team']} 원정 경기: {record(h2h['away'])}",
+        "            - 최근 맞대결:"
+    ]
+    lines += [
+        f"              {m['date']} {m['home_team']} {m['home_goals']}-{m['away_goals']} {m['away_team']} "
+        f"(xG {m['home_xg']:.2f}-{m['away_xg']:.2f})"
+        for m in h2h['recent']
+    ]
+    return "\n".join(lines)
+
 def predict_match(user_query: str, chat_history: list) -> str:
     """
     사용자의 경기 예측 관련 질문을 처리하고 답변을 반환하는 메인 함수
@@ -59,11 +88,19 @@ def predict_match(user_query: str, chat_history: list) -> str:
             - 원정팀 승리 확률: {prediction_result['AwayWin_Prob']:.1%}
             - 홈팀 승리 확률: {(1 - prediction_result['AwayWin_Prob']):.1%}
 
+            스코어 모델 (xG 기반 Poisson/Dixon-Coles):
+            - 홈 승 / 무승부 / 원정 승: {_format_prob(prediction_result.get('Home_Prob'))} / {_format_prob(prediction_result.get('Draw_Prob'))} / {_format_prob(prediction_result.get('Away_Prob'))}
+            - 기대 득점: {_format_goals(prediction_result.get('Exp_HomeGoals'))} - {_format_goals(prediction_result.get('Exp_AwayGoals'))}
+            - 가장 가능성 높은 스코어: {prediction_result.get('Likely_Score', 'N/A')}
+
             추가 정보:
             - 홈팀 Elo: {prediction_result.get('HomeElo', 'N/A')}
             - 원정팀 Elo: {prediction_result.get('AwayElo', 'N/A')}
             - Elo 차이: {prediction_result.get('elo_diff', 'N/A')}
 
+            상대 전적 (Understat 기록):
+{_format_h2h(prediction_result.get('H2H'))}
+
             위 데이터를 바탕으로 전문적이고 흥미로운 경기 예측 분석을 제공해주세요.
             예측 근거, 주의할 점, 경기 관전 포인트 등을 포함해주세요.
         """
@@ -80,4 +117,53 @@ def predict_match(user_query: str, chat_history: list) -> str:
         
     except Exception as e:
         print(f"경기 예측 중 오류 발생: {e}")
-        return "경기 예측 중 문제가 발생했습니다. 입력 형식을 확인하고 다시 시도해주세요."
\ No newline at end of file
+        return "경기 예측 중 문제가 발생했습니다. 입력 형식을 확인하고 다시 시도해주세요."
+
+def predict_season(user_query: str, chat_history: list) -> str:
+    """
+    우승 경쟁, 4위 싸움, 강등 등 시즌 최종 순위 관련 질문을 처리하는 함수
+    """
+    print(f"시즌 순위 예측 요청: '{user_query}'")
+
+    try:
+        # 1. 질문에 언급된 리그(없으면 프리미어리그)의 남은 경기 몬테카를로 시뮬레이션
+        league = league_in_text(user_query) or DEFAULT_LEAGUE
+        simulation = prediction_tools.simulate_season(league=league)
+
+        if simulation is None:
+            return "시즌 시뮬레이션을 수행할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+        table_lines = "\n".join(
+            f"            - {team}: 기대 승점 {row['exp_points']:.1f}, 우승 {row['title']:.1%}, "
+            f"4위 이내 {row['top4']:.1%}, 강등 {row['relegation']:.1%}"
+            for team, row in simulation.iterrows()
+        )
+
+        # 2. chat_history를 기반으로 메시지 구성
+        messages = chat_history.copy() if chat_history else []
+
+        # 시스템 메시지가 없으면 추가
+        if not messages or messages[0].get("role") != "system":
+            messages.insert(0, {"role": "system", "content": prompt_templates.PREDICTION_SYSTEM_PROMPT})
+
+        detailed_query = f"""
+            사용자 질문: {user_query}
+
+            시즌 시뮬레이션 결과 (남은 경기를 모델 예측 확률로 시뮬레이션):
+{table_lines}
+
+            위 데이터를 바탕으로 사용자 질문에 맞춰 우승 경쟁, 챔피언스리그 진출권(4위), 강등 싸움을 분석해주세요.
+            확률의 의미와 불확실성도 함께 설명해주세요.
+        """
+
+        messages.append({"role": "user", "content": detailed_query})
+
+        # 토큰 관리로 대화 기록 조정
+        messages = token_manager.manage_history_tokens(messages, max_tokens=4000)
+
+        # 3. AI 해설 생성
+        return _generate_response(messages, stream=True)
+
+    except Exception as e:
+        print(f"시즌 순위 예측 중 오류 발생: {e}")
+        return "시즌 순위 예측 중 문제가 발생했습니다. 잠시 후 다시 시도해주세요."
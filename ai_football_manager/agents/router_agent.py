@@ -32,6 +32,14 @@ def predict_match_tool(query: str, chat_history: list):
     print("-> 승부 예측 에이전트 호출 (Function Call)")
     return prediction_agent.predict_match(query, chat_history)
 
+def predict_season_tool(query: str, chat_history: list):
+    """
+    리그 최종 순위를 시뮬레이션으로 예측합니다.
+    사용자가 우승 경쟁, 4위(챔피언스리그 진출), 강등 확률 등 시즌 전체 전망을 요청할 때 이 도구를 사용.
+    """
+    print("-> 시즌 순위 예측 에이전트 호출 (Function Call)")
+    return prediction_agent.predict_season(query, chat_history)
+
 def handle_general_query_tool(query: str, chat_history: list):
     """
     다른 범주에 속하지 않는 일반적인 축구 관련 질문을 처리합니다.
@@ -145,6 +153,32 @@ tools = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "predict_season_tool",
+            "description": "리그 최종 순위를 시뮬레이션으로 예측합니다. 사용자가 우승 경쟁, 4위(챔피언스리그 진출), 강등 확률 등 시즌 전체 전망을 요청할 때 이 도구를 사용하십시오.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "사용자의 원래 질문."},
+                    "chat_history": {
+                        "type": "array",
+                        "description": "현재 채팅 기록.",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "role": {"type": "string", "enum": ["user", "assistant"]},
+                                "content": {"type": "string"}
+                            },
+                            "required": ["role", "content"]
+                        }
+                    },
+                },
+                "required": ["query", "chat_history"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
@@ -178,6 +212,7 @@ available_functions = {
     "get_team_player_info_tool": get_team_player_info_tool,
     "analyze_news_tool": analyze_news_tool,
     "predict_match_tool": predict_match_tool,
+    "predict_season_tool": predict_season_tool,
     "handle_general_query_tool": handle_general_query_tool,
 }
 
@@ -1,4 +1,5 @@
 from tools import sports_data_api, data_parser
+from tools.leagues import league_in_text
 from utils import prompt_templates, token_manager
 from config import OPENAI_API_KEY
 from openai import OpenAI
@@ -89,15 +90,16 @@ def get_team_player_info(user_query: str, chat_history: list) -> str:
     if entity_type == "unknown" or not name:
         return "죄송합니다. 질문에서 어떤 선수나 팀 정보를 찾으시는지 명확하게 파악하기 어렵습니다. 이전 대화 내용을 참고하여 다시 질문해주시거나, 구체적인 선수명이나 팀명을 알려주세요."
     
-    # 2. API 데이터 조회
+    # 2. API 데이터 조회 (질문에 리그가 언급되면 해당 리그, 없으면 선수는 프리미어리그 / 팀은 소속 국가 리그)
+    league = league_in_text(user_query)
     raw_api_data = {}
     if entity_type == "player":
         print(f"선수 통계 조회: {name}, 팀: {team_name}, 시즌: {season}")
-        raw_api_data = sports_data_api.get_player_stats(name, season, team_name)
+        raw_api_data = sports_data_api.get_player_stats(name, season, team_name, league)
     
     elif entity_type == "team":
         print(f"팀 통계 조회: {name}, 시즌: {season}")
-        raw_api_data = sports_data_api.get_team_stats(name, season)
+        raw_api_data = sports_data_api.get_team_stats(name, season, league)
 
     if not raw_api_data:
         # API에서 데이터를 가져오지 못한 경우
@@ -11,6 +11,7 @@ logging.getLogger().setLevel(logging.ERROR)
 
 import streamlit as st
 from agents import router_agent
+from tools import prediction_tools, sports_data_api
 import openai
 
 # soccerdata 관련 로깅 완전 차단
@@ -24,11 +25,19 @@ for name in logging.root.manager.loggerDict:
         logging.getLogger(name).setLevel(logging.ERROR)
         logging.getLogger(name).disabled = True
 
+@st.cache_resource
+def warm_up_data():
+    # 프로세스당 한 번만 실행: 예측용 데이터를 미리 준비하고 백그라운드 갱신 시작
+    prediction_tools.warm_up()
+    sports_data_api.warm_up()
+    return True
+
 def init_session_state():
     st.session_state.setdefault('openai_model', 'gpt-4.1')
     st.session_state.setdefault('messages', [])
 
 def main():
+    warm_up_data()
     init_session_state()
     st.header('AI Football Manager')
     st.image('./ai_football_manager/images/soccer.jpg')
@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import api_scheduler
+from api_scheduler import ApiScheduler, TokenBucket, RateLimitTimeout, INTERACTIVE, BACKGROUND
+
+'''
+API 스케줄러 확인: 토큰 버킷 충전 속도, 사용자 질문용 일일 한도 예약, 프로세스 간 일일 한도 공유, 같은 요청 합치기(single-flight)
+'''
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    now = bucket.updated
+    assert [bucket.try_take(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_take(now) == pytest.approx(0.5)          # 초당 2개 -> 다음 토큰까지 0.5초
+    assert bucket.try_take(now + 0.25) == pytest.approx(0.25)
+    assert bucket.try_take(now + 0.5) == 0.0
+    assert bucket.try_take(now + 0.5) == pytest.approx(0.5)
+
+    # 오래 쉬어도 capacity를 넘지 않음
+    later = now + 100
+    assert [bucket.try_take(later) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_take(later) > 0
+
+    # 429 이후: delay초 동안은 토큰이 생기지 않음
+    bucket.drain(later, delay=4.0)
+    assert bucket.try_take(later) == pytest.approx(4.5)
+    assert bucket.try_take(later + 4.5) == 0.0
+
+
+def test_interactive_reserve_holds_back_background_calls():
+    scheduler = ApiScheduler(rate_per_minute=6000, daily_quota=10, interactive_reserve=0.2)
+    assert scheduler.background_quota == 8
+    for _ in range(8):
+        scheduler.acquire(BACKGROUND, max_wait=1.0)
+
+    # 남은 2회는 사용자 질문 몫: 백그라운드는 자정까지 기다려야 하므로 바로 실패
+    with pytest.raises(RateLimitTimeout):
+        scheduler.acquire(BACKGROUND, max_wait=1.0)
+    scheduler.acquire(INTERACTIVE, max_wait=1.0)
+    scheduler.acquire(INTERACTIVE, max_wait=1.0)
+    with pytest.raises(RateLimitTimeout):
+        scheduler.acquire(INTERACTIVE, max_wait=1.0)
+
+    m = scheduler.metrics()
+    assert m["used_today"] == 10 and m["timeouts"] == 2
+    assert m["by_lane"] == {"interactive": 2, "background": 8}
+
+
+def test_daily_quota_is_shared_between_processes(tmp_path):
+    # 같은 SQLite 카운터를 쓰는 두 스케줄러 = 같은 API 키를 쓰는 두 워커 프로세스
+    path = str(tmp_path / "quota.sqlite")
+    first = ApiScheduler(rate_per_minute=6000, daily_quota=10, interactive_reserve=0.2, quota_path=path)
+    second = ApiScheduler(rate_per_minute=6000, daily_quota=10, interactive_reserve=0.2, quota_path=path)
+    for _ in range(4):
+        first.acquire(BACKGROUND, max_wait=1.0)
+        second.acquire(BACKGROUND, max_wait=1.0)
+    assert first.metrics()["used_today"] == second.metrics()["used_today"] == 8
+
+    with pytest.raises(RateLimitTimeout):
+        first.acquire(BACKGROUND, max_wait=1.0)
+    with pytest.raises(RateLimitTimeout):
+        second.acquire(BACKGROUND, max_wait=1.0)
+    first.acquire(INTERACTIVE, max_wait=1.0)
+    second.acquire(INTERACTIVE, max_wait=1.0)
+    with pytest.raises(RateLimitTimeout):
+        first.acquire(INTERACTIVE, max_wait=1.0)
+    assert second.metrics()["used_today"] == 10
+
+
+def test_interactive_lane_goes_first():
+    scheduler = ApiScheduler(rate_per_minute=600, daily_quota=100)   # 0.1초마다 토큰 하나
+    scheduler.bucket.tokens = 0
+    order = []
+    started = threading.Barrier(7)
+
+    def worker(priority):
+        started.wait()
+        scheduler.call(("order", priority, threading.get_ident()), lambda: order.append(priority), priority)
+
+    threads = [threading.Thread(target=worker, args=(BACKGROUND,)) for _ in range(3)]
+    threads += [threading.Thread(target=worker, args=(INTERACTIVE,)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    started.wait()
+    for t in threads:
+        t.join()
+    # 처음 토큰이 생기기 전에 모두 줄을 서므로 사용자 질문이 먼저 토큰을 받음
+    assert order == [INTERACTIVE] * 3 + [BACKGROUND] * 3
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    scheduler = ApiScheduler(rate_per_minute=6000, daily_quota=100)
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"fixtures": [1, 2, 3]}
+
+    def worker():
+        results.append(scheduler.call(("fixtures", 39), fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    # 첫 요청이 진행 중인 동안 나머지가 합류할 때까지 대기
+    for _ in range(500):
+        if scheduler.metrics()["coalesced"] == 7:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"fixtures": [1, 2, 3]}] * 8
+    m = scheduler.metrics()
+    assert m["calls"] == 1 and m["coalesced"] == 7 and m["used_today"] == 1
+
+
+def test_coalesced_interactive_call_promotes_background_request():
+    scheduler = ApiScheduler(rate_per_minute=6000, daily_quota=100)
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return "ok"
+
+    def background():
+        with api_scheduler.lane(BACKGROUND):
+            scheduler.call("calendar", fetch)
+
+    t = threading.Thread(target=background)
+    t.start()
+    while scheduler.metrics()["calls"] == 0:
+        threading.Event().wait(0.01)
+    joiner = threading.Thread(target=lambda: scheduler.call("calendar", fetch, INTERACTIVE))
+    joiner.start()
+    while scheduler.metrics()["coalesced"] == 0:
+        threading.Event().wait(0.01)
+    release.set()
+    t.join()
+    joiner.join()
+    assert scheduler.metrics()["promoted"] == 1
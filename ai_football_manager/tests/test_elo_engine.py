@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from elo_engine import EloEngine
+
+'''
+로컬 Elo 엔진 확인: 날짜별 배치 갱신이 레이팅 총합을 보존하는지, 경기별 순차 계산과 같은지
+'''
+
+
+def _random_matches(seed, n_matches=300, n_teams=12):
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    rows = []
+    for game_id in range(n_matches):
+        home, away = rng.choice(teams, size=2, replace=False)
+        rows.append({
+            'game_id': game_id,
+            # 날짜 범위를 좁게 잡아 같은 날 여러 경기(같은 팀이 두 번 나오는 경우 포함)가 생기도록 함
+            'date': pd.Timestamp("2023-08-01") + pd.Timedelta(days=int(rng.integers(0, n_matches // 4))),
+            'home_team': home, 'away_team': away,
+            'home_goals': int(rng.poisson(1.5)), 'away_goals': int(rng.poisson(1.1))
+        })
+    return pd.DataFrame(rows)
+
+
+def _sequential(matches, k_factor=20.0, home_advantage=65.0, initial_rating=1500.0):
+    """경기를 (날짜, game_id) 순서로 하나씩 반영하는 기준 구현"""
+    ratings = {}
+    for row in matches.sort_values(['date', 'game_id']).itertuples():
+        rh = ratings.get(row.home_team, initial_rating)
+        ra = ratings.get(row.away_team, initial_rating)
+        expected = 1.0 / (1.0 + 10.0 ** ((ra - rh - home_advantage) / 400.0))
+        score = 1.0 if row.home_goals > row.away_goals else 0.5 if row.home_goals == row.away_goals else 0.0
+        delta = k_factor * (score - expected)
+        ratings[row.home_team] = rh + delta
+        ratings[row.away_team] = ra - delta
+    return ratings
+
+
+def test_batched_update_conserves_total_rating():
+    for seed in range(5):
+        engine = EloEngine()
+        engine.update(_random_matches(seed))
+        assert np.isclose(engine.ratings.sum(), len(engine.teams) * engine.initial_rating)
+
+
+def test_batched_update_matches_sequential_reference():
+    matches = _random_matches(0)
+    engine = EloEngine()
+    assert engine.update(matches) == len(matches)
+    expected = _sequential(matches)
+    for team, rating in expected.items():
+        assert np.isclose(engine.rating(team), rating)
+
+
+def test_late_match_triggers_full_recompute():
+    matches = _random_matches(1)
+    late = matches[matches['date'] == matches['date'].min()]
+    engine = EloEngine()
+    engine.update(matches.drop(late.index))
+    # 이미 반영한 날짜보다 이른 경기가 들어오면 전체 기록으로 처음부터 다시 계산
+    assert engine.update(matches) == len(matches)
+    full = EloEngine()
+    full.update(matches)
+    np.testing.assert_allclose(engine.current_ratings().sort_index(), full.current_ratings().sort_index())
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pandas as pd
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from elo_index import EloHistoryIndex
+
+'''
+Elo 이력 인덱스 확인: 구간 조회, ClubElo에 없는 팀과 일시적인 오류의 구분
+'''
+
+
+class FakeClubElo:
+    def __init__(self):
+        self.calls = []
+        self.down = False
+
+    def read_team_history(self, team):
+        self.calls.append(team)
+        if team == "Unknown FC":
+            raise ValueError(f"No data found for team {team}")
+        if self.down:
+            raise requests.ConnectionError("connection refused")
+        return pd.DataFrame({
+            "from": pd.to_datetime(["2020-01-01", "2020-02-01"]),
+            "to": pd.to_datetime(["2020-01-31", "2020-12-31"]),
+            "elo": [1500.0, 1600.0]
+        })
+
+
+def test_lookup_finds_interval_containing_date():
+    index = EloHistoryIndex(FakeClubElo())
+    assert index.lookup("Arsenal", "2020-01-15") == 1500.0
+    assert index.lookup("Arsenal", "2020-03-01") == 1600.0
+    assert index.lookup("Arsenal", "2019-12-31") is None
+    out = index.lookup_many(["Arsenal", "Arsenal", "Unknown FC"], ["2020-01-31", "2021-01-01", "2020-01-15"])
+    assert out[0] == 1500.0 and pd.isna(out[1]) and pd.isna(out[2])
+
+
+def test_unknown_team_is_recorded_and_not_refetched():
+    clubelo = FakeClubElo()
+    index = EloHistoryIndex(clubelo)
+    assert index.lookup("Unknown FC", "2020-01-15") is None
+    assert index.lookup("Unknown FC", "2020-01-15") is None
+    assert "Unknown FC" in index
+    assert clubelo.calls == ["Unknown FC"]
+
+
+def test_network_error_keeps_old_history_and_retries_later():
+    clubelo = FakeClubElo()
+    index = EloHistoryIndex(clubelo, ttl=0)
+    assert index.lookup("Arsenal", "2020-03-01") == 1600.0
+
+    clubelo.down = True
+    assert index.lookup("Arsenal", "2020-03-01") == 1600.0   # 실패해도 기존 이력 유지
+    calls = len(clubelo.calls)
+    index.lookup("Arsenal", "2020-03-01")
+    assert len(clubelo.calls) == calls                       # RETRY_SECONDS 동안은 다시 조회하지 않음
+
+    # 재시도 시각이 지나면 다시 조회
+    clubelo.down = False
+    index._retry_after.clear()
+    assert index.lookup("Arsenal", "2020-03-01") == 1600.0
+    assert len(clubelo.calls) == calls + 1
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import feature_engine
+
+'''
+증분 갱신(update_rolling_features)이 전체 재계산(add_rolling_features)과 같은지 확인하는 무작위 테스트
+- 경기 기록을 무작위 지점에서 나눠 여러 번에 걸쳐 반영
+- 같은 날 경기, 늦게 들어온(이미 반영된 경기보다 이른) 경기, xG 결측 포함
+'''
+
+ROLLING_COLUMNS = list(feature_engine.ROLLING_FEATURES) + ['current_xg']
+
+
+def _random_matches(rng, n_matches=240, n_teams=10):
+    teams = [f"Team {i}" for i in range(n_teams)]
+    rows = []
+    for game_id in range(n_matches):
+        home, away = rng.choice(teams, size=2, replace=False)
+        home_goals, away_goals = rng.poisson(1.4), rng.poisson(1.1)
+        home_xg, away_xg = rng.gamma(2.0, 0.7), rng.gamma(2.0, 0.6)
+        if rng.random() < 0.05:
+            home_xg = np.nan
+        rows.append({
+            'game_id': 1000 + game_id,
+            # 날짜 범위를 좁게 잡아 같은 날 여러 경기가 생기도록 함
+            'date': pd.Timestamp("2023-08-01") + pd.Timedelta(days=int(rng.integers(0, n_matches // 3))),
+            'home_team': home, 'away_team': away,
+            'home_goals': home_goals, 'away_goals': away_goals,
+            'home_xg': home_xg, 'away_xg': away_xg,
+            'home_points': 3 if home_goals > away_goals else int(home_goals == away_goals),
+            'away_points': 3 if away_goals > home_goals else int(home_goals == away_goals),
+        })
+    return pd.DataFrame(rows)
+
+
+def _batches(rng, m, shuffle):
+    """경기 기록을 무작위 지점에서 나눈 배치 목록 (shuffle=True면 날짜 순서와 무관하게 섞어서 나눔)"""
+    m = m.sample(frac=1, random_state=int(rng.integers(1 << 31))) if shuffle else m.sort_values('date', kind='mergesort')
+    cuts = np.sort(rng.choice(np.arange(1, len(m)), size=int(rng.integers(1, 8)), replace=False))
+    bounds = [0, *cuts, len(m)]
+    return [m.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def _full_rebuild(m):
+    return feature_engine.add_rolling_features(feature_engine.to_long_format(m))
+
+
+def _assert_same_rolling(actual, expected):
+    key = ['team', 'game_id']
+    actual = actual.sort_values(key, ignore_index=True)
+    expected = expected.sort_values(key, ignore_index=True)
+    assert len(actual) == len(expected)
+    assert (actual[key].to_numpy() == expected[key].to_numpy()).all()
+    np.testing.assert_allclose(
+        actual[ROLLING_COLUMNS].to_numpy(dtype=np.float64),
+        expected[ROLLING_COLUMNS].to_numpy(dtype=np.float64),
+        rtol=1e-12, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_update_matches_full_rebuild(seed, shuffle):
+    rng = np.random.default_rng(seed)
+    m = _random_matches(rng)
+    batches = _batches(rng, m, shuffle)
+
+    long_roll = _full_rebuild(batches[0])
+    wide = feature_engine.to_wide_format(long_roll)
+    for batch in batches[1:]:
+        long_roll, touched = feature_engine.update_rolling_features(long_roll, feature_engine.to_long_format(batch))
+
+        # DataCollector.append_matches와 같은 방식으로 바뀐 경기만 경기 단위 프레임에서 교체
+        changed = feature_engine.to_wide_format(long_roll[long_roll['game_id'].isin(touched)])
+        # 빈 프레임을 합치면 pandas가 dtype 결정 방식 변경을 경고하므로 제외
+        parts = [f for f in (wide[~wide['game_id'].isin(touched)], changed) if not f.empty]
+        wide = pd.concat(parts, ignore_index=True)
+
+    expected = _full_rebuild(m)
+    _assert_same_rolling(long_roll, expected)
+
+    expected_wide = feature_engine.to_wide_format(expected)
+    wide = feature_engine.compact_features(wide.sort_values(['MatchDate', 'game_id'], kind='mergesort', ignore_index=True))
+    pd.testing.assert_frame_equal(wide, expected_wide)
+
+
+def test_touched_games_cover_every_changed_row():
+    rng = np.random.default_rng(42)
+    m = _random_matches(rng)
+    old, late = m[m['game_id'] % 7 != 0], m[m['game_id'] % 7 == 0]
+
+    before = _full_rebuild(old)
+    updated, touched = feature_engine.update_rolling_features(before, feature_engine.to_long_format(late))
+
+    merged = updated.merge(before, on=['team', 'game_id'], how='left', suffixes=('', '_old'))
+    old_values = merged[[f"{c}_old" for c in ROLLING_COLUMNS]].to_numpy(dtype=np.float64)
+    new_values = merged[ROLLING_COLUMNS].to_numpy(dtype=np.float64)
+    same = ((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values))).all(axis=1)
+    assert set(merged.loc[~same, 'game_id']) <= set(touched)
@@ -0,0 +1,64 @@
+import gc
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import feature_store
+
+'''
+피처 스냅샷 정리 확인: 새 스냅샷을 저장하면 현재/직전 스냅샷과 memory-map으로 열려 있는 스냅샷만 남는지
+'''
+
+TABLES = {"features": pd.DataFrame({"xg": np.arange(5.0), "team": list("abcde")})}
+
+
+def _snapshots(store_dir):
+    return sorted(e for e in os.listdir(store_dir) if e.startswith("v1-"))
+
+
+def _save(store_dir, fp):
+    feature_store.save_features(TABLES, 1, fp * 16, store_dir=str(store_dir))
+    return f"v1-{fp * 16}"
+
+
+def test_keeps_current_and_previous_snapshot(tmp_path):
+    names = [_save(tmp_path, fp) for fp in "abcd"]
+    assert _snapshots(tmp_path) == names[-2:]
+    with open(tmp_path / feature_store.LATEST_FILE, encoding="utf-8") as f:
+        assert json.load(f) == {"snapshot": names[-1], "previous": names[-2]}
+
+
+def test_skips_snapshot_open_as_memmap(tmp_path):
+    oldest = _save(tmp_path, "a")
+    _save(tmp_path, "b")
+    tables, _ = feature_store.load_features(1, "a" * 16, store_dir=str(tmp_path))
+    assert tables is not None
+
+    _save(tmp_path, "c")
+    assert oldest in _snapshots(tmp_path)
+
+    # memmap이 모두 해제되면 다음 저장 때 정리됨
+    del tables
+    gc.collect()
+    _save(tmp_path, "d")
+    assert _snapshots(tmp_path) == ["v1-" + "c" * 16, "v1-" + "d" * 16]
+
+
+def test_skips_snapshots_leased_by_live_process_only(tmp_path):
+    for fp in "abc":
+        _save(tmp_path, fp)
+    readers = tmp_path / feature_store.READERS_DIR
+    readers.mkdir(exist_ok=True)
+    # 부모 프로세스(살아 있음)와 존재하지 않는 프로세스의 사용 기록
+    (readers / f"{os.getppid()}.json").write_text(json.dumps(["v1-" + "b" * 16]))
+    (readers / "999999999.json").write_text(json.dumps(["v1-" + "c" * 16]))
+
+    _save(tmp_path, "d")
+    _save(tmp_path, "e")
+    assert _snapshots(tmp_path) == ["v1-" + fp * 16 for fp in "bde"]
+    assert not (readers / "999999999.json").exists()
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from fixture_calendar import FixtureCalendar
+from leagues import current_season
+
+'''
+경기 일정 캘린더 확인: 지난 시즌이나 모든 경기가 끝난 캘린더는 백그라운드 갱신 대상에서 빠지는지
+'''
+
+
+def _fixture(fixture_id, status, timestamp):
+    return {
+        "fixture_id": fixture_id, "match_date": "2025-05-25", "kickoff": None, "timestamp": timestamp,
+        "status": status, "round": "Regular Season - 38", "home_team": "Arsenal", "away_team": "Chelsea",
+        "home_id": 42, "away_id": 49
+    }
+
+
+def test_past_season_is_final_even_with_unplayed_fixtures():
+    calendar = FixtureCalendar([_fixture(1, "PST", 100)], league=39, season=current_season() - 1)
+    assert calendar.is_final()
+
+
+def test_current_season_is_final_only_when_every_fixture_finished():
+    season = current_season()
+    assert not FixtureCalendar(league=39, season=season).is_final()
+    assert not FixtureCalendar([_fixture(1, "FT", 100), _fixture(2, "NS", 200)], 39, season).is_final()
+    assert not FixtureCalendar([_fixture(1, "FT", 100), _fixture(2, "PST", 200)], 39, season).is_final()
+    assert FixtureCalendar([_fixture(1, "FT", 100), _fixture(2, "PEN", 200), _fixture(3, "CANC", 300)],
+                           39, season).is_final()
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from h2h_index import HeadToHeadIndex
+
+'''
+상대 전적 인덱스 확인: team_a 관점 변환, 조회 시점(as-of), 중복 경기 무시, 최근 맞대결 순서
+'''
+
+
+def _match(game_id, date, home, away, home_goals, away_goals, home_xg=1.0, away_xg=1.0):
+    return {
+        'game_id': game_id, 'date': pd.Timestamp(date), 'home_team': home, 'away_team': away,
+        'home_goals': home_goals, 'away_goals': away_goals, 'home_xg': home_xg, 'away_xg': away_xg
+    }
+
+
+# "Wolves"가 "Arsenal"보다 이름 순서가 뒤 -> 내부 키는 (Arsenal, Wolves)
+MATCHES = pd.DataFrame([
+    _match(1, "2023-01-10", "Wolves", "Arsenal", 2, 0, 1.8, 0.4),
+    _match(2, "2023-05-20", "Arsenal", "Wolves", 1, 1, 1.2, 0.9),
+    _match(3, "2023-09-02", "Arsenal", "Wolves", 3, 1, 2.5, 0.7),
+    _match(4, "2024-02-17", "Wolves", "Arsenal", 0, 2, 0.6, 1.9),
+    _match(5, "2023-03-01", "Arsenal", "Chelsea", 1, 0),
+])
+
+
+def test_orientation_when_team_a_sorts_after_team_b():
+    index = HeadToHeadIndex(MATCHES)
+    wolves = index.lookup("Wolves", "Arsenal")
+    arsenal = index.lookup("Arsenal", "Wolves")
+
+    assert wolves['team'] == "Wolves" and wolves['opponent'] == "Arsenal"
+    assert (wolves['overall']['wins'], wolves['overall']['draws'], wolves['overall']['losses']) == (1, 1, 2)
+    assert (arsenal['overall']['wins'], arsenal['overall']['losses']) == (2, 1)
+    assert wolves['overall']['goals_for'] == arsenal['overall']['goals_against'] == 4
+    assert np.isclose(wolves['overall']['xg_for'], 1.8 + 0.9 + 0.7 + 0.6)
+
+    # Wolves 홈 경기는 game_id 1, 4
+    assert wolves['at_home']['matches'] == 2
+    assert (wolves['at_home']['wins'], wolves['at_home']['losses']) == (1, 1)
+    # 같은 경기를 Arsenal 원정 관점에서 보면 득실과 xG가 뒤바뀜
+    home, away = wolves['at_home'], arsenal['away']
+    assert (away['wins'], away['losses']) == (home['losses'], home['wins'])
+    assert (away['goals_for'], away['goals_against']) == (home['goals_against'], home['goals_for'])
+    assert np.isclose(away['xg_for'], home['xg_against'])
+
+
+def test_match_date_excludes_same_day_and_later_meetings():
+    index = HeadToHeadIndex(MATCHES)
+    assert index.lookup("Arsenal", "Wolves", match_date="2023-01-10") is None
+
+    before_third = index.lookup("Arsenal", "Wolves", match_date="2023-09-02")
+    assert before_third['overall']['matches'] == 2
+    assert [m['date'] for m in before_third['recent']] == ["2023-05-20", "2023-01-10"]
+
+    assert index.lookup("Arsenal", "Wolves", match_date="2023-09-03")['overall']['matches'] == 3
+
+
+def test_update_ignores_duplicate_game_ids():
+    index = HeadToHeadIndex(MATCHES.iloc[:2])
+    # 이미 반영된 경기(1)와 같은 배치 안의 중복(3)
+    added = index.update(pd.concat([MATCHES.iloc[[0, 2, 2]], MATCHES.iloc[[3]]], ignore_index=True))
+    assert added == 2
+    assert index.update(MATCHES) == 1   # Chelsea 경기만 새로 반영
+    assert index.lookup("Arsenal", "Wolves")['overall']['matches'] == 4
+
+
+def test_copy_leaves_original_unchanged():
+    index = HeadToHeadIndex(MATCHES.iloc[:2])
+    updated = index.copy()
+    updated.update(MATCHES)
+    assert index.lookup("Arsenal", "Wolves")['overall']['matches'] == 2
+    assert updated.lookup("Arsenal", "Wolves")['overall']['matches'] == 4
+    assert ("Chelsea", "Arsenal") in updated and ("Chelsea", "Arsenal") not in index
+
+
+def test_recent_is_newest_first_and_limited_to_last_n():
+    # 늦게 들어온 예전 경기도 날짜순으로 정렬되어야 함
+    index = HeadToHeadIndex(MATCHES.iloc[[3, 1]])
+    index.update(MATCHES.iloc[[2, 0]])
+
+    recent = index.lookup("Wolves", "Arsenal", last_n=3)['recent']
+    assert [m['date'] for m in recent] == ["2024-02-17", "2023-09-02", "2023-05-20"]
+    assert recent[0] == {
+        'date': "2024-02-17", 'home_team': "Wolves", 'away_team': "Arsenal",
+        'home_goals': 0, 'away_goals': 2, 'home_xg': 0.6, 'away_xg': 1.9
+    }
+    assert len(index.lookup("Wolves", "Arsenal", last_n=10)['recent']) == 4
@@ -0,0 +1,105 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from leagues import LEAGUES, canonical_team, league_teams, season_of
+
+'''
+리그 팀 표 확인: 최근 시즌 API-Football 경기 일정의 팀 이름이 모두 같은 리그의 Understat 팀 이름으로 통일되는지
+'''
+
+# 최근 시즌 API-Football fixtures의 팀 이름
+API_FOOTBALL_TEAMS = {
+    39: [
+        "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Burnley", "Chelsea", "Crystal Palace",
+        "Everton", "Fulham", "Ipswich", "Leeds", "Leicester", "Liverpool", "Luton", "Manchester City",
+        "Manchester United", "Newcastle", "Nottingham Forest", "Sheffield Utd", "Southampton", "Sunderland",
+        "Tottenham", "West Ham", "Wolves", "Norwich", "Watford", "West Brom"
+    ],
+    140: [
+        "Alaves", "Almeria", "Athletic Club", "Atletico Madrid", "Barcelona", "Cadiz", "Celta Vigo", "Elche",
+        "Espanyol", "Getafe", "Girona", "Granada CF", "Las Palmas", "Leganes", "Levante", "Mallorca", "Osasuna",
+        "Oviedo", "Rayo Vallecano", "Real Betis", "Real Madrid", "Real Sociedad", "Sevilla", "Valencia",
+        "Valladolid", "Villarreal"
+    ],
+    135: [
+        "AC Milan", "AS Roma", "Atalanta", "Bologna", "Cagliari", "Como", "Cremonese", "Empoli", "Fiorentina",
+        "Frosinone", "Genoa", "Inter", "Juventus", "Lazio", "Lecce", "Monza", "Napoli", "Parma", "Pisa",
+        "Salernitana", "Sassuolo", "Spezia", "Torino", "Udinese", "Venezia", "Verona", "Sampdoria"
+    ],
+    78: [
+        "1. FC Heidenheim", "1. FC Köln", "1899 Hoffenheim", "Bayer Leverkusen", "Bayern München", "Borussia Dortmund",
+        "Borussia Mönchengladbach", "Eintracht Frankfurt", "FC Augsburg", "FC St. Pauli", "FSV Mainz 05",
+        "Hamburger SV", "Holstein Kiel", "RB Leipzig", "SC Freiburg", "SV Darmstadt 98", "Union Berlin",
+        "VfB Stuttgart", "VfL Bochum", "VfL Wolfsburg", "Werder Bremen", "FC Schalke 04", "Hertha BSC",
+        "SpVgg Greuther Fürth", "Arminia Bielefeld"
+    ],
+}
+
+# 같은 시즌들의 Understat 팀 이름
+UNDERSTAT_TEAMS = {
+    39: [
+        "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Burnley", "Chelsea", "Crystal Palace",
+        "Everton", "Fulham", "Ipswich", "Leeds", "Leicester", "Liverpool", "Luton", "Manchester City",
+        "Manchester United", "Newcastle United", "Nottingham Forest", "Sheffield United", "Southampton",
+        "Sunderland", "Tottenham", "West Ham", "Wolverhampton Wanderers", "Norwich", "Watford", "West Bromwich Albion"
+    ],
+    140: [
+        "Alaves", "Almeria", "Athletic Club", "Atletico Madrid", "Barcelona", "Cadiz", "Celta Vigo", "Elche",
+        "Espanyol", "Getafe", "Girona", "Granada", "Las Palmas", "Leganes", "Levante", "Mallorca", "Osasuna",
+        "Real Oviedo", "Rayo Vallecano", "Real Betis", "Real Madrid", "Real Sociedad", "Sevilla", "Valencia",
+        "Real Valladolid", "Villarreal"
+    ],
+    135: [
+        "AC Milan", "Roma", "Atalanta", "Bologna", "Cagliari", "Como", "Cremonese", "Empoli", "Fiorentina",
+        "Frosinone", "Genoa", "Inter", "Juventus", "Lazio", "Lecce", "Monza", "Napoli", "Parma Calcio 1913", "Pisa",
+        "Salernitana", "Sassuolo", "Spezia", "Torino", "Udinese", "Venezia", "Verona", "Sampdoria"
+    ],
+    78: [
+        "Heidenheim", "FC Cologne", "Hoffenheim", "Bayer Leverkusen", "Bayern Munich", "Borussia Dortmund",
+        "Borussia M.Gladbach", "Eintracht Frankfurt", "Augsburg", "St. Pauli", "Mainz 05", "Hamburger SV",
+        "Holstein Kiel", "RasenBallsport Leipzig", "Freiburg", "Darmstadt", "Union Berlin", "VfB Stuttgart",
+        "Bochum", "Wolfsburg", "Werder Bremen", "Schalke 04", "Hertha Berlin", "Greuther Fuerth", "Arminia Bielefeld"
+    ],
+}
+
+
+@pytest.mark.parametrize("league", sorted(LEAGUES))
+def test_fixture_teams_resolve_to_understat_teams(league):
+    understat = {canonical_team(t, league) for t in UNDERSTAT_TEAMS[league]}
+    unresolved = [t for t in API_FOOTBALL_TEAMS[league] if canonical_team(t, league) not in understat]
+    assert unresolved == []
+
+
+@pytest.mark.parametrize("league", sorted(LEAGUES))
+def test_understat_teams_are_distinct_canonical_names(league):
+    # 서로 다른 Understat 팀이 같은 이름으로 합쳐지면 안 됨
+    canonical = [canonical_team(t, league) for t in UNDERSTAT_TEAMS[league]]
+    assert len(set(canonical)) == len(UNDERSTAT_TEAMS[league])
+    assert set(canonical) <= set(league_teams(league))
+
+
+def test_alias_lookup_ignores_accents_and_case():
+    assert canonical_team("Atlético Madrid", 140) == "Atletico Madrid"
+    assert canonical_team("man utd") == "Manchester United"
+    assert canonical_team("1. FC Nürnberg") == "Nuernberg"
+    assert canonical_team("Unknown FC") == "Unknown FC"
+
+
+def test_alias_tables_do_not_collide_across_leagues():
+    owners = {}
+    for league, info in LEAGUES.items():
+        for canonical in info["teams"]:
+            owners.setdefault(canonical, set()).add(league)
+    assert all(len(leagues) == 1 for leagues in owners.values())
+
+
+def test_season_of_scalar_and_vector_agree():
+    dates = ["2023-06-30", "2023-07-01", "2024-05-19", "2024-08-16"]
+    assert [season_of(d) for d in dates] == [2022, 2023, 2023, 2024]
+    assert list(season_of(dates)) == [2022, 2023, 2023, 2024]
+    assert list(season_of(pd.Series(pd.to_datetime(dates)))) == [2022, 2023, 2023, 2024]
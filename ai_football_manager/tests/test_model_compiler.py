@@ -0,0 +1,147 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import model_compiler
+import model_predictor
+from model_registry import ModelRegistry
+
+'''
+컴파일된 NumPy 추론 경로 확인: sklearn predict_proba와 허용 오차(VERIFY_ATOL) 안에서 같은지,
+지원하지 않는 구성은 sklearn 경로로 대체되는지, NaN 입력이 NaN 확률이 되지 않는지
+'''
+
+MODEL_FEATURES = ['HomeElo', 'AwayElo', 'elo_diff', 'Form5Home', 'Form5Away']
+
+
+def _fixtures(rng, n=600):
+    # model_predictor.predict_proba에 넣는 전처리 전 피처 (Elo는 로그변환 전 값)
+    home, away = rng.normal(1700, 120, n), rng.normal(1700, 120, n)
+    return pd.DataFrame({
+        'HomeElo': home, 'AwayElo': away, 'elo_diff': home - away,
+        'Form5Home': rng.integers(0, 16, n).astype(float), 'Form5Away': rng.integers(0, 16, n).astype(float),
+        'GF5Home': rng.poisson(7, n).astype(float)    # 모델이 쓰지 않는 컬럼 (ColumnTransformer가 버림)
+    })
+
+
+def _training_set(seed=0):
+    rng = np.random.default_rng(seed)
+    df = _fixtures(rng)
+    logit = (df['AwayElo'] - df['HomeElo']) / 150 + (df['Form5Away'] - df['Form5Home']) / 10 - 0.4
+    y = (rng.random(len(df)) < 1 / (1 + np.exp(-logit))).astype(int)
+    return model_predictor.preprocess(df), y
+
+
+def _pipeline(clf):
+    return Pipeline([
+        ('features', ColumnTransformer([('scale', StandardScaler(), MODEL_FEATURES)])),
+        ('clf', clf)
+    ])
+
+
+CLASSIFIERS = {
+    'logistic': lambda: LogisticRegression(C=0.5, max_iter=1000),
+    'forest': lambda: RandomForestClassifier(n_estimators=25, max_depth=6, min_samples_leaf=5, random_state=0),
+    'boosting': lambda: GradientBoostingClassifier(n_estimators=40, max_depth=3, learning_rate=0.1, random_state=0),
+}
+
+
+@pytest.mark.parametrize("name", sorted(CLASSIFIERS))
+def test_compiled_matches_sklearn_within_tolerance(name):
+    X, y = _training_set()
+    model = _pipeline(CLASSIFIERS[name]()).fit(X, y)
+    compiled = model_compiler.compile_and_verify(model)
+    assert compiled.input_columns == MODEL_FEATURES
+
+    held_out = model_predictor.preprocess(_fixtures(np.random.default_rng(1), n=400))
+    expected = model.predict_proba(held_out)[:, 1]
+    got = compiled.predict_proba(held_out[compiled.input_columns].to_numpy())
+    np.testing.assert_allclose(got, expected, rtol=0, atol=model_compiler.VERIFY_ATOL)
+
+
+def test_save_load_round_trip(tmp_path):
+    X, y = _training_set()
+    model = _pipeline(CLASSIFIERS['boosting']()).fit(X, y)
+    compiled = model_compiler.compile_and_verify(model, checksum="abc")
+    path = str(tmp_path / "model.npz")
+    compiled.save(path)
+
+    loaded = model_compiler.CompiledModel.load(path)
+    Z = X[compiled.input_columns].to_numpy()
+    assert loaded.checksum == "abc"
+    np.testing.assert_array_equal(loaded.predict_proba(Z), compiled.predict_proba(Z))
+
+
+def test_unsupported_step_falls_back_to_sklearn(tmp_path):
+    X, y = _training_set()
+    model = Pipeline([
+        ('features', ColumnTransformer([('scale', StandardScaler(), MODEL_FEATURES)])),
+        ('poly', PolynomialFeatures(degree=2)),
+        ('clf', LogisticRegression(max_iter=1000))
+    ]).fit(X, y)
+    with pytest.raises(model_compiler.UnsupportedModelError):
+        model_compiler.compile_model(model)
+
+    path = str(tmp_path / "model_final.pkl")
+    joblib.dump(model, path)
+    current = ModelRegistry(path).current()
+    assert current.compiled is None
+
+    fixtures = _fixtures(np.random.default_rng(2), n=50)
+    np.testing.assert_allclose(
+        model_predictor.predict_proba(fixtures, current),
+        model.predict_proba(model_predictor.preprocess(fixtures))[:, 1]
+    )
+
+
+def test_non_finite_input_is_rejected_not_nan(tmp_path):
+    X, y = _training_set()
+    model = _pipeline(CLASSIFIERS['logistic']()).fit(X, y)
+    compiled = model_compiler.compile_and_verify(model)
+
+    Z = X[compiled.input_columns].to_numpy()[:5].copy()
+    Z[2, 3] = np.nan
+    with pytest.raises(model_compiler.NonFiniteInputError):
+        compiled.predict_proba(Z)
+    Z[2, 3] = np.inf
+    with pytest.raises(model_compiler.NonFiniteInputError):
+        compiled.predict_proba(Z)
+
+    # 서비스 경로: 컴파일된 모델이 거부하면 sklearn 경로로 넘어가고, sklearn도 NaN을 거부
+    path = str(tmp_path / "model_final.pkl")
+    joblib.dump(model, path)
+    current = ModelRegistry(path).current()
+    assert current.compiled is not None
+    fixtures = _fixtures(np.random.default_rng(3), n=5)
+    fixtures.loc[1, 'Form5Home'] = np.nan
+    with pytest.raises(ValueError):
+        model_predictor.predict_proba(fixtures, current)
+
+
+def test_imputer_pipeline_accepts_nan():
+    X, y = _training_set()
+    X = X[MODEL_FEATURES].copy()
+    X.loc[X.index[::7], 'Form5Home'] = np.nan
+    model = Pipeline([
+        ('impute', SimpleImputer()),
+        ('scale', StandardScaler()),
+        ('clf', LogisticRegression(max_iter=1000))
+    ]).fit(X, y)
+    compiled = model_compiler.compile_and_verify(model)
+
+    # 결측치 대체 단계가 있으면 NaN도 sklearn과 같은 값으로 예측
+    Z = X[compiled.input_columns].to_numpy()
+    np.testing.assert_allclose(compiled.predict_proba(Z), model.predict_proba(X)[:, 1],
+                               rtol=0, atol=model_compiler.VERIFY_ATOL)
@@ -0,0 +1,51 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import response_cache
+from leagues import current_season
+
+'''
+응답 캐시 만료 확인: 만료 값을 대신 반환하는 기간이 TTL에 비례하는지 (진행 중인 시즌 데이터는 짧게)
+'''
+
+LIVE = ("teams/statistics", {"team": 33, "season": current_season()})
+FINISHED = ("teams/statistics", {"team": 33, "season": current_season() - 2})
+
+
+def _at(monkeypatch, t):
+    # time.time 자체를 바꾸면 date.today()(현재 시즌 계산)도 바뀌므로 캐시 모듈의 시계만 교체
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=lambda: t))
+
+
+def test_live_stats_go_stale_then_miss_within_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    ttl = response_cache.ttl_for(*LIVE)
+    assert ttl == response_cache.LIVE_STATS_TTL
+
+    _at(monkeypatch, 1000.0)
+    response_cache.put(*LIVE, {"form": "WWD"}, path=path)
+    _at(monkeypatch, 1000.0 + ttl - 1)
+    assert response_cache.get(*LIVE, path=path)[1] == "fresh"
+    _at(monkeypatch, 1000.0 + ttl + 1)
+    assert response_cache.get(*LIVE, path=path) == ({"form": "WWD"}, "stale")
+    # 몇 시간 지난 진행 중인 시즌 통계는 대신 반환하지 않음
+    _at(monkeypatch, 1000.0 + ttl + response_cache.stale_window(ttl) + 1)
+    assert response_cache.get(*LIVE, path=path) == (None, "miss")
+    assert response_cache.purge_expired(path=path) == 1
+
+
+def test_finished_season_stale_window_is_capped(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    ttl = response_cache.ttl_for(*FINISHED)
+    assert response_cache.stale_window(ttl) == response_cache.MAX_STALE_SECONDS
+
+    _at(monkeypatch, 1000.0)
+    response_cache.put(*FINISHED, {"form": "LLD"}, path=path)
+    _at(monkeypatch, 1000.0 + ttl + response_cache.MAX_STALE_SECONDS - 1)
+    assert response_cache.get(*FINISHED, path=path)[1] == "stale"
+    assert response_cache.purge_expired(path=path) == 0
+    _at(monkeypatch, 1000.0 + ttl + response_cache.MAX_STALE_SECONDS + 1)
+    assert response_cache.get(*FINISHED, path=path)[1] == "miss"
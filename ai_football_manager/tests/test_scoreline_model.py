@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from scoreline_model import ScorelineModel
+
+'''
+스코어 분포 모델 확인: 스코어 행렬의 합, Dixon-Coles 보정(rho)이 저득점 네 칸에만 적용되는지, 학습 결과
+'''
+
+LOW_SCORES = [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def _model(rho):
+    return ScorelineModel(['A', 'B', 'C'], [1.2, 1.0, 0.8], [0.9, 1.0, 1.1], 1.25, rho)
+
+
+def test_score_matrix_sums_to_one():
+    model = _model(-0.1)
+    lam_h, lam_a = model.expected_goals(['A', 'B', 'C', 'Unknown'], ['B', 'C', 'A', 'A'])
+    matrix = model.score_matrix(lam_h, lam_a)
+    np.testing.assert_allclose(matrix.sum(axis=(1, 2)), 1.0)
+    assert (matrix >= 0).all()
+
+    pred = model.predict(['A', 'B'], ['C', 'A'])
+    np.testing.assert_allclose(pred[['Home_Prob', 'Draw_Prob', 'Away_Prob']].sum(axis=1), 1.0)
+
+
+def test_rho_changes_only_low_score_cells():
+    lam_h, lam_a = np.array([0.6, 1.4, 2.8]), np.array([0.9, 1.1, 0.4])
+    base = _model(0.0).score_matrix(lam_h, lam_a)
+    adjusted = _model(0.12).score_matrix(lam_h, lam_a)
+
+    # 다시 정규화하므로 나머지 칸은 경기마다 같은 배수만큼만 바뀜
+    ratio = adjusted / base
+    low = np.zeros(base.shape[1:], dtype=bool)
+    for i, j in LOW_SCORES:
+        low[i, j] = True
+    for n in range(len(lam_h)):
+        others = ratio[n][~low]
+        np.testing.assert_allclose(others, others[0], rtol=1e-12)
+        tau = np.array([1 - lam_h[n] * lam_a[n] * 0.12, 1 + lam_h[n] * 0.12, 1 + lam_a[n] * 0.12, 1 - 0.12])
+        np.testing.assert_allclose([ratio[n][i, j] for i, j in LOW_SCORES], tau * others[0], rtol=1e-12)
+
+
+def test_fit_recovers_stronger_team():
+    rng = np.random.default_rng(0)
+    teams = ['Strong', 'Mid', 'Weak']
+    power = {'Strong': 2.0, 'Mid': 1.2, 'Weak': 0.6}
+    rows = []
+    for i in range(600):
+        home, away = rng.choice(teams, size=2, replace=False)
+        hg, ag = rng.poisson(power[home] * 1.2 / power[away]), rng.poisson(power[away] / power[home])
+        rows.append({'date': pd.Timestamp("2023-01-01") + pd.Timedelta(days=i), 'home_team': home,
+                     'away_team': away, 'home_goals': hg, 'away_goals': ag, 'home_xg': np.nan, 'away_xg': np.nan})
+    model = ScorelineModel.fit(pd.DataFrame(rows))
+    assert np.isclose(model.attack.mean(), 1.0)
+    attack = dict(zip(model.teams, model.attack))
+    assert attack['Strong'] > attack['Mid'] > attack['Weak']
+    assert model.home_adv > 1.0
+
+    restored = ScorelineModel.from_dict(model.to_dict())
+    pd.testing.assert_frame_equal(restored.predict(['Strong'], ['Weak']), model.predict(['Strong'], ['Weak']))
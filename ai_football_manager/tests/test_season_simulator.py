@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+from season_simulator import current_table, outcome_probabilities, simulate_season
+
+'''
+시즌 시뮬레이터 확인: 팀별 최종 순위 확률의 합, 같은 시드의 재현성, 이미 정해진 순위
+'''
+
+
+def _league(seed=0, n_teams=10, n_fixtures=30):
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    played = pd.DataFrame({
+        'home_team': rng.choice(teams, 40), 'away_team': rng.choice(teams, 40),
+        'home_goals': rng.poisson(1.5, 40), 'away_goals': rng.poisson(1.1, 40)
+    })
+    played = played[played['home_team'] != played['away_team']]
+    pairs = [(h, a) for h in teams for a in teams if h != a]
+    idx = rng.choice(len(pairs), size=n_fixtures, replace=False)
+    fixtures = pd.DataFrame([pairs[i] for i in idx], columns=['HomeTeam', 'AwayTeam'])
+    probs = outcome_probabilities(rng.uniform(0.1, 0.6, n_fixtures), 0.45)
+    return current_table(played), fixtures, probs
+
+
+def test_position_probabilities_sum_to_one():
+    table, fixtures, probs = _league()
+    out = simulate_season(table, fixtures, probs, n_sims=5_000, seed=1, chunk_size=1_500)
+    n_teams = len(out)
+    dist = out[list(range(1, n_teams + 1))].to_numpy()
+    np.testing.assert_allclose(dist.sum(axis=1), 1.0)   # 팀마다 어느 한 순위
+    np.testing.assert_allclose(dist.sum(axis=0), 1.0)   # 순위마다 어느 한 팀
+    assert ((out['title'] >= 0) & (out['top4'] >= out['title']) & (out['top4'] <= 1)).all()
+    np.testing.assert_allclose(out['relegation'].sum(), 3.0)
+
+
+def test_fixed_seed_is_reproducible():
+    table, fixtures, probs = _league()
+    a = simulate_season(table, fixtures, probs, n_sims=3_000, seed=7)
+    b = simulate_season(table, fixtures, probs, n_sims=3_000, seed=7)
+    pd.testing.assert_frame_equal(a, b)
+    c = simulate_season(table, fixtures, probs, n_sims=3_000, seed=8)
+    assert not a.equals(c)
+
+
+def test_certain_outcomes_give_certain_table():
+    table = pd.DataFrame({'points': [10, 10, 0], 'goal_diff': [5, 3, -8], 'goals_for': [8, 6, 1]},
+                         index=['A', 'B', 'C'])
+    fixtures = pd.DataFrame({'HomeTeam': ['C'], 'AwayTeam': ['A']})
+    # C 홈 승이 확실해도 C는 3점으로 꼴찌, A와 B는 승점이 같아 득실차로 A가 1위
+    out = simulate_season(table, fixtures, [[1.0, 0.0, 0.0]], n_sims=100, seed=0, relegation_spots=1)
+    assert out.loc['A', 1] == 1.0 and out.loc['B', 2] == 1.0 and out.loc['C', 3] == 1.0
+    assert out.loc['C', 'exp_points'] == 3.0 and out.loc['C', 'relegation'] == 1.0
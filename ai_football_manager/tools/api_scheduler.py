@@ -0,0 +1,451 @@
+import os
+import time
+import heapq
+import sqlite3
+import itertools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+import requests
+
+import http_client
+
+'''
+API-Football(RapidAPI) 호출 스케줄러
+- 분당 한도는 토큰 버킷, 일일 한도는 UTC 자정에 초기화되는 카운터로 관리
+- 한도를 넘는 순간의 요청은 실패시키지 않고 토큰이 생길 때까지 잠시 대기
+- 우선순위 레인: 사용자 질문(INTERACTIVE)이 백그라운드 갱신(BACKGROUND)보다 먼저 토큰을 받고,
+  일일 한도의 마지막 INTERACTIVE_RESERVE 비율은 사용자 질문에만 사용
+- 같은 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 나눠 받음
+  (백그라운드 요청에 사용자 질문이 합류하면 그 요청을 사용자 레인으로 올림)
+- 429/5xx 재시도도 시도마다 토큰과 일일 한도를 사용 (http_client 내부 재시도는 쓰지 않음)
+- 호출 수, 대기 시간, 한도 소진량 집계
+
+여러 프로세스(Streamlit 워커 등)에서 실행할 때
+- 일일 한도 사용량은 SQLite(response_cache와 같은 파일)의 날짜별 카운터를 모든 프로세스가 함께 씀.
+  카운터를 쓸 수 없으면 경고 후 프로세스 메모리로 집계 (이때는 프로세스마다 한도 전체를 쓸 수 있음)
+- 분당 토큰 버킷은 프로세스마다 따로 있으므로, 분당 한도를 API_FOOTBALL_WORKERS(프로세스 수)로 나눠 씀.
+  프로세스 수를 알려주지 않으면 순간적으로 분당 한도 x 프로세스 수만큼 보낼 수 있고, 이때는 429 처리에 의존
+'''
+
+# RapidAPI 요금제 한도 (환경 변수로 변경)
+RATE_PER_MINUTE = int(os.getenv("API_FOOTBALL_RATE_PER_MINUTE", "30"))
+DAILY_QUOTA = int(os.getenv("API_FOOTBALL_DAILY_QUOTA", "7500"))
+WORKERS = max(int(os.getenv("API_FOOTBALL_WORKERS", "1")), 1)   # 같은 API 키를 쓰는 프로세스 수
+INTERACTIVE_RESERVE = 0.1
+
+INTERACTIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# 레인별 최대 대기 시간(초). 넘으면 RateLimitTimeout
+MAX_WAIT = {INTERACTIVE: 10.0, BACKGROUND: 300.0}
+
+# 프로세스 간에 공유하는 일일 사용량 카운터 (response_cache와 같은 SQLite 파일의 별도 테이블)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+QUOTA_PATH = os.path.join(PROJECT_ROOT, "data", "api_cache.sqlite")
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+class RateLimitTimeout(Exception):
+    """최대 대기 시간 안에 호출 한도를 받지 못함"""
+
+
+def current_lane() -> int:
+    """현재 스레드의 레인 (lane()으로 지정하지 않았으면 INTERACTIVE)"""
+    return getattr(_local, "lane", INTERACTIVE)
+
+
+@contextmanager
+def lane(priority):
+    """with 블록 안의 API 호출을 지정한 레인으로 보냄 (예: 백그라운드 갱신 스레드)"""
+    previous = current_lane()
+    _local.lane = priority
+    try:
+        yield
+    finally:
+        _local.lane = previous
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷 (호출하는 쪽에서 잠금)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now) -> float:
+        """토큰이 있으면 하나 쓰고 0, 없으면 다음 토큰까지 남은 시간(초)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self, now, delay=0.0):
+        """토큰을 비우고 delay초 동안은 새 토큰이 생기지 않게 함 (음수 잔량으로 표현)"""
+        self._refill(now)
+        self.tokens = -max(delay, 0.0) * self.rate
+
+
+def _connect(path):
+    # 스레드마다 연결 하나 (sqlite3 연결은 스레드 간 공유하지 않음)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        with _init_lock:
+            if path not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS api_quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+                conn.commit()
+                _initialized.add(path)
+        conns[path] = conn
+    return conn
+
+
+def _reserve_shared(path, day, quota):
+    """
+    공유 카운터에서 day의 사용량이 quota 미만이면 1 늘립니다.
+    조건 확인과 증가가 한 문장이라 여러 프로세스가 동시에 불러도 quota를 넘지 않습니다.
+
+    Returns
+    -------
+    (bool, int)
+        (한도를 받았는지, 오늘 사용량)
+    """
+    conn = _connect(path)
+    with conn:
+        reserved = quota > 0 and conn.execute(
+            "INSERT INTO api_quota (day, used) VALUES (?, 1)"
+            " ON CONFLICT(day) DO UPDATE SET used = used + 1 WHERE used < ?",
+            (day, quota)
+        ).rowcount == 1
+        # 쓰기 잠금을 가진 채 읽으므로 방금 늘린 값 그대로
+        row = conn.execute("SELECT used FROM api_quota WHERE day = ?", (day,)).fetchone()
+    return reserved, row[0] if row else 0
+
+
+def _shared_used(path, day):
+    row = _connect(path).execute("SELECT used FROM api_quota WHERE day = ?", (day,)).fetchone()
+    return row[0] if row else 0
+
+
+class _Ticket:
+    """한 요청(재시도 포함)의 대기열 순서와 레인. 같은 요청에 사용자 질문이 합류하면 레인이 올라감"""
+    __slots__ = ("priority", "seq", "deadline")
+
+    def __init__(self, priority, seq):
+        self.priority = priority
+        self.seq = seq
+        self.deadline = None
+
+    def entry(self):
+        return (self.priority, self.seq)
+
+
+class ApiScheduler:
+    def __init__(self, rate_per_minute: int = RATE_PER_MINUTE, daily_quota: int = DAILY_QUOTA,
+                 interactive_reserve: float = INTERACTIVE_RESERVE, quota_path: str = None):
+        """
+        Parameters
+        ----------
+        rate_per_minute : int
+            이 프로세스가 쓸 분당 호출 한도
+        daily_quota : int
+            API 키 전체의 일일 호출 한도
+        interactive_reserve : float
+            일일 한도 중 사용자 질문에만 남겨둘 비율
+        quota_path : str, optional
+            일일 사용량을 프로세스 간에 공유할 SQLite 파일 (없으면 이 프로세스 메모리에서만 집계)
+        """
+        self.bucket = TokenBucket(rate_per_minute / 60.0, rate_per_minute)
+        self.daily_quota = daily_quota
+        self.background_quota = int(daily_quota * (1 - interactive_reserve))
+        self.quota_path = quota_path
+        self._day = None
+        self._used_today = 0               # quota_path가 있으면 마지막으로 본 공유 카운터 값
+
+        self._cond = threading.Condition()
+        self._waiting = []                 # (레인, 순번) 힙: 맨 앞 요청만 토큰을 받을 수 있음
+        self._seq = itertools.count()
+        self._inflight = {}                # key -> (Future, _Ticket)
+        self._inflight_lock = threading.Lock()
+
+        self._metrics = {
+            "calls": 0, "coalesced": 0, "promoted": 0, "retries": 0, "queued": 0, "timeouts": 0,
+            "throttled": 0, "wait_sec": 0.0, "max_wait_sec": 0.0,
+            "by_lane": {name: 0 for name in LANE_NAMES.values()}
+        }
+
+    def _roll_day(self):
+        today = datetime.now(timezone.utc).date()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def _reserve(self, quota) -> bool:
+        # 오늘 사용량이 quota 미만이면 1 늘리고 True (self._cond 안에서 호출)
+        self._roll_day()
+        if self.quota_path:
+            try:
+                reserved, self._used_today = _reserve_shared(self.quota_path, self._day.isoformat(), quota)
+                return reserved
+            except sqlite3.Error as e:
+                print(f"[api_scheduler] 공유 일일 한도 카운터를 쓸 수 없어 프로세스 메모리로 집계합니다: {e}")
+                self.quota_path = None
+        if self._used_today >= quota:
+            return False
+        self._used_today += 1
+        return True
+
+    def _seconds_to_reset(self):
+        now = datetime.now(timezone.utc)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp() + 24 * 60 * 60
+        return midnight - now.timestamp()
+
+    def _ticket(self, priority=None) -> _Ticket:
+        return _Ticket(current_lane() if priority is None else priority, next(self._seq))
+
+    def acquire(self, priority: int = None, max_wait: float = None, ticket: _Ticket = None) -> float:
+        """
+        호출 한도 토큰 하나를 받을 때까지 기다립니다.
+        먼저 온 요청보다 우선순위가 높은 레인(값이 작은 쪽)이 먼저 받습니다.
+
+        Parameters
+        ----------
+        priority : int, optional
+            INTERACTIVE 또는 BACKGROUND (없으면 현재 스레드의 레인)
+        max_wait : float, optional
+            최대 대기 시간(초, 없으면 레인별 MAX_WAIT)
+        ticket : _Ticket, optional
+            재시도/합류한 요청이 같은 순번과 레인을 이어 쓰기 위한 티켓 (주어지면 priority는 무시)
+
+        Returns
+        -------
+        float
+            대기한 시간(초)
+
+        Raises
+        ------
+        RateLimitTimeout
+            최대 대기 시간 안에 토큰을 받지 못하면
+        """
+        ticket = ticket or self._ticket(priority)
+        t0 = time.monotonic()
+
+        with self._cond:
+            ticket.deadline = t0 + (MAX_WAIT.get(ticket.priority, MAX_WAIT[BACKGROUND]) if max_wait is None else max_wait)
+            heapq.heappush(self._waiting, ticket.entry())
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    # promote()가 레인과 마감 시각을 바꿀 수 있으므로 매번 티켓에서 읽음
+                    if self._waiting[0] == ticket.entry():
+                        quota = self.daily_quota if ticket.priority == INTERACTIVE else self.background_quota
+                        wait = self.bucket.try_take(now)
+                        if wait == 0.0:
+                            if self._reserve(quota):
+                                break
+                            # 일일 한도 소진: 받은 분당 토큰은 돌려주고, 자정(UTC)까지 기다릴 수 없으면 실패
+                            self.bucket.tokens += 1
+                            wait = self._seconds_to_reset()
+                    remaining = ticket.deadline - now
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        self._metrics["timeouts"] += 1
+                        raise RateLimitTimeout(
+                            f"API 호출 한도 대기 시간 초과 ({LANE_NAMES.get(ticket.priority, ticket.priority)}, "
+                            f"{ticket.deadline - t0:.0f}초)"
+                        )
+                    self._cond.wait(min(remaining, wait) if wait is not None else remaining)
+            finally:
+                self._waiting.remove(ticket.entry())
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - t0
+            m = self._metrics
+            m["calls"] += 1
+            m["by_lane"][LANE_NAMES.get(ticket.priority, str(ticket.priority))] += 1
+            if waited > 0.001:
+                m["queued"] += 1
+            m["wait_sec"] += waited
+            m["max_wait_sec"] = max(m["max_wait_sec"], waited)
+        return waited
+
+    def promote(self, ticket: _Ticket, priority: int):
+        """
+        대기 중인(또는 재시도할) 요청을 더 높은 레인으로 올립니다.
+        마감 시각도 새 레인의 MAX_WAIT 이내로 당겨, 합류한 사용자 질문이 백그라운드 대기 시간만큼 기다리지 않게 함
+        """
+        with self._cond:
+            if priority >= ticket.priority:
+                return
+            waiting = ticket.entry() in self._waiting
+            if waiting:
+                self._waiting.remove(ticket.entry())
+            ticket.priority = priority
+            if ticket.deadline is not None:
+                ticket.deadline = min(ticket.deadline, time.monotonic() + MAX_WAIT.get(priority, MAX_WAIT[BACKGROUND]))
+            if waiting:
+                self._waiting.append(ticket.entry())
+            heapq.heapify(self._waiting)
+            self._metrics["promoted"] += 1
+            self._cond.notify_all()
+
+    def throttle(self, delay: float = 0.0):
+        """
+        서버가 429를 돌려주면 분당 버킷을 비우고 delay(Retry-After)초 동안은 토큰을 주지 않아
+        모든 레인의 뒤따르는 요청을 늦춤
+        """
+        with self._cond:
+            self.bucket.drain(time.monotonic(), delay)
+            self._metrics["throttled"] += 1
+            self._cond.notify_all()
+
+    def _single_flight(self, key, run, priority=None):
+        # 같은 key의 요청이 진행 중이면 그 결과를 기다리고, 아니면 run(ticket)을 직접 실행
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                ticket = self._ticket(priority)
+                future = Future()
+                self._inflight[key] = (future, ticket)
+            else:
+                future, ticket = flight
+
+        if not owner:
+            with self._cond:
+                self._metrics["coalesced"] += 1
+            # 백그라운드 요청에 사용자 질문이 합류하면 그 요청을 사용자 레인으로 올림
+            self.promote(ticket, current_lane() if priority is None else priority)
+            return future.result()
+
+        try:
+            value = run(ticket)
+        except BaseException as e:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def call(self, key, fn, priority: int = None):
+        """
+        한도 토큰을 받은 뒤 fn()을 호출합니다.
+        같은 key의 호출이 이미 진행 중이면 토큰을 쓰지 않고 그 결과를 기다립니다.
+        """
+        def run(ticket):
+            self.acquire(ticket=ticket)
+            return fn()
+
+        return self._single_flight(key, run, priority)
+
+    def request(self, key, send, priority: int = None, max_retries: int = http_client.MAX_RETRIES):
+        """
+        HTTP 요청을 호출 한도 안에서 보내고, 429/5xx/연결 오류는 시도마다 토큰을 다시 받아 재시도합니다.
+        429는 Retry-After(없으면 백오프) 동안 모든 레인의 토큰 지급을 멈추고, 5xx/연결 오류는 백오프 후 재시도합니다.
+
+        Parameters
+        ----------
+        key : hashable
+            같은 요청을 합치기 위한 키
+        send : callable
+            재시도 없이 요청을 한 번 보내 requests.Response를 반환하는 함수 (http_client.get(..., max_retries=0))
+        max_retries : int
+            재시도 횟수
+
+        Returns
+        -------
+        requests.Response
+            마지막 응답 (재시도 후에도 429/5xx면 그대로 반환하므로 호출하는 쪽에서 raise_for_status)
+        """
+        def run(ticket):
+            for attempt in range(max_retries + 1):
+                self.acquire(ticket=ticket)
+                try:
+                    response = send()
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == max_retries:
+                        raise
+                    delay = http_client.backoff_delay(attempt)
+                else:
+                    if response.status_code == 429:
+                        # 다음 토큰은 Retry-After 뒤에 나오므로 따로 잠들지 않고 acquire에서 기다림
+                        self.throttle(http_client.backoff_delay(attempt, response))
+                        delay = 0.0
+                    elif response.status_code in http_client.RETRY_STATUS:
+                        delay = http_client.backoff_delay(attempt)
+                    else:
+                        return response
+                    if attempt == max_retries:
+                        return response
+                with self._cond:
+                    self._metrics["retries"] += 1
+                time.sleep(delay)
+
+        return self._single_flight(key, run, priority)
+
+    def metrics(self) -> dict:
+        """호출/대기/합류/재시도 수, 평균·최대 대기 시간, 남은 분당 토큰과 오늘 사용량(한도 소진율)"""
+        with self._cond:
+            self._roll_day()
+            if self.quota_path:
+                try:
+                    self._used_today = _shared_used(self.quota_path, self._day.isoformat())
+                except sqlite3.Error:
+                    pass                   # 마지막으로 본 값 사용
+            self.bucket._refill(time.monotonic())
+            m = dict(self._metrics, by_lane=dict(self._metrics["by_lane"]))
+            m["avg_wait_sec"] = m["wait_sec"] / m["calls"] if m["calls"] else 0.0
+            m["waiting"] = len(self._waiting)
+            m["minute_tokens"] = self.bucket.tokens
+            m["used_today"] = self._used_today
+            m["daily_quota"] = self.daily_quota
+            m["quota_burn"] = self._used_today / self.daily_quota if self.daily_quota else 0.0
+            return m
+
+
+# 프로세스 전역 API-Football 스케줄러 (일일 한도는 모든 프로세스가 공유, 분당 한도는 프로세스 수로 나눔)
+scheduler = ApiScheduler(rate_per_minute=max(RATE_PER_MINUTE // WORKERS, 1), quota_path=QUOTA_PATH)
+
+
+if __name__ == "__main__":
+    # 초당 60회 버킷에 사용자/백그라운드 요청 200개를 몰아넣어 순서와 대기 시간 확인
+    demo = ApiScheduler(rate_per_minute=60 * 60, daily_quota=10_000)
+    demo.bucket.tokens = 0
+    order = []
+
+    def worker(i, priority):
+        demo.call(("demo", i), lambda: order.append(priority), priority)
+
+    threads = [threading.Thread(target=worker, args=(i, BACKGROUND if i % 4 else INTERACTIVE)) for i in range(200)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    first_half = order[:100]
+    print(f"200개 요청 처리: {time.perf_counter() - t0:.2f}초")
+    print(f"앞쪽 100개 중 사용자 요청: {first_half.count(INTERACTIVE)}개 (전체 {order.count(INTERACTIVE)}개)")
+    print(demo.metrics())
@@ -0,0 +1,329 @@
+import warnings
+import logging
+warnings.filterwarnings('ignore')
+logging.getLogger().setLevel(logging.ERROR)
+
+# soccerdata 로그 차단
+logging.getLogger('soccerdata').disabled = True
+logging.getLogger('understat').disabled = True
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# 같은 tools 폴더의 모듈을 import하기 위한 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+'''
+예측 파이프라인 백테스트
+- Understat에 기록된 EPL 경기를 시즌별로 다시 예측 (경기 전 정보만 사용: as-of 롤링 피처 + 경기 전날 Elo)
+- 로그 손실, Brier 점수, 정확도, 확률 구간별 보정(calibration)과 초당 처리 경기 수를 보고
+- 피처 스냅샷과 Elo(로컬 엔진 상태 또는 soccerdata 디스크 캐시)만 사용하므로 네트워크 없이 실행
+  (ClubElo 캐시가 없는 팀이 있으면 네트워크로 받지 않고 바로 중단)
+- 서비스 모델은 학습 기간과 겹치는 시즌을 인샘플로 표시
+  walk_forward=True면 시즌 N을 N 이전 시즌으로만 학습한 모델로, train_until=Y면 Y 이하 시즌으로 학습한
+  모델로 Y 이후 시즌을 평가 (아웃오브샘플)
+- 시즌 단위로 프로세스 풀에서 병렬 실행
+'''
+
+EPS = 1e-15
+CALIBRATION_BINS = 10
+
+# 작업 프로세스마다 한 번만 만드는 DataCollector와 모델
+_worker_collector = None
+_worker_model = None
+
+
+def load_results(collector) -> pd.DataFrame:
+    """스냅샷의 경기 결과 (game_id, date, home_team, away_team, home_goals, away_goals, season)"""
+    import feature_engine
+    from leagues import season_of
+
+    m = feature_engine.to_match_format(collector.long_features)
+    m['season'] = season_of(m['date'])
+    return m
+
+
+def _init_worker(elo_source, model_path, league, load_model=True):
+    global _worker_collector, _worker_model
+    from data_collector_tools import DataCollector
+    from model_registry import ModelRegistry, MODEL_PATH
+
+    # 저장된 스냅샷을 메모리 맵으로 읽으므로 원본 데이터를 다시 받지 않음
+    _worker_collector = DataCollector(use_snapshot=True, elo_source=elo_source, league=league, offline=True)
+    _worker_model = ModelRegistry(model_path or MODEL_PATH).current() if load_model else None
+
+
+def backtest_season(season: int, model=None) -> pd.DataFrame:
+    """한 시즌의 모든 경기를 경기 전 피처로 예측 (작업 프로세스에서 실행, model이 없으면 서비스 모델)"""
+    from model_predictor import predict_proba
+
+    model = model or _worker_model
+    t0 = time.perf_counter()
+    m = load_results(_worker_collector)
+    m = m[m['season'] == season]
+
+    fixtures = pd.DataFrame({
+        'MatchDate': m['date'].dt.date.to_numpy(),
+        'HomeTeam': m['home_team'].to_numpy(),
+        'AwayTeam': m['away_team'].to_numpy()
+    })
+    features = _worker_collector.collect_features_batch(fixtures, pre_match=True)
+    proba = predict_proba(features, model)
+
+    out = fixtures.assign(
+        season=season,
+        game_id=m['game_id'].to_numpy(),
+        home_goals=m['home_goals'].to_numpy(),
+        away_goals=m['away_goals'].to_numpy(),
+        AwayWin_Prob=proba,
+        # 모델의 클래스 1 = 원정팀 승리 (무승부는 0)
+        y=(m['away_goals'].to_numpy() > m['home_goals'].to_numpy()).astype(int)
+    )
+    out.attrs['elapsed'] = time.perf_counter() - t0
+    return out
+
+
+def score(y, p) -> dict:
+    """로그 손실, Brier 점수, 정확도"""
+    y = np.asarray(y, dtype=np.float64)
+    p = np.clip(np.asarray(p, dtype=np.float64), EPS, 1 - EPS)
+    return {
+        'n': len(y),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))) if len(y) else np.nan,
+        'brier': float(np.mean((p - y) ** 2)) if len(y) else np.nan,
+        'accuracy': float(np.mean((p > 0.5) == (y == 1))) if len(y) else np.nan
+    }
+
+
+def calibration_table(y, p, bins=CALIBRATION_BINS) -> pd.DataFrame:
+    """예측 확률 구간별 평균 예측 확률과 실제 원정 승리 비율"""
+    y = np.asarray(y, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    b = np.minimum((p * bins).astype(int), bins - 1)
+    count = np.bincount(b, minlength=bins)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_pred = np.bincount(b, weights=p, minlength=bins) / count
+        observed = np.bincount(b, weights=y, minlength=bins) / count
+    edges = np.arange(bins + 1) / bins
+    return pd.DataFrame({
+        'bin': [f"{lo:.1f}-{hi:.1f}" for lo, hi in zip(edges[:-1], edges[1:])],
+        'count': count,
+        'mean_pred': mean_pred,
+        'observed': observed
+    })
+
+
+def model_elo_source(model_path=None) -> str:
+    """모델을 학습할 때 쓴 Elo 출처 (메타데이터에 없으면 서비스 기본값 ELO_SOURCE)"""
+    from data_collector_tools import ELO_SOURCE
+    from model_registry import read_metadata, MODEL_PATH
+
+    return read_metadata(model_path or MODEL_PATH).get('elo_source') or ELO_SOURCE
+
+
+def training_seasons(metadata: dict):
+    """메타데이터의 학습 기간(training_window)에 들어 있는 시즌 (기록이 없으면 None)"""
+    from leagues import season_of
+
+    window = metadata.get('training_window')
+    if not window:
+        return None
+    first, last = season_of(window)
+    return set(range(int(first), int(last) + 1))
+
+
+def check_clubelo_cache(collector):
+    """ClubElo 이력이 디스크에 캐시되지 않은 팀이 있으면 ValueError (백테스트는 네트워크를 쓰지 않음)"""
+    from elo_index import missing_from_cache
+
+    missing = missing_from_cache(collector.clubelo, collector.long_features['team'].astype(object).unique())
+    if missing:
+        raise ValueError(
+            f"ClubElo 이력 캐시가 없는 팀 {len(missing)}개: {', '.join(missing[:10])}"
+            f"{' 등' if len(missing) > 10 else ''}. "
+            "서비스를 한 번 실행해 캐시를 만들거나 --elo-source local로 실행하세요."
+        )
+
+
+def train_season_model(collector, train_seasons, n_jobs=-1):
+    """train_seasons의 경기만으로 학습한 모델 (레지스트리에 저장하지 않음)"""
+    from model_registry import LoadedModel
+    from train_model import build_training_set, fit
+
+    X, y, matches = build_training_set(collector, train_seasons)
+    best = fit(X, y, n_jobs=n_jobs).best_estimator_
+    metadata = {
+        'elo_source': collector.elo_source,
+        'training_window': [str(matches['date'].min().date()), str(matches['date'].max().date())],
+        'n_samples': int(len(y))
+    }
+    return LoadedModel(best, f"seasons-{min(train_seasons)}-{max(train_seasons)}", metadata, None)
+
+
+def run_backtest(seasons=None, elo_source=None, model_path=None, workers=None, league=None,
+                 allow_elo_mismatch=False, walk_forward=False, train_until=None, n_jobs=-1) -> dict:
+    """
+    시즌별 백테스트를 실행합니다.
+
+    Parameters
+    ----------
+    seasons : list, optional
+        시즌 시작 연도 목록 (없으면 스냅샷에 있는 모든 시즌)
+    elo_source : str, optional
+        'local'(Understat 결과로 계산, 완전 오프라인) 또는 'clubelo'(soccerdata 캐시 사용).
+        없으면 모델 메타데이터에 기록된 학습 시 Elo 출처 (서비스와 같은 조건으로 평가)
+    model_path : str, optional
+        평가할 모델 파일 (없으면 서비스 중인 모델)
+    workers : int, optional
+        프로세스 수 (없으면 min(시즌 수, CPU 수))
+    league : int or str, optional
+        리그 ID 또는 이름 (없으면 프리미어리그)
+    allow_elo_mismatch : bool
+        True면 elo_source가 모델 학습 시 Elo 출처와 달라도 경고만 하고 실행
+    walk_forward : bool
+        True면 시즌마다 그 이전 시즌으로만 모델을 새로 학습해 평가 (이전 시즌이 없는 첫 시즌은 제외)
+    train_until : int, optional
+        이 시즌까지로 모델을 한 번 학습하고 이후 시즌만 평가
+    n_jobs : int
+        walk_forward/train_until 학습의 joblib 병렬 작업 수
+
+    Returns
+    -------
+    dict
+        predictions(경기별 예측), overall/by_season(점수, 시즌별 in_sample 여부), calibration,
+        throughput, elo_source, mode('service' / 'walk_forward' / 'train_until'), in_sample
+
+    Raises
+    ------
+    ValueError
+        elo_source가 모델 학습 시 Elo 출처와 다르고 allow_elo_mismatch=False인 경우
+        (Elo 척도와 이력이 달라 점수가 서비스 중인 예측을 대표하지 않음),
+        ClubElo 이력 캐시가 없는 팀이 있는 경우, walk_forward와 train_until을 함께 지정한 경우
+    """
+    from data_collector_tools import DataCollector
+    from model_registry import read_metadata, MODEL_PATH
+
+    if walk_forward and train_until is not None:
+        raise ValueError("walk_forward와 train_until은 함께 지정할 수 없습니다.")
+    mode = 'walk_forward' if walk_forward else 'train_until' if train_until is not None else 'service'
+
+    trained_on = model_elo_source(model_path)
+    elo_source = elo_source or trained_on
+    if mode == 'service' and elo_source != trained_on:
+        message = f"모델은 '{trained_on}' Elo로 학습되었지만 백테스트는 '{elo_source}' Elo를 사용합니다."
+        if not allow_elo_mismatch:
+            raise ValueError(message + " 같은 출처로 실행하거나 allow_elo_mismatch=True를 지정하세요.")
+        print(f"경고: {message} 점수가 서비스 중인 예측과 다를 수 있습니다.")
+
+    # 스냅샷과 로컬 Elo 상태가 없으면 여기서 한 번 만들어 두고, 작업 프로세스는 읽기만 함
+    collector = DataCollector(use_snapshot=True, elo_source=elo_source, league=league, offline=True)
+    if elo_source == 'clubelo':
+        check_clubelo_cache(collector)
+    league = collector.league
+    available = sorted(set(load_results(collector)['season'].tolist()))
+    seasons = available if seasons is None else [s for s in seasons if s in available]
+
+    models = [None] * len(seasons)
+    if mode == 'service':
+        trained = training_seasons(read_metadata(model_path or MODEL_PATH))
+        # 학습 기간을 알 수 없으면 인샘플로 간주
+        in_sample = [trained is None or s in trained for s in seasons]
+    else:
+        if mode == 'walk_forward':
+            seasons = [s for s in seasons if s > available[0]]
+            models = [train_season_model(collector, [a for a in available if a < s], n_jobs) for s in seasons]
+        else:
+            seasons = [s for s in seasons if s > train_until]
+            train_seasons = [a for a in available if a <= train_until]
+            if seasons and not train_seasons:
+                raise ValueError(f"{train_until} 시즌 이전의 학습 데이터가 없습니다.")
+            model = train_season_model(collector, train_seasons, n_jobs) if seasons else None
+            models = [model] * len(seasons)
+        in_sample = [False] * len(seasons)
+    if not seasons:
+        return None
+    del collector
+
+    workers = workers or min(len(seasons), os.cpu_count() or 1)
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(elo_source, model_path, league, mode == 'service')) as exe:
+        parts = list(exe.map(backtest_season, seasons, models))
+    wall = time.perf_counter() - t0
+
+    predictions = pd.concat(parts, ignore_index=True)
+    by_season = pd.DataFrame([
+        dict(season=s, **score(part['y'], part['AwayWin_Prob']), in_sample=flag, seconds=part.attrs['elapsed'])
+        for s, part, flag in zip(seasons, parts, in_sample)
+    ])
+    return {
+        'predictions': predictions,
+        'overall': score(predictions['y'], predictions['AwayWin_Prob']),
+        'by_season': by_season,
+        'calibration': calibration_table(predictions['y'], predictions['AwayWin_Prob']),
+        'elo_source': elo_source,
+        'mode': mode,
+        'in_sample': any(in_sample),
+        'throughput': {
+            'fixtures': len(predictions),
+            'workers': workers,
+            'wall_sec': wall,
+            'fixtures_per_sec': len(predictions) / wall if wall else float('inf')
+        }
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예측 파이프라인 백테스트")
+    parser.add_argument("--seasons", type=int, nargs="*", help="시즌 시작 연도 (기본: 전체)")
+    parser.add_argument("--elo-source", choices=["local", "clubelo"],
+                        help="Elo 출처 (기본: 모델 학습 시 사용한 출처)")
+    parser.add_argument("--allow-elo-mismatch", action="store_true",
+                        help="모델 학습 시 Elo 출처와 달라도 경고만 하고 실행")
+    parser.add_argument("--model", help="평가할 모델 파일 (기본: models/model_final.pkl)")
+    parser.add_argument("--walk-forward", action="store_true",
+                        help="시즌마다 이전 시즌으로만 새로 학습한 모델로 평가 (아웃오브샘플)")
+    parser.add_argument("--train-until", type=int,
+                        help="이 시즌까지로 학습한 모델로 이후 시즌만 평가 (아웃오브샘플)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="모델 학습 병렬 작업 수 (기본: 모든 코어)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--league", help="리그 ID 또는 이름 (예: 140, LaLiga, 기본: EPL)")
+    parser.add_argument("--out", help="경기별 예측을 저장할 CSV 경로")
+    args = parser.parse_args()
+
+    try:
+        report = run_backtest(args.seasons, args.elo_source, args.model, args.workers, args.league,
+                              allow_elo_mismatch=args.allow_elo_mismatch, walk_forward=args.walk_forward,
+                              train_until=args.train_until, n_jobs=args.n_jobs)
+    except ValueError as e:
+        print(f"오류: {e}")
+        sys.exit(2)
+    if report is None:
+        print("백테스트할 시즌이 없습니다.")
+        sys.exit(1)
+
+    pd.set_option('display.width', 120)
+    print(f"Elo 출처: {report['elo_source']}, 평가 방식: {report['mode']}")
+    if report['in_sample']:
+        print("주의: 모델 학습 기간과 겹치는 시즌(in_sample=True)은 인샘플 점수입니다. "
+              "--walk-forward 또는 --train-until로 아웃오브샘플 점수를 확인하세요.")
+    print(report['by_season'].to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    overall = report['overall']
+    label = " (인샘플 포함)" if report['in_sample'] else ""
+    print(f"\n전체 {overall['n']}경기{label}: log loss {overall['log_loss']:.4f}, "
+          f"Brier {overall['brier']:.4f}, 정확도 {overall['accuracy']:.3f}")
+    print("\n보정표 (원정 승리 확률)")
+    print(report['calibration'].to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    tp = report['throughput']
+    print(f"\n처리량: {tp['fixtures']}경기 / {tp['wall_sec']:.2f}초 "
+          f"({tp['fixtures_per_sec']:.0f} 경기/초, 프로세스 {tp['workers']}개)")
+
+    if args.out:
+        report['predictions'].to_csv(args.out, index=False)
+        print(f"경기별 예측 저장: {args.out}")
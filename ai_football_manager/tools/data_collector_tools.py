@@ -7,108 +7,249 @@ logging.getLogger().setLevel(logging.ERROR)
 logging.getLogger('soccerdata').disabled = True
 logging.getLogger('understat').disabled = True
 
+import os
+import sys
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+import numpy as np
 import pandas as pd
-from soccerdata import ClubElo, Understat
-from concurrent.futures import ThreadPoolExecutor
+from soccerdata import ClubElo
+
+# 같은 tools 폴더의 모듈을 import하기 위한 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import feature_store
+import feature_engine
+import understat_ingest
+from understat_ingest import MATCH_COLUMNS
+from feature_engine import FEATURE_VERSION
+from elo_index import EloHistoryIndex
+from elo_engine import EloEngine, ELO_STATE_PATH
+from h2h_index import HeadToHeadIndex
+from leagues import DEFAULT_LEAGUE, get_league, league_id, canonical_team
+
+FEATURE_KEYS = ['MatchDate', 'HomeTeam', 'AwayTeam']
+
+# 요청 스레드가 함께 읽는 피처 데이터 (갱신 시 새로 만들어 참조 하나로 교체하고, 만든 뒤에는 수정하지 않음)
+# feature_index: (경기 키 -> 행 위치, 피처 행렬, 피처 컬럼, 팀별 as-of 인덱스)
+FeatureState = namedtuple("FeatureState", ["us_data", "long_features", "feature_index", "h2h_index", "fingerprint"])
+
+# HomeElo/AwayElo 출처: 'clubelo' (ClubElo 서비스) 또는 'local' (Understat 결과로 직접 계산)
+ELO_SOURCE = 'clubelo'
+
+# 프로세스 전역 리그별 DataCollector (모든 Streamlit 세션이 공유, 처음 요청된 리그만 로드)
+_collectors = OrderedDict()          # 리그 ID -> DataCollector (최근 사용 순서)
+_collector_lock = threading.Lock()   # _collectors 수정 보호
+_league_locks = {}                   # 리그별 최초 생성 시 중복 빌드 방지
+_refresh_lock = threading.Lock()     # 백그라운드 갱신이 동시에 두 번 돌지 않도록
+_refresh_thread = None
+REFRESH_INTERVAL_SECONDS = 6 * 60 * 60  # 6시간마다 Understat 데이터 갱신
+
+# 동시에 메모리에 둘 리그 수와 프로세스 메모리 상한(MB, None이면 확인 안 함)
+# 넘으면 가장 오래 쓰지 않은 리그부터 내림 (다음 요청 때 스냅샷에서 다시 로드)
+MAX_LOADED_LEAGUES = 2
+COLLECTOR_MEMORY_LIMIT_MB = None
+
+def canonical_team_name(team_name, league=None):
+    # 팀 이름을 Understat 기준 이름으로 통일 (리그별 팀 표는 leagues.py)
+    return canonical_team(team_name, league)
 
 '''
 데이터 수집하는 클래스 -> 통합버전 (Elo, xG, 기타 피처)
 '''
 class DataCollector:
-    def __init__(self):
+    def __init__(self, use_snapshot=True, elo_source=ELO_SOURCE, league=DEFAULT_LEAGUE, offline=False):
+        '''
+        use_snapshot=True: 디스크에 저장된 최신 피처 스냅샷이 있으면 원본을 읽지 않고 바로 사용 (콜드 스타트용)
+        use_snapshot=False: 원본 데이터를 읽어 지문을 비교하고, 바뀐 경우에만 피처를 다시 계산 (갱신용)
+        elo_source: 'clubelo' 또는 'local' (로컬 Elo 엔진)
+        league: 리그 ID 또는 이름 (피처 스냅샷, Elo 상태는 리그별로 따로 저장)
+        offline=True: ClubElo 이력을 soccerdata 디스크 캐시에서만 읽음 (백테스트용, 캐시가 없는 팀은 네트워크로 받음)
+        '''
+        info = get_league(league)
+        self.league = info['id']
+        self.league_code = info['code']
+        self.understat_league = info['understat']
+        self.store_dir = os.path.join(feature_store.STORE_DIR, self.league_code)
+        self.elo_state_path = os.path.join(os.path.dirname(ELO_STATE_PATH), f"elo_state_{self.league_code}.json")
+
+        self.elo_source = elo_source
         self.clubelo = ClubElo()
-        self.elo_cache = {}
-
-        self.us = Understat(leagues=["ENG-Premier League"], seasons=range(2014, 2026))
-        self.us_data = self._load_understat_data()
-
-    def _load_understat_data(self):
-        m = self.us.read_team_match_stats()[[
-            'game_id', 'date', 'home_team', 'away_team',
-            'home_goals', 'away_goals',
-            'home_xg', 'away_xg',
-            'home_points', 'away_points'
-        ]]
+        self.elo_index = EloHistoryIndex(self.clubelo, offline=offline)   # 팀별 Elo 이력 (TTL이 지나면 다시 조회)
+        self.elo_engine = None
+
+        tables, fingerprint = None, None
+        if use_snapshot:
+            tables, fingerprint = feature_store.load_features(FEATURE_VERSION, store_dir=self.store_dir)
+        if tables is None:
+            # 갱신용 생성이면 진행 중인 시즌을 새로 받음
+            tables, fingerprint = self._load_understat_data(refresh=not use_snapshot)
+        self._state = self._make_state(tables['features'], tables['long'], fingerprint)
+
+        if self.elo_source == 'local':
+            self.elo_engine = EloEngine.load(self.elo_state_path)
+            self._update_local_elo(self.long_features)
+
+    # 읽는 쪽은 self._state를 한 번만 읽으면 같은 시점의 피처/인덱스/상대 전적을 봄
+    @property
+    def us_data(self):
+        return self._state.us_data
+
+    @property
+    def long_features(self):
+        # 팀-경기 단위 롤링 피처 (증분 갱신용)
+        return self._state.long_features
+
+    @property
+    def h2h_index(self):
+        # 팀 쌍별 상대 전적
+        return self._state.h2h_index
+
+    @property
+    def feature_fingerprint(self):
+        return self._state.fingerprint
+
+    def _make_state(self, us_data, long_features, fingerprint, h2h_index=None):
+        if h2h_index is None:
+            h2h_index = HeadToHeadIndex(feature_engine.to_match_format(long_features))
+        return FeatureState(
+            us_data, long_features, self._build_feature_index(us_data, long_features), h2h_index, fingerprint
+        )
+
+    def read_match_stats(self, refresh=False):
+        # 시즌별 Understat 파티션을 읽어옴 (없는 시즌은 병렬 수집, refresh=True면 진행 중인 시즌만 새로 받음)
+        # 팀 이름은 이 시점에 한 번만 통일
+        m = understat_ingest.read_match_stats([self.understat_league], refresh=refresh)
+        m['home_team'] = m['home_team'].map(lambda t: canonical_team_name(t, self.league))
+        m['away_team'] = m['away_team'].map(lambda t: canonical_team_name(t, self.league))
+        return m
+
+    def _load_understat_data(self, refresh=False):
+        m = self.read_match_stats(refresh=refresh)
+
+        # 원본이 바뀌지 않았다면 저장된 스냅샷 재사용
+        fingerprint = feature_store.source_fingerprint(m)
+        tables, _ = feature_store.load_features(FEATURE_VERSION, fingerprint, store_dir=self.store_dir)
+        if tables is not None:
+            return tables, fingerprint
+
+        m = m.copy()
         m['date'] = pd.to_datetime(m['date'])
+        long_features = feature_engine.add_rolling_features(feature_engine.to_long_format(m))
+        tables = {
+            'features': feature_engine.to_wide_format(long_features),
+            'long': long_features
+        }
+        self._save_snapshot(tables, fingerprint)
+        return tables, fingerprint
 
-        # 롱 포맷으로 변환
-        home = m.assign(
-            team=m['home_team'], goals=m['home_goals'], GA=m['away_goals'],
-            xg=m['home_xg'], points=m['home_points'], side='home'
-        )[['game_id', 'date', 'team', 'side', 'goals', 'GA', 'xg', 'points']]
-
-        away = m.assign(
-            team=m['away_team'], goals=m['away_goals'], GA=m['home_goals'],
-            xg=m['away_xg'], points=m['away_points'], side='away'
-        )[['game_id', 'date', 'team', 'side', 'goals', 'GA', 'xg', 'points']]
-
-        long_df = pd.concat([home, away], ignore_index=True)
-
-        def add_rolling(g):
-            g = g.sort_values('date', ascending=False)
-            for w in (3, 5):
-                g[f'GF{w}'] = g['goals'].rolling(w, min_periods=1).sum().shift(1)
-                g[f'GA{w}'] = g['GA'].rolling(w, min_periods=1).sum().shift(1)
-                g[f'Form{w}'] = g['points'].rolling(w, min_periods=1).sum().shift(1)
-            g['rolling_xg_5'] = g['xg'].rolling(5, min_periods=1).mean()
-            g['current_xg'] = g['xg']
-            return g
-
-        long_roll = long_df.groupby('team', group_keys=False).apply(add_rolling)
-
-        home_w = long_roll[long_roll['side'] == 'home'][[
-            'game_id', 'date', 'team', 'rolling_xg_5', 'Form3', 'Form5',
-            'GF3', 'GF5', 'GA3', 'GA5', 'current_xg'
-        ]].rename(columns={
-            'team': 'HomeTeam',
-            'rolling_xg_5': 'rolling_xg_home_5',
-            'current_xg': 'h_xg',
-            'Form3': 'Form3Home', 'Form5': 'Form5Home',
-            'GF3': 'GF3Home', 'GF5': 'GF5Home',
-            'GA3': 'GA3Home', 'GA5': 'GA5Home'
-        })
+    def _update_local_elo(self, long_features):
+        # Understat 결과를 로컬 Elo 엔진에 반영하고 조회용 인덱스를 교체
+        matches = feature_engine.to_match_format(long_features)
+        if self.elo_engine.update(matches):
+            try:
+                self.elo_engine.save(self.elo_state_path)
+            except OSError as e:
+                print(f"Elo 상태 저장 중 오류 발생: {e}")
+        self.elo_index = self.elo_engine.to_index()
 
-        away_w = long_roll[long_roll['side'] == 'away'][[
-            'game_id', 'date', 'team', 'rolling_xg_5', 'Form3', 'Form5',
-            'GF3', 'GF5', 'GA3', 'GA5', 'current_xg'
-        ]].rename(columns={
-            'team': 'AwayTeam',
-            'rolling_xg_5': 'rolling_xg_away_5',
-            'current_xg': 'a_xg',
-            'Form3': 'Form3Away', 'Form5': 'Form5Away',
-            'GF3': 'GF3Away', 'GF5': 'GF5Away',
-            'GA3': 'GA3Away', 'GA5': 'GA5Away'
-        })
+    def _save_snapshot(self, tables, fingerprint):
+        try:
+            feature_store.save_features(tables, FEATURE_VERSION, fingerprint, store_dir=self.store_dir)
+        except OSError as e:
+            print(f"피처 스냅샷 저장 중 오류 발생: {e}")
+
+    def append_matches(self, new_matches):
+        """
+        새로 끝난 경기들을 반영해 피처를 증분 갱신합니다.
+        새 경기가 있는 팀의 최근 경기 윈도만 다시 계산하므로 비용이 새 경기 수에 비례하며,
+        결과는 전체 재계산과 같습니다.
+
+        Parameters
+        ----------
+        new_matches : DataFrame
+            read_match_stats()와 같은 컬럼을 가진 경기 기록. 이미 반영된 game_id는 무시
+
+        Returns
+        -------
+        int
+            실제로 반영된 경기 수
+        """
+        state = self._state
+        m = new_matches[MATCH_COLUMNS].dropna(subset=['home_goals', 'away_goals'])
+        m = m[~m['game_id'].isin(state.long_features['game_id'])].drop_duplicates('game_id')
+        if m.empty:
+            return 0
+
+        m = m.copy()
+        m['date'] = pd.to_datetime(m['date'])
+        long_features, touched = feature_engine.update_rolling_features(
+            state.long_features, feature_engine.to_long_format(m)
+        )
+
+        # 피처가 바뀐 경기만 경기 단위로 다시 만들어 교체
+        changed = feature_engine.to_wide_format(long_features[long_features['game_id'].isin(touched)])
+        # 빈 프레임은 빼고 합침 (pandas가 빈 프레임의 dtype 처리 변경을 경고)
+        kept = state.us_data[~state.us_data['game_id'].isin(touched)]
+        us_data = pd.concat([f for f in (kept, changed) if not f.empty], ignore_index=True)
+        # 새 팀이 생기면 카테고리가 달라져 object로 합쳐지므로 다시 압축
+        us_data = feature_engine.compact_features(
+            us_data.sort_values(['MatchDate', 'game_id'], kind='mergesort', ignore_index=True)
+        )
+
+        fingerprint = hashlib.sha1(
+            (str(state.fingerprint) + feature_store.source_fingerprint(m)).encode()
+        ).hexdigest()
+
+        # 상대 전적은 복사본에 반영 (요청 스레드가 읽는 기존 인덱스는 그대로 둠)
+        h2h_index = state.h2h_index.copy()
+        h2h_index.update(m)
+
+        # 프레임, 인덱스, 상대 전적을 모두 만든 뒤 참조 하나로 교체 (읽는 쪽은 항상 같은 시점의 상태를 봄)
+        self._state = self._make_state(us_data, long_features, fingerprint, h2h_index)
+        self._save_snapshot({'features': us_data, 'long': long_features}, fingerprint)
+        if self.elo_engine is not None:
+            self._update_local_elo(long_features)
+        return len(m)
 
-        feat_df = pd.merge(home_w, away_w, on=['game_id', 'date'], how='inner')
-        feat_df = feat_df.rename(columns={'date': 'MatchDate'})
-        feat_df['MatchDate'] = feat_df['MatchDate'].dt.date
+    def unknown_teams(self, team_names):
+        """
+        기준 이름으로 통일해도 이 리그의 Understat 기록에 없는 팀 이름 목록
+        (비어 있지 않으면 팀 표(leagues.py)에 별칭이 빠진 것, 또는 처음 승격한 팀)
+        """
+        known = set(self.long_features['team'].astype(object))
+        return sorted({t for t in team_names if canonical_team_name(t, self.league) not in known})
 
-        # 파생 변수
-        feat_df['xG_diff'] = feat_df['h_xg'] - feat_df['a_xg']
-        feat_df['xg_margin'] = feat_df['xG_diff'].abs()
-        feat_df['xg_ratio'] = feat_df['h_xg'] / (feat_df['a_xg'] + 1e-6)
+    def head_to_head(self, team_a, team_b, match_date=None, last_n=5):
+        """team_a 기준 team_b와의 상대 전적 (match_date 이전 맞대결만, 기록이 없으면 None)"""
+        return self.h2h_index.lookup(
+            canonical_team_name(team_a, self.league), canonical_team_name(team_b, self.league), match_date, last_n
+        )
 
-        return feat_df
+    def _elo_team_name(self, team_name):
+        # 로컬 Elo 엔진은 Understat 기준 이름을 사용
+        return canonical_team_name(team_name, self.league) if self.elo_engine is not None else team_name
 
     def get_team_elo(self, team_name, match_date):
+        # 경기 전날 기준 Elo
         d = pd.to_datetime(match_date) - pd.Timedelta(days=1)
-        if d not in self.elo_cache:
-            df = self.clubelo.read_by_date(date=d).reset_index()
-            self.elo_cache[d] = df
-        df = self.elo_cache[d]
-        match = df[df['team'].str.lower() == team_name.lower()]
-        return match.iloc[0]['elo'] if not match.empty else None
+        return self.elo_index.lookup(self._elo_team_name(team_name), d)
+
+    def get_team_elos(self, team_names, match_dates):
+        # 여러 (팀, 경기 날짜)의 경기 전날 기준 Elo를 한 번에 조회 (없으면 NaN)
+        days = pd.to_datetime(pd.Series(list(match_dates))) - pd.Timedelta(days=1)
+        return self.elo_index.lookup_many([self._elo_team_name(t) for t in team_names], days)
 
     def collect_features(self, match_date, home_team, away_team):
         dt = pd.to_datetime(match_date)
 
-        with ThreadPoolExecutor() as exe:
-            f_elo_h = exe.submit(self.get_team_elo, home_team, dt)
-            f_elo_a = exe.submit(self.get_team_elo, away_team, dt)
-
-            elo_h = f_elo_h.result()
-            elo_a = f_elo_a.result()
+        # 두 팀의 Elo 이력을 (없으면) 병렬로 받아온 뒤 조회
+        self.elo_index.preload([self._elo_team_name(home_team), self._elo_team_name(away_team)])
+        elo_h = self.get_team_elo(home_team, dt)
+        elo_a = self.get_team_elo(away_team, dt)
 
         result = {
             'MatchDate': dt.date(),
@@ -122,25 +263,213 @@ class DataCollector:
         df = pd.DataFrame([result])
         return self._merge_understat_features(df)
 
-    def _merge_understat_features(self, df):
+    def collect_features_batch(self, fixtures, pre_match=False):
+        """
+        여러 경기의 피처를 한 번에 수집합니다.
+        Elo는 팀별로 묶어 as-of 조회하고, Understat 피처는 인덱스/as-of로 한 번에 붙입니다.
+
+        Parameters
+        ----------
+        fixtures : DataFrame
+            MatchDate, HomeTeam, AwayTeam 컬럼을 가진 경기 목록
+        pre_match : bool
+            True면 이미 치른 경기도 예정 경기와 같이 경기 전 정보(as-of)만 사용 (백테스트용)
+
+        Returns
+        -------
+        DataFrame
+            collect_features()와 같은 컬럼을 가진 경기별 피처 (입력 순서 유지)
+        """
+        dates = pd.to_datetime(fixtures['MatchDate']).reset_index(drop=True)
+        home = fixtures['HomeTeam'].reset_index(drop=True)
+        away = fixtures['AwayTeam'].reset_index(drop=True)
+
+        n = len(dates)
+        elos = self.get_team_elos(pd.concat([home, away], ignore_index=True), pd.concat([dates, dates], ignore_index=True))
+        elo_h, elo_a = elos[:n], elos[n:]
+
+        df = pd.DataFrame({
+            'MatchDate': dates.dt.date,
+            'HomeTeam': home,
+            'AwayTeam': away,
+            'HomeElo': elo_h,
+            'AwayElo': elo_a,
+            'elo_diff': elo_h - elo_a
+        })
+        return self._merge_understat_features(df, pre_match)
+
+    def _build_feature_index(self, us_data, long_features):
+        """
+        (경기 일 수, HomeTeam, AwayTeam) -> 행 위치 해시 인덱스와 피처 행렬,
+        그리고 아직 치르지 않은 경기를 위한 팀별 as-of 인덱스를 만들어 반환합니다.
+        팀 이름은 로드 시점에 이미 Understat 기준으로 통일되어 있습니다.
+        """
+        columns = [c for c in us_data.columns if c not in FEATURE_KEYS]
+        keys = zip(
+            feature_engine.day_numbers(us_data['MatchDate']).tolist(),
+            us_data['HomeTeam'].astype(object),
+            us_data['AwayTeam'].astype(object)
+        )
+        positions = {key: i for i, key in enumerate(keys)}
+        # 이전 merge + fillna(0)과 같은 값이 나오도록 NaN은 0으로 (피처 프레임과 같은 float32로 보관)
+        values = np.nan_to_num(us_data[columns].to_numpy(dtype=np.float32))
+        form_index = feature_engine.TeamFormIndex(long_features)
+        return positions, values, columns, form_index
+
+    def lookup_understat_features(self, match_date, home_team, away_team):
+        """한 경기의 Understat 피처 벡터를 O(1)로 조회 (없으면 None)"""
+        positions, values, _, _ = self._state.feature_index
+        key = (
+            int(feature_engine.day_numbers([match_date])[0]),
+            canonical_team_name(home_team, self.league), canonical_team_name(away_team, self.league)
+        )
+        pos = positions.get(key)
+        return None if pos is None else values[pos]
+
+    def _merge_understat_features(self, df, pre_match=False):
+        """
+        경기 목록(MatchDate, HomeTeam, AwayTeam, ...)에 Understat 피처를 붙입니다.
+        이미 치른 경기는 인덱스에서 바로 가져오고, 기록이 없는 경기(예정 경기)는
+        경기 날짜 이전의 마지막 윈도를 as-of로 사용합니다.
+        pre_match=True면 모든 경기를 as-of로 만들어 경기 당일 xG가 섞이지 않게 합니다.
+        """
+        positions, values, columns, form_index = self._state.feature_index
+
         df = df.copy()
-        team_name_map = {
-            'Man United': 'Manchester United',
-            'Tottenham': 'Tottenham',
-            'Spurs': 'Tottenham',
-            'Wolves': 'Wolverhampton Wanderers',
-            'Leeds': 'Leeds United',
-            'Newcastle': 'Newcastle United',
-            'Nottm Forest': 'Nottingham Forest',
-            'Brighton': 'Brighton',
-        }
+        df['HomeTeam'] = df['HomeTeam'].map(lambda t: canonical_team_name(t, self.league))
+        df['AwayTeam'] = df['AwayTeam'].map(lambda t: canonical_team_name(t, self.league))
 
-        df['HomeTeam'] = df['HomeTeam'].replace(team_name_map)
-        df['AwayTeam'] = df['AwayTeam'].replace(team_name_map)
+        keys = zip(feature_engine.day_numbers(df['MatchDate']).tolist(), df['HomeTeam'], df['AwayTeam'])
+        rows = np.fromiter((positions.get(k, -1) for k in keys), dtype=np.int64, count=len(df))
+        found = (rows >= 0) & (not pre_match)
 
-        self.us_data['HomeTeam'] = self.us_data['HomeTeam'].replace(team_name_map)
-        self.us_data['AwayTeam'] = self.us_data['AwayTeam'].replace(team_name_map)
+        feats = np.zeros((len(df), len(columns)))
+        feats[found] = values[rows[found]]
 
-        df_merged = pd.merge(df, self.us_data, on=['MatchDate', 'HomeTeam', 'AwayTeam'], how='left')
+        if form_index is not None and not found.all():
+            asof = feature_engine.build_asof_features(form_index, df[~found])
+            col_pos = {c: i for i, c in enumerate(columns)}
+            for c in asof.columns:
+                feats[~found, col_pos[c]] = asof[c].to_numpy()
+        df_merged = pd.concat([df, pd.DataFrame(feats, columns=columns, index=df.index)], axis=1)
         df_merged.fillna(0, inplace=True)
         return df_merged
+
+
+def _memory_mb():
+    # 현재 프로세스의 상주 메모리(RSS, MB). /proc이 없는 환경이면 None
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _evict_collectors(keep):
+    """
+    리그 수/메모리 상한을 넘으면 가장 오래 쓰지 않은 리그의 DataCollector를 내립니다.
+    방금 사용한 리그(keep)는 내리지 않습니다. _collector_lock 안에서 호출
+    """
+    while len(_collectors) > 1:
+        over_count = len(_collectors) > MAX_LOADED_LEAGUES
+        memory = _memory_mb() if COLLECTOR_MEMORY_LIMIT_MB is not None else None
+        over_memory = memory is not None and memory > COLLECTOR_MEMORY_LIMIT_MB
+        if not (over_count or over_memory):
+            break
+        oldest = next(iter(_collectors))
+        if oldest == keep:
+            break
+        _collectors.pop(oldest)
+        print(f"DataCollector 리그 {oldest} 메모리에서 내림 (로드된 리그 {len(_collectors)}개)")
+
+
+def loaded_leagues():
+    """현재 메모리에 올라와 있는 리그 ID 목록 (오래 쓰지 않은 순)"""
+    with _collector_lock:
+        return list(_collectors)
+
+
+def get_collector(league=DEFAULT_LEAGUE):
+    """
+    프로세스 전역에서 공유하는 리그별 DataCollector를 반환합니다.
+    리그마다 처음 호출될 때만 생성하고(디스크 스냅샷에서 로드), 이후에는 만들어진 인스턴스를 그대로 사용합니다.
+    한 리그를 만드는 동안 다른 리그 요청은 기다리지 않습니다.
+    """
+    league = league_id(league)
+    with _collector_lock:
+        collector = _collectors.get(league)
+        if collector is not None:
+            _collectors.move_to_end(league)
+            return collector
+        lock = _league_locks.setdefault(league, threading.Lock())
+
+    with lock:
+        with _collector_lock:
+            collector = _collectors.get(league)
+        if collector is None:
+            collector = DataCollector(league=league)
+        with _collector_lock:
+            collector = _collectors.setdefault(league, collector)
+            _collectors.move_to_end(league)
+            _evict_collectors(keep=league)
+        return collector
+
+
+def refresh_collector(full=False, league=DEFAULT_LEAGUE):
+    """
+    리그의 전역 DataCollector를 최신 데이터로 갱신합니다.
+
+    - full=False: 원본을 다시 읽어 새로 끝난 경기만 증분 반영
+    - full=True: 새로운 DataCollector를 별도로 만든 뒤 전역 참조를 한 번에 교체
+    어느 쪽이든 계산이 끝나기 전까지는 기존 데이터가 계속 요청을 처리합니다.
+    """
+    league = league_id(league)
+    with _refresh_lock:
+        with _collector_lock:
+            current = _collectors.get(league)
+        if current is not None and not full:
+            added = current.append_matches(current.read_match_stats(refresh=True))
+            # 오래된 ClubElo 이력도 다시 받음 (로컬 Elo 엔진은 append_matches에서 갱신됨)
+            current.elo_index.refresh()
+            if added:
+                print(f"DataCollector 증분 갱신 ({current.league_code}): 새 경기 {added}개 반영")
+            return current
+
+        # 원본을 다시 읽어 바뀐 경우에만 피처를 재계산
+        new_collector = DataCollector(use_snapshot=False, league=league)
+        with _collector_lock:
+            _collectors[league] = new_collector   # 참조 교체
+            _collectors.move_to_end(league)
+            _evict_collectors(keep=league)
+    return new_collector
+
+
+def _refresh_loop(interval):
+    # 시작 시에는 기본 리그만 미리 로드 (다른 리그는 처음 요청될 때 로드)
+    get_collector()
+    while True:
+        time.sleep(interval)
+        # 메모리에 올라와 있는 리그만 갱신
+        for league in loaded_leagues():
+            try:
+                refresh_collector(league=league)
+            except Exception as e:
+                # 갱신에 실패하면 기존 데이터를 그대로 사용
+                print(f"DataCollector 갱신 중 오류 발생 (리그 {league}): {e}")
+
+
+def start_background_refresh(interval=REFRESH_INTERVAL_SECONDS):
+    """
+    기본 리그의 DataCollector를 미리 만들어 두고, 로드된 리그들을 주기적으로 갱신하는 데몬 스레드를 시작합니다.
+    여러 번 호출해도 스레드는 하나만 실행됩니다.
+    """
+    global _refresh_thread
+    with _collector_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return _refresh_thread
+        _refresh_thread = threading.Thread(
+            target=_refresh_loop, args=(interval,), name="collector-refresh", daemon=True
+        )
+        _refresh_thread.start()
+    return _refresh_thread
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from elo_index import EloHistoryIndex
+
+'''
+Understat 경기 결과로 모든 팀의 Elo 레이팅을 직접 계산하는 로컬 Elo 엔진
+- ClubElo 서비스 없이도 HomeElo/AwayElo를 제공
+- 같은 날짜의 경기들은 NumPy 배열 연산으로 한 번에 갱신
+- 상태를 파일로 저장하고, 새 경기만 증분 반영
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+ELO_STATE_PATH = os.path.join(PROJECT_ROOT, "data", "elo_state.json")
+
+# 계산 방식이 바뀌면 올려서 저장된 상태를 버리고 처음부터 다시 계산
+ENGINE_VERSION = 2
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+_BEGIN_DAY = int((np.datetime64('1900-01-01', 'D') - _EPOCH).astype(np.int64))
+_END_DAY = int((np.datetime64('2100-01-01', 'D') - _EPOCH).astype(np.int64))
+
+
+class EloEngine:
+    def __init__(self, k_factor=20.0, home_advantage=65.0, initial_rating=1500.0):
+        self.k_factor = float(k_factor)
+        self.home_advantage = float(home_advantage)
+        self.initial_rating = float(initial_rating)
+
+        self.teams = []            # 팀 이름 목록 (인덱스 = 팀 ID)
+        self._team_ids = {}
+        self.ratings = np.zeros(0)
+        self.game_ids = set()      # 이미 반영한 경기
+        self.last_day = None       # 마지막으로 반영한 경기 날짜 (일수)
+
+        # 경기 후 레이팅 이력: (팀 ID, 적용 시작일, 레이팅)
+        self._hist_team = []
+        self._hist_day = []
+        self._hist_rating = []
+
+    @property
+    def params(self):
+        return {
+            'k_factor': self.k_factor,
+            'home_advantage': self.home_advantage,
+            'initial_rating': self.initial_rating
+        }
+
+    def _team_id(self, name):
+        if name not in self._team_ids:
+            self._team_ids[name] = len(self.teams)
+            self.teams.append(name)
+            self.ratings = np.append(self.ratings, self.initial_rating)
+        return self._team_ids[name]
+
+    def reset(self):
+        self.__init__(**self.params)
+
+    def update(self, matches: pd.DataFrame) -> int:
+        """
+        경기 결과(game_id, date, home_team, away_team, home_goals, away_goals)를 반영합니다.
+        이미 반영한 game_id는 건너뛰며, 마지막 반영일보다 이른 경기가 새로 들어오면
+        결과가 달라지므로 처음부터 다시 계산합니다.
+
+        Returns
+        -------
+        int
+            새로 반영한 경기 수
+        """
+        m = matches.dropna(subset=['home_goals', 'away_goals'])
+        new = m[~m['game_id'].isin(self.game_ids)]
+        if new.empty:
+            return 0
+
+        days = (pd.to_datetime(new['date']).values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+        if self.last_day is not None and days.min() < self.last_day:
+            self.reset()
+            new = m.drop_duplicates('game_id')
+            days = (pd.to_datetime(new['date']).values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+
+        order = np.lexsort((new['game_id'].to_numpy(), days))
+        new = new.iloc[order]
+        days = days[order]
+
+        home = np.array([self._team_id(t) for t in new['home_team']], dtype=np.int64)
+        away = np.array([self._team_id(t) for t in new['away_team']], dtype=np.int64)
+        hg = new['home_goals'].to_numpy(dtype=np.float64)
+        ag = new['away_goals'].to_numpy(dtype=np.float64)
+        score = np.where(hg > ag, 1.0, np.where(hg == ag, 0.5, 0.0))
+
+        # 같은 날 한 팀이 두 번 이상 나오는 경우를 대비해 (날짜, 배치 단계)로 나눔
+        # 단계 순으로 다시 정렬해도 팀별 경기 순서는 그대로이고, 한 배치 안에서는 팀이 겹치지 않음
+        level = self._batch_levels(days, home, away)
+        regroup = np.lexsort((level, days))
+        home, away, score, days, level = home[regroup], away[regroup], score[regroup], days[regroup], level[regroup]
+        bounds = np.flatnonzero((np.diff(days) != 0) | (np.diff(level) != 0)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(days)]))
+
+        r = self.ratings
+        for s, e in zip(starts, ends):
+            h = home[s:e]
+            a = away[s:e]
+            expected = 1.0 / (1.0 + 10.0 ** ((r[a] - r[h] - self.home_advantage) / 400.0))
+            delta = self.k_factor * (score[s:e] - expected)
+            r[h] += delta
+            r[a] -= delta
+
+            self._hist_team.append(np.concatenate((h, a)))
+            self._hist_day.append(np.concatenate((days[s:e], days[s:e])))
+            self._hist_rating.append(np.concatenate((r[h], r[a])))
+
+        self.ratings = r
+        self.game_ids.update(new['game_id'].tolist())
+        self.last_day = int(days[-1])
+        return len(new)
+
+    @staticmethod
+    def _batch_levels(days, home, away):
+        """
+        (날짜, game_id) 순으로 정렬된 경기의 배치 단계: 같은 날 두 팀이 앞서 치른 경기의 단계 중 큰 값 + 1
+        같은 단계의 경기끼리는 팀이 겹치지 않으므로 한 번에 갱신해도 경기별 순차 계산과 같음
+        """
+        level = np.empty(len(days), dtype=np.int64)
+        last = {}   # (날짜, 팀) -> 그 팀의 마지막 경기 단계
+        for i, (d, h, a) in enumerate(zip(days.tolist(), home.tolist(), away.tolist())):
+            level[i] = max(last.get((d, h), -1), last.get((d, a), -1)) + 1
+            last[(d, h)] = last[(d, a)] = level[i]
+        return level
+
+    def rating(self, team_name):
+        """현재 레이팅 (모르는 팀이면 None)"""
+        i = self._team_ids.get(team_name)
+        return float(self.ratings[i]) if i is not None else None
+
+    def current_ratings(self) -> pd.Series:
+        return pd.Series(self.ratings, index=self.teams, name='elo').sort_values(ascending=False)
+
+    def to_index(self) -> EloHistoryIndex:
+        """경기 전후 레이팅 이력을 날짜 구간 인덱스로 변환 (as-of 조회용)"""
+        index = EloHistoryIndex()
+        if not self._hist_team:
+            return index
+
+        team = np.concatenate(self._hist_team)
+        day = np.concatenate(self._hist_day)
+        rating = np.concatenate(self._hist_rating)
+        order = np.lexsort((day, team))
+        team, day, rating = team[order], day[order], rating[order]
+
+        for tid, pos in pd.Series(team).groupby(team).indices.items():
+            # 첫 경기 이전은 초기 레이팅, 각 경기 후 레이팅은 다음 경기 전날까지 유효
+            starts = np.concatenate(([_BEGIN_DAY], day[pos]))
+            ends = np.concatenate((day[pos] - 1, [_END_DAY]))
+            elos = np.concatenate(([self.initial_rating], rating[pos]))
+            index.add_history(
+                self.teams[tid],
+                _EPOCH + starts.astype('timedelta64[D]'),
+                _EPOCH + ends.astype('timedelta64[D]'),
+                elos
+            )
+        return index
+
+    def save(self, path=ELO_STATE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        hist = (
+            np.concatenate(self._hist_team).tolist() if self._hist_team else [],
+            np.concatenate(self._hist_day).tolist() if self._hist_day else [],
+            np.concatenate(self._hist_rating).tolist() if self._hist_rating else [],
+        )
+        state = {
+            'version': ENGINE_VERSION,
+            'params': self.params,
+            'teams': self.teams,
+            'ratings': self.ratings.tolist(),
+            'game_ids': sorted(int(g) for g in self.game_ids),
+            'last_day': self.last_day,
+            'history': {'team': hist[0], 'day': hist[1], 'rating': hist[2]}
+        }
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=ELO_STATE_PATH, **params):
+        """
+        저장된 상태를 불러옵니다. 파일이 없거나 계산 방식/파라미터가 다르면 빈 엔진을 반환
+        (이 경우 update()가 처음부터 다시 계산)
+        """
+        engine = cls(**params)
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return engine
+        if state.get('version') != ENGINE_VERSION or state.get('params') != engine.params:
+            return engine
+
+        engine.teams = list(state['teams'])
+        engine._team_ids = {t: i for i, t in enumerate(engine.teams)}
+        engine.ratings = np.asarray(state['ratings'], dtype=np.float64)
+        engine.game_ids = set(state['game_ids'])
+        engine.last_day = state['last_day']
+        hist = state['history']
+        if hist['team']:
+            engine._hist_team = [np.asarray(hist['team'], dtype=np.int64)]
+            engine._hist_day = [np.asarray(hist['day'], dtype=np.int64)]
+            engine._hist_rating = [np.asarray(hist['rating'], dtype=np.float64)]
+        return engine
+
+
+if __name__ == "__main__":
+    # 2014 시즌 이후 전체 경기 재계산 시간 측정
+    from soccerdata import Understat
+
+    us = Understat(leagues=["ENG-Premier League"], seasons=range(2014, 2026))
+    matches = us.read_team_match_stats()[[
+        'game_id', 'date', 'home_team', 'away_team', 'home_goals', 'away_goals'
+    ]].reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    engine = EloEngine()
+    n = engine.update(matches)
+    index = engine.to_index()
+    elapsed = time.perf_counter() - t0
+    print(f"{n}경기 재계산: {elapsed * 1000:.1f} ms")
+    print(engine.current_ratings().head(10))
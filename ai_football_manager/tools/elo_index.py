@@ -0,0 +1,172 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+팀별 Elo 이력을 받아와 구간(from~to) 배열로 보관하고,
+임의의 날짜에 대한 Elo를 이진 탐색으로 찾는 인덱스
+- 받아 온 이력은 HISTORY_TTL_SECONDS가 지나면 다시 받음 (ClubElo는 매일 새 구간이 추가됨)
+- ClubElo에 없는 팀(soccerdata가 ValueError로 알림)은 빈 이력으로 기록해 TTL 동안 다시 조회하지 않음
+- 네트워크/HTTP 오류로 실패하면 기록하지 않고 (기존 이력이 있으면 유지) RETRY_SECONDS 뒤에 다시 시도
+- 팀별 이력은 (시작일, 종료일, Elo) 튜플 하나로 교체하므로, 갱신 중에도 조회는 한 시점의 이력만 봄
+- offline=True면 soccerdata 디스크 캐시만 읽음 (캐시가 오래되어도 다시 받지 않음, 백테스트용)
+'''
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+HISTORY_TTL_SECONDS = 12 * 60 * 60   # 이력을 다시 받기까지의 시간
+RETRY_SECONDS = 5 * 60               # 조회에 실패한 팀을 다시 시도하기까지의 시간
+
+OFFLINE_MAX_AGE_DAYS = 100 * 365    # offline=True일 때 soccerdata에 넘기는 캐시 유효 기간
+
+# ClubElo에 없는 팀 이름일 때 soccerdata가 내는 예외 (다시 조회해도 결과가 같음)
+# 네트워크/HTTP 오류(OSError, requests 예외)는 ValueError를 함께 상속하더라도 일시적인 오류로 봄
+NOT_FOUND_ERRORS = (ValueError, LookupError)
+
+
+def _is_not_found(error) -> bool:
+    return isinstance(error, NOT_FOUND_ERRORS) and not isinstance(error, OSError)
+
+
+def cached_history_path(clubelo, team_name):
+    """soccerdata가 팀의 ClubElo 이력을 캐시하는 파일 경로 (팀 이름에서 공백을 뺀 이름, 캐시 폴더를 모르면 None)"""
+    data_dir = getattr(clubelo, 'data_dir', None)
+    if data_dir is None:
+        return None
+    return os.path.join(str(data_dir), f"{team_name.replace(' ', '')}.csv")
+
+
+def missing_from_cache(clubelo, team_names) -> list:
+    """디스크에 ClubElo 이력 캐시가 없는 팀 이름 목록"""
+    missing = []
+    for team in sorted({t for t in team_names if t}):
+        path = cached_history_path(clubelo, team)
+        if path is None or not os.path.exists(path):
+            missing.append(team)
+    return missing
+
+
+def _to_days(dates) -> np.ndarray:
+    """날짜(스칼라/배열)를 1970-01-01 기준 일수(int64) 배열로 변환"""
+    values = pd.to_datetime(pd.Series(np.atleast_1d(dates))).values.astype('datetime64[D]')
+    return (values - _EPOCH).astype(np.int64)
+
+
+class EloHistoryIndex:
+    def __init__(self, clubelo=None, ttl=HISTORY_TTL_SECONDS, offline=False):
+        self.clubelo = clubelo
+        self.ttl = ttl
+        self.offline = offline
+        # 팀 이름(소문자) -> (시작일, 종료일, Elo) NumPy 배열 튜플 (교체만 하고 수정하지 않음)
+        self._history = {}
+        self._names = {}          # 팀 이름(소문자) -> 조회에 쓴 원래 이름
+        self._fetched_at = {}     # 팀 이름(소문자) -> 이력을 받은 시각
+        self._retry_after = {}    # 팀 이름(소문자) -> 실패 후 다시 시도할 수 있는 시각
+        self._lock = threading.Lock()
+
+    def __contains__(self, team_name):
+        return team_name.lower() in self._history
+
+    def add_history(self, team_name, starts, ends, elos):
+        """한 팀의 Elo 구간 이력을 추가(교체)합니다. 시작일 기준으로 정렬해 보관"""
+        starts = _to_days(starts)
+        ends = _to_days(ends)
+        elos = np.asarray(elos, dtype=np.float64)
+        order = np.argsort(starts, kind='stable')
+        history = (starts[order], ends[order], elos[order])
+        key = team_name.lower()
+        with self._lock:
+            self._history[key] = history
+            self._names[key] = team_name
+            self._fetched_at[key] = time.time()
+            self._retry_after.pop(key, None)
+
+    def _fetch(self, team_name):
+        try:
+            if self.offline:
+                hist = self.clubelo.read_team_history(team_name, max_age=OFFLINE_MAX_AGE_DAYS)
+            else:
+                hist = self.clubelo.read_team_history(team_name)
+        except Exception as e:
+            if _is_not_found(e):
+                # ClubElo에 없는 팀: 빈 이력으로 기록해 TTL 동안 반복 조회하지 않음
+                print(f"ClubElo에 없는 팀 ({team_name}): {e}")
+                self.add_history(team_name, [], [], [])
+                return
+            # 일시적인 오류일 수 있으므로 빈 이력으로 기록하지 않음 (기존 이력은 그대로 사용)
+            print(f"Elo 이력 조회 중 오류 발생 ({team_name}): {e}")
+            with self._lock:
+                self._retry_after[team_name.lower()] = time.time() + RETRY_SECONDS
+            return
+
+        if hist is None or hist.empty:
+            # ClubElo에 없는 팀도 기록해 두어 TTL 동안 같은 팀을 반복 조회하지 않음
+            self.add_history(team_name, [], [], [])
+            return
+        hist = hist.reset_index()
+        self.add_history(team_name, hist['from'], hist['to'], hist['elo'])
+
+    def _needs_fetch(self, team_name, now):
+        key = team_name.lower()
+        if now < self._retry_after.get(key, 0):
+            return False
+        fetched_at = self._fetched_at.get(key)
+        return fetched_at is None or now - fetched_at > self.ttl
+
+    def preload(self, team_names):
+        """없거나 TTL이 지난 팀들의 전체 Elo 이력을 병렬로 받아옵니다."""
+        if self.clubelo is None:
+            return
+        now = time.time()
+        missing = list({t for t in team_names if t and self._needs_fetch(t, now)})
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as exe:
+            list(exe.map(self._fetch, missing))
+
+    def refresh(self):
+        """이미 받아 둔 팀 중 TTL이 지난 팀의 이력을 다시 받아옵니다 (주기적 갱신용)"""
+        with self._lock:
+            teams = list(self._names.values())
+        self.preload(teams)
+
+    def lookup(self, team_name, date):
+        """date 시점의 Elo (해당 날짜를 포함하는 구간이 없으면 None)"""
+        self.preload([team_name])
+        history = self._history.get(team_name.lower())
+        if history is None or len(history[0]) == 0:
+            return None
+        starts, ends, elos = history
+
+        day = _to_days(date)[0]
+        i = np.searchsorted(starts, day, side='right') - 1
+        if i < 0 or day > ends[i]:
+            return None
+        return float(elos[i])
+
+    def lookup_many(self, team_names, dates) -> np.ndarray:
+        """
+        여러 (팀, 날짜) 쌍의 Elo를 한 번에 찾는 as-of 조인.
+        팀별로 묶어서 searchsorted 한 번으로 처리하며, 찾지 못한 값은 NaN
+        """
+        teams = pd.Series(list(team_names), dtype=object)
+        days = _to_days(dates)
+        self.preload(teams.dropna().unique())
+
+        out = np.full(len(teams), np.nan)
+        keys = teams.str.lower()
+        for key, pos in keys.groupby(keys).indices.items():
+            history = self._history.get(key)
+            if history is None or len(history[0]) == 0:
+                continue
+            starts, ends, elos = history
+            d = days[pos]
+            i = np.searchsorted(starts, d, side='right') - 1
+            ok = i >= 0
+            i = np.clip(i, 0, None)
+            ok &= d <= ends[i]
+            out[pos] = np.where(ok, elos[i], np.nan)
+        return out
@@ -0,0 +1,353 @@
+import time
+import numpy as np
+import pandas as pd
+
+'''
+Understat 경기 기록으로부터 팀별 롤링 피처를 계산하는 모듈 (벡터화 버전)
+- (team, date) 순으로 정렬된 롱 포맷 프레임 전체를 한 번에 계산
+- 모든 롤링 피처는 해당 경기 "이전" 경기들만 사용 (미래 데이터 누수 없음)
+'''
+
+# 피처 계산 코드가 바뀌면 올려서 기존 스냅샷을 무효화
+FEATURE_VERSION = 4
+
+# 각 피처의 (입력 컬럼, 윈도 크기, 집계 방식)
+ROLLING_FEATURES = {
+    'GF3': ('goals', 3, 'sum'),
+    'GF5': ('goals', 5, 'sum'),
+    'GA3': ('GA', 3, 'sum'),
+    'GA5': ('GA', 5, 'sum'),
+    'Form3': ('points', 3, 'sum'),
+    'Form5': ('points', 5, 'sum'),
+    'rolling_xg_5': ('xg', 5, 'mean'),
+}
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+MAX_WINDOW = max(w for _, w, _ in ROLLING_FEATURES.values())
+
+LONG_COLUMNS = ['game_id', 'date', 'team', 'side', 'goals', 'GA', 'xg', 'points']
+TEAM_COLUMNS = ['HomeTeam', 'AwayTeam']
+SIDE_COLUMNS = ['rolling_xg_5', 'Form3', 'Form5', 'GF3', 'GF5', 'GA3', 'GA5', 'current_xg']
+
+
+def to_long_format(m: pd.DataFrame) -> pd.DataFrame:
+    """경기 단위(홈/원정 한 행) 프레임을 팀-경기 단위 롱 포맷으로 변환"""
+    home = m.assign(
+        team=m['home_team'], goals=m['home_goals'], GA=m['away_goals'],
+        xg=m['home_xg'], points=m['home_points'], side='home'
+    )[LONG_COLUMNS]
+
+    away = m.assign(
+        team=m['away_team'], goals=m['away_goals'], GA=m['home_goals'],
+        xg=m['away_xg'], points=m['away_points'], side='away'
+    )[LONG_COLUMNS]
+
+    long_df = pd.concat([home, away], ignore_index=True)
+    return long_df.sort_values(['team', 'date', 'game_id'], kind='mergesort', ignore_index=True)
+
+
+def _group_starts(teams: np.ndarray) -> np.ndarray:
+    """팀별로 정렬된 배열에서 각 행이 속한 그룹의 시작 위치를 반환"""
+    n = len(teams)
+    is_start = np.ones(n, dtype=bool)
+    if n > 1:
+        is_start[1:] = teams[1:] != teams[:-1]
+    return np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+
+
+def trailing_window(values: np.ndarray, starts: np.ndarray, window: int,
+                    how: str = 'sum', include_current: bool = False) -> np.ndarray:
+    """
+    그룹(팀)별 직전 window 경기의 합/평균을 누적합 차이로 한 번에 계산합니다.
+
+    include_current=False이면 i번째 행의 값은 i 이전 경기들만 사용하고 (경기 전 피처),
+    True이면 i번째 경기까지 포함합니다 (다음 경기를 위한 피처).
+    NaN은 건너뛰며, 윈도 안에 유효한 값이 하나도 없으면 NaN을 반환합니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+
+    idx = np.arange(len(values))
+    hi = idx + 1 if include_current else idx
+    lo = np.maximum(hi - window, starts)
+
+    total = csum[hi] - csum[lo]
+    count = ccnt[hi] - ccnt[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = total / count if how == 'mean' else total
+    return np.where(count > 0, out, np.nan)
+
+
+def add_rolling_features(long_df: pd.DataFrame, include_current: bool = False) -> pd.DataFrame:
+    """(team, date) 순으로 정렬된 롱 포맷 프레임에 롤링 피처 컬럼을 추가"""
+    out = long_df.copy()
+    starts = _group_starts(out['team'].to_numpy())
+    for name, (col, window, how) in ROLLING_FEATURES.items():
+        out[name] = trailing_window(out[col].to_numpy(), starts, window, how, include_current)
+    out['current_xg'] = out['xg']
+    return out
+
+
+def update_rolling_features(long_roll: pd.DataFrame, new_long: pd.DataFrame):
+    """
+    기존 롤링 피처(long_roll)에 새 경기(new_long, 롱 포맷)를 반영합니다.
+    새 경기가 있는 팀만, 그 팀의 가장 이른 새 경기 직전 MAX_WINDOW 경기를 문맥으로 붙여 다시 계산하므로
+    전체 재계산과 같은 결과를 새 경기 수에 비례하는 비용으로 얻습니다.
+
+    Returns
+    -------
+    (DataFrame, ndarray)
+        갱신된 롱 포맷 프레임과 피처가 바뀐 game_id 목록
+    """
+    new_long = new_long.sort_values(['team', 'date', 'game_id'], kind='mergesort', ignore_index=True)
+    cutoff = new_long.groupby('team')['date'].min()
+
+    affected = long_roll['team'].isin(cutoff.index)
+    hist = long_roll.loc[affected, LONG_COLUMNS]
+    before = hist['date'] < hist['team'].map(cutoff)
+
+    # 새 경기보다 먼저 치른 경기는 팀별로 마지막 MAX_WINDOW개만 문맥으로 사용
+    context = hist[before]
+    context = context[context.groupby('team').cumcount(ascending=False) < MAX_WINDOW]
+    # 새 경기와 같은 날이거나 이후인 기존 경기는 윈도가 바뀌므로 다시 계산
+    recompute = hist[~before]
+
+    subset = pd.concat([
+        context.assign(_context=True),
+        recompute.assign(_context=False),
+        new_long[LONG_COLUMNS].assign(_context=False),
+    ], ignore_index=True)
+    subset = subset.sort_values(['team', 'date', 'game_id'], kind='mergesort', ignore_index=True)
+    rolled = add_rolling_features(subset)
+    rolled = rolled[~rolled['_context']].drop(columns='_context')
+
+    kept = long_roll[~long_roll.index.isin(recompute.index)]
+    updated = pd.concat([kept, rolled], ignore_index=True)
+    updated = updated.sort_values(['team', 'date', 'game_id'], kind='mergesort', ignore_index=True)
+    return updated, rolled['game_id'].unique()
+
+
+# 롱 포맷 컬럼 -> 경기 단위(홈/원정) 컬럼 이름
+HOME_COLUMNS = {
+    'team': 'HomeTeam',
+    'rolling_xg_5': 'rolling_xg_home_5',
+    'current_xg': 'h_xg',
+    'Form3': 'Form3Home', 'Form5': 'Form5Home',
+    'GF3': 'GF3Home', 'GF5': 'GF5Home',
+    'GA3': 'GA3Home', 'GA5': 'GA5Home'
+}
+AWAY_COLUMNS = {
+    'team': 'AwayTeam',
+    'rolling_xg_5': 'rolling_xg_away_5',
+    'current_xg': 'a_xg',
+    'Form3': 'Form3Away', 'Form5': 'Form5Away',
+    'GF3': 'GF3Away', 'GF5': 'GF5Away',
+    'GA3': 'GA3Away', 'GA5': 'GA5Away'
+}
+
+
+def day_numbers(dates) -> np.ndarray:
+    """날짜(문자열, date, datetime64 모두 가능)를 1970-01-01 기준 일 수(int64)로 변환"""
+    values = pd.to_datetime(pd.Series(dates).reset_index(drop=True)).values.astype('datetime64[D]')
+    return (values - _EPOCH).astype(np.int64)
+
+
+def compact_features(feat_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    경기 단위 피처 프레임을 메모리를 적게 쓰는 형태로 변환합니다.
+    - HomeTeam/AwayTeam: 두 컬럼이 같은 카테고리를 쓰는 categorical (팀 이름 문자열은 한 번만 보관)
+    - MatchDate: datetime64 (파이썬 date 객체 대신)
+    - 실수 피처: float32 (골/승점 합계는 정확히, xG는 소수 6자리 이상 유지)
+    """
+    df = feat_df.copy()
+    teams = pd.Index(pd.concat([df[c].astype(object) for c in TEAM_COLUMNS], ignore_index=True).unique()).sort_values()
+    for c in TEAM_COLUMNS:
+        df[c] = pd.Categorical(df[c].astype(object), categories=teams)
+    df['MatchDate'] = pd.to_datetime(df['MatchDate']).dt.normalize()
+    floats = df.select_dtypes(include='float64').columns
+    df[floats] = df[floats].astype(np.float32)
+    return df
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    """문자열 객체까지 포함한 DataFrame의 메모리 사용량(MB)"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def to_wide_format(long_roll: pd.DataFrame) -> pd.DataFrame:
+    """롤링 피처가 붙은 롱 포맷을 경기 단위(홈/원정 피처가 한 행) 프레임으로 변환 (compact_features 형태)"""
+    home_w = long_roll[long_roll['side'] == 'home'][['game_id', 'date', 'team'] + SIDE_COLUMNS].rename(columns=HOME_COLUMNS)
+    away_w = long_roll[long_roll['side'] == 'away'][['game_id', 'date', 'team'] + SIDE_COLUMNS].rename(columns=AWAY_COLUMNS)
+
+    feat_df = pd.merge(home_w, away_w, on=['game_id', 'date'], how='inner')
+    feat_df = feat_df.sort_values(['date', 'game_id'], kind='mergesort', ignore_index=True)
+    feat_df = feat_df.rename(columns={'date': 'MatchDate'})
+
+    # 파생 변수 (해당 경기의 xG, float64로 계산한 뒤 줄임)
+    feat_df['xG_diff'] = feat_df['h_xg'] - feat_df['a_xg']
+    feat_df['xg_margin'] = feat_df['xG_diff'].abs()
+    feat_df['xg_ratio'] = feat_df['h_xg'] / (feat_df['a_xg'] + 1e-6)
+
+    return compact_features(feat_df)
+
+
+class TeamFormIndex:
+    """
+    팀별로 "다음 경기를 위한" 롤링 피처를 날짜순 배열로 보관하는 as-of 인덱스.
+    아직 치르지 않은 경기도 경기 날짜 이전의 마지막 경기까지 반영된 윈도를 바로 꺼낼 수 있습니다
+    (merge_asof(direction='backward', allow_exact_matches=False)와 같은 의미).
+    """
+
+    def __init__(self, long_roll: pd.DataFrame):
+        self.columns = list(ROLLING_FEATURES)
+        # 각 경기까지 포함한 윈도 = 그 다음 경기의 경기 전 피처
+        nxt = add_rolling_features(long_roll[LONG_COLUMNS], include_current=True)
+        days = (nxt['date'].values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+        values = nxt[self.columns].to_numpy(dtype=np.float64)
+
+        self._days = {}
+        self._values = {}
+        for team, pos in nxt.groupby('team', sort=False).indices.items():
+            self._days[team] = days[pos]
+            self._values[team] = values[pos]
+
+    def lookup(self, team, match_date):
+        """match_date 이전 마지막 경기 기준 피처 벡터 (기록이 없으면 NaN 벡터)"""
+        days = self._days.get(team)
+        day = (np.datetime64(pd.Timestamp(match_date).date(), 'D') - _EPOCH).astype(np.int64)
+        if days is None:
+            return np.full(len(self.columns), np.nan)
+        i = np.searchsorted(days, day, side='left') - 1
+        return self._values[team][i] if i >= 0 else np.full(len(self.columns), np.nan)
+
+    def lookup_many(self, teams, match_dates) -> np.ndarray:
+        """여러 (팀, 날짜)를 팀별로 묶어 한 번에 조회 (n x 피처 수 행렬)"""
+        teams = pd.Series(list(teams), dtype=object)
+        days = (pd.to_datetime(pd.Series(list(match_dates))).values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+        out = np.full((len(teams), len(self.columns)), np.nan)
+        for team, pos in teams.groupby(teams).indices.items():
+            team_days = self._days.get(team)
+            if team_days is None:
+                continue
+            i = np.searchsorted(team_days, days[pos], side='left') - 1
+            ok = i >= 0
+            out[pos[ok]] = self._values[team][i[ok]]
+        return out
+
+
+def build_asof_features(index: TeamFormIndex, fixtures: pd.DataFrame) -> pd.DataFrame:
+    """
+    (MatchDate, HomeTeam, AwayTeam) 경기 목록에 대해 경기 단위 피처 프레임을 as-of로 만듭니다.
+    경기 당일 xG(h_xg, a_xg 및 파생 변수)는 경기 전에는 알 수 없으므로 NaN으로 둡니다.
+    """
+    home = index.lookup_many(fixtures['HomeTeam'], fixtures['MatchDate'])
+    away = index.lookup_many(fixtures['AwayTeam'], fixtures['MatchDate'])
+
+    out = {}
+    for j, col in enumerate(index.columns):
+        out[HOME_COLUMNS[col]] = home[:, j]
+        out[AWAY_COLUMNS[col]] = away[:, j]
+    for col in ('h_xg', 'a_xg', 'xG_diff', 'xg_margin', 'xg_ratio'):
+        out[col] = np.full(len(fixtures), np.nan)
+    return pd.DataFrame(out, index=fixtures.index)
+
+
+def to_match_format(long_df: pd.DataFrame) -> pd.DataFrame:
+    """롱 포맷을 다시 경기 단위 결과(홈/원정 팀, 득점, xG) 프레임으로 변환"""
+    cols = ['game_id', 'date', 'team', 'goals', 'xg']
+    home = long_df.loc[long_df['side'] == 'home', cols].rename(columns={'team': 'home_team', 'goals': 'home_goals', 'xg': 'home_xg'})
+    away = long_df.loc[long_df['side'] == 'away', cols].rename(columns={'team': 'away_team', 'goals': 'away_goals', 'xg': 'away_xg'})
+    m = pd.merge(home, away, on=['game_id', 'date'], how='inner')
+    return m.sort_values(['date', 'game_id'], kind='mergesort', ignore_index=True)
+
+
+def build_feature_frame(m: pd.DataFrame) -> pd.DataFrame:
+    """Understat 경기 기록 전체로부터 경기 단위 피처 프레임을 만듭니다."""
+    m = m.copy()
+    m['date'] = pd.to_datetime(m['date'])
+    return to_wide_format(add_rolling_features(to_long_format(m)))
+
+
+def _legacy_rolling(long_df: pd.DataFrame) -> pd.DataFrame:
+    # 벤치마크 비교용: 이전 groupby.apply 구현
+    def add_rolling(g):
+        g = g.sort_values('date', ascending=False)
+        for w in (3, 5):
+            g[f'GF{w}'] = g['goals'].rolling(w, min_periods=1).sum().shift(1)
+            g[f'GA{w}'] = g['GA'].rolling(w, min_periods=1).sum().shift(1)
+            g[f'Form{w}'] = g['points'].rolling(w, min_periods=1).sum().shift(1)
+        g['rolling_xg_5'] = g['xg'].rolling(5, min_periods=1).mean()
+        g['current_xg'] = g['xg']
+        return g
+
+    return long_df.groupby('team', group_keys=False).apply(add_rolling)
+
+
+def memory_report(feat_df: pd.DataFrame) -> dict:
+    """
+    경기 단위 피처 프레임의 이전 표현(팀 이름 object, 파이썬 date, float64)과
+    compact_features() 표현의 메모리 사용량(MB)을 비교
+    """
+    legacy = feat_df.copy()
+    for c in TEAM_COLUMNS:
+        legacy[c] = legacy[c].astype(object)
+    legacy['MatchDate'] = pd.to_datetime(legacy['MatchDate']).dt.date
+    floats = legacy.select_dtypes(include='float32').columns
+    legacy[floats] = legacy[floats].astype(np.float64)
+
+    before = memory_usage_mb(legacy)
+    after = memory_usage_mb(compact_features(feat_df))
+    return {
+        'rows': len(feat_df),
+        'before_mb': before,
+        'after_mb': after,
+        'ratio': before / after if after else float('inf')
+    }
+
+
+def benchmark(m: pd.DataFrame, repeat: int = 5) -> dict:
+    """이전 구현과 벡터화 구현의 롤링 피처 계산 시간을 비교 (초 단위, 최솟값)"""
+    m = m.copy()
+    m['date'] = pd.to_datetime(m['date'])
+    long_df = to_long_format(m)
+
+    def best_of(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(long_df)
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    legacy = best_of(_legacy_rolling)
+    vectorized = best_of(add_rolling_features)
+    return {
+        'rows': len(long_df),
+        'legacy_sec': legacy,
+        'vectorized_sec': vectorized,
+        'speedup': legacy / vectorized if vectorized else float('inf')
+    }
+
+
+if __name__ == "__main__":
+    # EPL 2014~2025 시즌 전체로 벤치마크 실행
+    from soccerdata import Understat
+
+    us = Understat(leagues=["ENG-Premier League"], seasons=range(2014, 2026))
+    matches = us.read_team_match_stats()[[
+        'game_id', 'date', 'home_team', 'away_team',
+        'home_goals', 'away_goals', 'home_xg', 'away_xg',
+        'home_points', 'away_points'
+    ]].reset_index(drop=True)
+
+    result = benchmark(matches)
+    print(f"롱 포맷 행 수: {result['rows']}")
+    print(f"기존 groupby.apply: {result['legacy_sec'] * 1000:.1f} ms")
+    print(f"벡터화 엔진:       {result['vectorized_sec'] * 1000:.1f} ms")
+    print(f"속도 향상:         {result['speedup']:.1f}x")
+
+    memory = memory_report(build_feature_frame(matches))
+    print(f"경기 단위 피처 {memory['rows']}행 메모리: {memory['before_mb']:.2f} MB -> {memory['after_mb']:.2f} MB "
+          f"({memory['ratio']:.1f}x 감소)")
@@ -0,0 +1,306 @@
+import os
+import json
+import shutil
+import hashlib
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+
+'''
+Understat 롤링 피처를 디스크에 컬럼 단위로 저장/로드하는 모듈
+- 컬럼마다 .npy 파일 하나씩 저장하고, 로드 시 memory-map으로 열어서
+  여러 워커 프로세스가 같은 페이지를 공유할 수 있도록 함
+- 스냅샷은 (피처 코드 버전, 원본 데이터 지문)으로 구분
+- 새 스냅샷을 저장하면 현재와 직전 스냅샷만 남기고 정리
+  (memory-map으로 열려 있는 스냅샷은 readers/<pid>.json 기록을 보고 건너뜀)
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+STORE_DIR = os.path.join(PROJECT_ROOT, "data", "feature_store")
+LATEST_FILE = "latest.json"
+READERS_DIR = "readers"
+
+_open_snapshots = {}            # (저장 폴더, 스냅샷 이름) -> 이 프로세스에서 살아 있는 memmap 수
+_open_lock = threading.Lock()
+
+
+def source_fingerprint(raw_df: pd.DataFrame) -> str:
+    """원본 경기 데이터의 내용 기반 지문(sha1)을 반환"""
+    hashed = pd.util.hash_pandas_object(raw_df, index=False).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def _snapshot_name(feature_version: int, fingerprint: str) -> str:
+    return f"v{feature_version}-{fingerprint[:16]}"
+
+
+def _write_table(df: pd.DataFrame, path: str) -> list:
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        meta = {"name": col, "file": f"{i}.npy"}
+
+        if pd.api.types.is_datetime64_any_dtype(s):
+            values = s.values.astype("datetime64[D]")
+            meta["kind"] = "datetime"
+        elif s.dtype == object and len(s) and hasattr(s.iloc[0], "isoformat"):
+            # .dt.date로 만들어진 파이썬 date 객체
+            values = pd.to_datetime(s).values.astype("datetime64[D]")
+            meta["kind"] = "date"
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            # categorical은 로드 시에도 categorical로 (카테고리 순서 유지)
+            values = s.cat.codes.to_numpy().astype(np.int32)
+            meta["kind"] = "categorical"
+            meta["categories"] = [str(c) for c in s.cat.categories]
+        elif s.dtype == object:
+            cat = pd.Categorical(s)
+            values = cat.codes.astype(np.int32)
+            meta["kind"] = "category"
+            meta["categories"] = [str(c) for c in cat.categories]
+        else:
+            values = s.to_numpy()
+            meta["kind"] = "numeric"
+
+        np.save(os.path.join(path, meta["file"]), values, allow_pickle=False)
+        columns.append(meta)
+    return columns
+
+
+def save_features(tables: dict, feature_version: int, fingerprint: str, store_dir: str = STORE_DIR) -> str:
+    """
+    피처 테이블들({이름: DataFrame})을 컬럼별 .npy 파일로 저장하고 latest 포인터를 갱신합니다.
+    임시 폴더에 먼저 쓴 뒤 이름을 바꾸므로, 읽는 쪽은 항상 완성된 스냅샷만 보게 됩니다.
+    """
+    name = _snapshot_name(feature_version, fingerprint)
+    target = os.path.join(store_dir, name)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+
+    table_meta = {}
+    for table, df in tables.items():
+        table_meta[table] = {
+            "rows": len(df),
+            "columns": _write_table(df, os.path.join(tmp, table))
+        }
+
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "feature_version": feature_version,
+            "fingerprint": fingerprint,
+            "tables": table_meta
+        }, f, ensure_ascii=False)
+
+    if os.path.exists(target):
+        shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+    previous = _latest_name(store_dir)
+    if previous == name:
+        previous = None
+    latest_tmp = os.path.join(store_dir, f"{LATEST_FILE}.tmp-{os.getpid()}")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        json.dump({"snapshot": name, "previous": previous}, f)
+    os.replace(latest_tmp, os.path.join(store_dir, LATEST_FILE))
+
+    try:
+        prune_snapshots(store_dir, keep={name, previous})
+    except OSError as e:
+        print(f"피처 스냅샷 정리 중 오류 발생: {e}")
+    return target
+
+
+def _latest_name(store_dir: str):
+    try:
+        with open(os.path.join(store_dir, LATEST_FILE), encoding="utf-8") as f:
+            return json.load(f)["snapshot"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # 윈도우에서는 os.kill이 프로세스를 종료시키므로 확인하지 않고 살아 있다고 봄
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _write_lease(store_dir: str):
+    """이 프로세스가 memory-map으로 열고 있는 스냅샷 목록을 readers/<pid>.json에 기록 (없으면 삭제)"""
+    with _open_lock:
+        names = sorted(n for d, n in _open_snapshots if d == store_dir)
+    path = os.path.join(store_dir, READERS_DIR, f"{os.getpid()}.json")
+    try:
+        if not names:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(names, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"피처 스냅샷 사용 기록 중 오류 발생: {e}")
+
+
+def _release(store_dir: str, name: str):
+    # memmap이 GC될 때 호출: 마지막 memmap이 사라지면 사용 기록에서 제외
+    key = (store_dir, name)
+    with _open_lock:
+        _open_snapshots[key] -= 1
+        if _open_snapshots[key] > 0:
+            return
+        del _open_snapshots[key]
+    _write_lease(store_dir)
+
+
+def _track(store_dir: str, name: str, values):
+    key = (store_dir, name)
+    with _open_lock:
+        _open_snapshots[key] = _open_snapshots.get(key, 0) + 1
+    weakref.finalize(values, _release, store_dir, name)
+
+
+def _snapshots_in_use(store_dir: str) -> set:
+    """살아 있는 프로세스들이 memory-map으로 열고 있는 스냅샷 이름 (종료된 프로세스의 기록은 삭제)"""
+    with _open_lock:
+        in_use = {n for d, n in _open_snapshots if d == store_dir}
+
+    readers = os.path.join(store_dir, READERS_DIR)
+    try:
+        entries = os.listdir(readers)
+    except OSError:
+        return in_use
+    for entry in entries:
+        pid, ext = os.path.splitext(entry)
+        if ext != ".json" or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        path = os.path.join(readers, entry)
+        if not _pid_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                in_use.update(json.load(f))
+        except (OSError, ValueError):
+            # 기록을 읽을 수 없으면 안전하게 아무것도 지우지 않음
+            return None
+    return in_use
+
+
+def prune_snapshots(store_dir: str = STORE_DIR, keep=()) -> list:
+    """
+    keep에 있는 스냅샷과 다른 프로세스가 아직 열고 있는 스냅샷을 제외한 나머지를 삭제합니다.
+    쓰는 중인 임시 폴더(.tmp-)는 건드리지 않습니다. 삭제한 스냅샷 이름 목록을 반환합니다.
+    """
+    in_use = _snapshots_in_use(store_dir)
+    if in_use is None:
+        return []
+    removed = []
+    for entry in os.listdir(store_dir):
+        path = os.path.join(store_dir, entry)
+        if entry in keep or entry in in_use or entry == READERS_DIR or ".tmp-" in entry:
+            continue
+        if not os.path.isdir(path) or not os.path.exists(os.path.join(path, "meta.json")):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(entry)
+    if removed:
+        print(f"오래된 피처 스냅샷 {len(removed)}개 삭제: {', '.join(sorted(removed))}")
+    return removed
+
+
+def _read_meta(path: str):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latest_snapshot(store_dir: str = STORE_DIR):
+    """가장 최근에 저장된 스냅샷의 메타데이터를 반환 (없으면 None)"""
+    name = _latest_name(store_dir)
+    if name is None:
+        return None
+    try:
+        path = os.path.join(store_dir, name)
+        meta = _read_meta(path)
+        meta["path"] = path
+        return meta
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _read_table(path: str, columns: list, track=None) -> pd.DataFrame:
+    data = {}
+    for col in columns:
+        values = np.load(os.path.join(path, col["file"]), mmap_mode="r", allow_pickle=False)
+        if track is not None and isinstance(values, np.memmap):
+            track(values)
+        if col["kind"] == "category":
+            cat = pd.Categorical.from_codes(np.asarray(values), categories=col["categories"])
+            data[col["name"]] = np.asarray(cat, dtype=object)
+        elif col["kind"] == "categorical":
+            data[col["name"]] = pd.Categorical.from_codes(np.asarray(values), categories=col["categories"])
+        elif col["kind"] == "date":
+            data[col["name"]] = pd.to_datetime(values).date
+        else:
+            data[col["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_features(feature_version: int, fingerprint: str = None, store_dir: str = STORE_DIR):
+    """
+    저장된 스냅샷의 테이블들을 memory-map으로 열어 DataFrame으로 반환합니다.
+
+    Parameters
+    ----------
+    feature_version : int
+        현재 피처 코드 버전. 버전이 다르면 스냅샷을 사용하지 않음
+    fingerprint : str, optional
+        원본 데이터 지문. 주어지면 해당 지문의 스냅샷만 사용, 없으면 최신 스냅샷 사용
+
+    Returns
+    -------
+    (dict, str) or (None, None)
+        {테이블 이름: DataFrame}과 스냅샷의 원본 지문
+    """
+    if fingerprint is not None:
+        path = os.path.join(store_dir, _snapshot_name(feature_version, fingerprint))
+        try:
+            meta = _read_meta(path)
+        except (OSError, ValueError):
+            return None, None
+    else:
+        meta = latest_snapshot(store_dir)
+        if meta is None:
+            return None, None
+        path = meta["path"]
+
+    if meta.get("feature_version") != feature_version:
+        return None, None
+
+    # 열린 memmap이 모두 GC될 때까지 이 스냅샷은 정리 대상에서 제외
+    name = os.path.basename(path)
+    track = lambda values: _track(store_dir, name, values)
+    try:
+        tables = {
+            table: _read_table(os.path.join(path, table), info["columns"], track)
+            for table, info in meta["tables"].items()
+        }
+    except (OSError, ValueError, KeyError) as e:
+        print(f"피처 스냅샷 로드 중 오류 발생: {e}")
+        return None, None
+    finally:
+        _write_lease(store_dir)
+
+    return tables, meta["fingerprint"]
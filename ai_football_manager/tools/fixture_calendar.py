@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import bisect
+import threading
+
+import api_scheduler
+from leagues import DEFAULT_LEAGUE, LEAGUES, league_id, current_season, canonical_team, fold_accents
+
+'''
+시즌 경기 일정 캘린더
+- 리그/시즌의 전체 경기 일정을 API-Football fixtures 호출 한 번으로 받아 data/fixtures_<리그>_<시즌>.json에 저장
+- (날짜, 팀) -> 경기, 팀 -> 킥오프 순 경기 목록 인덱스를 메모리에 두고 네트워크 호출 없이 조회
+- 팀 이름은 리그 팀 표의 기준 이름으로 통일한 뒤 악센트/대소문자/구두점을 무시하고 비교
+  (예: "Man Utd" == "Manchester United", "Bayern Munchen" == "Bayern München")
+- 백그라운드 스레드가 로드된 캘린더를 주기적으로 다시 받아 교체 (일정 변경, 경기 상태 반영)
+  지난 시즌이나 모든 경기가 끝난 캘린더는 더 바뀌지 않으므로 다시 받지 않음
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+CALENDAR_DIR = os.path.join(PROJECT_ROOT, "data")
+
+REFRESH_INTERVAL_SECONDS = 3 * 60 * 60  # 3시간마다 일정 갱신
+
+# 더 바뀌지 않는 경기 상태 (종료, 연장/승부차기 종료, 취소, 중단, 몰수/부전승)
+FINISHED_STATUSES = {"FT", "AET", "PEN", "CANC", "ABD", "AWD", "WO"}
+
+_calendars = {}                 # (리그 ID, 시즌) -> FixtureCalendar
+_calendar_lock = threading.Lock()
+_refresh_thread = None
+
+
+def calendar_path(league, season) -> str:
+    return os.path.join(CALENDAR_DIR, f"fixtures_{LEAGUES[league_id(league)]['code']}_{season}.json")
+
+
+def team_key(name) -> str:
+    return fold_accents(canonical_team(name))
+
+
+def _parse_fixture(item) -> dict:
+    fixture = item.get("fixture", {})
+    teams = item.get("teams", {})
+    home, away = teams.get("home", {}), teams.get("away", {})
+    return {
+        "fixture_id": fixture.get("id"),
+        "match_date": fixture.get("date", "")[:10],
+        "kickoff": fixture.get("date"),
+        "timestamp": fixture.get("timestamp") or 0,
+        "status": fixture.get("status", {}).get("short"),
+        "round": item.get("league", {}).get("round"),
+        "home_team": home.get("name"),
+        "away_team": away.get("name"),
+        "home_id": home.get("id"),
+        "away_id": away.get("id")
+    }
+
+
+class FixtureCalendar:
+    def __init__(self, fixtures=(), league=DEFAULT_LEAGUE, season=None, built_at=None):
+        '''
+        fixtures: [{fixture_id, match_date, kickoff, timestamp, status, round, home_team, away_team, home_id, away_id}]
+        '''
+        self.fixtures = sorted(fixtures, key=lambda f: f["timestamp"])
+        self.league = league
+        self.season = season
+        self.built_at = built_at
+
+        self._by_date_team = {}
+        self._by_team = {}
+        for fixture in self.fixtures:
+            for side in ("home_team", "away_team"):
+                key = team_key(fixture[side])
+                self._by_date_team[(fixture["match_date"], key)] = fixture
+                self._by_team.setdefault(key, []).append(fixture)
+        self._team_times = {key: [f["timestamp"] for f in matches] for key, matches in self._by_team.items()}
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    def find(self, match_date, team_name):
+        """해당 날짜에 team_name이 치르는 경기 (없으면 None)"""
+        return self._by_date_team.get((str(match_date)[:10], team_key(team_name)))
+
+    def next_matches(self, team_name, n=1, after=None) -> list:
+        """after(유닉스 시간, 기본: 지금) 이후에 킥오프하는 team_name의 경기 n개"""
+        key = team_key(team_name)
+        after = time.time() if after is None else after
+        start = bisect.bisect_right(self._team_times.get(key, []), after)
+        return self._by_team.get(key, [])[start:start + n]
+
+    def upcoming(self, n=None, after=None) -> list:
+        """after(기본: 지금) 이후에 킥오프하는 경기를 킥오프 순으로 (n개까지)"""
+        after = time.time() if after is None else after
+        matches = [f for f in self.fixtures if f["timestamp"] > after]
+        return matches[:n] if n else matches
+
+    def select(self, round_name=None, status=None) -> list:
+        """
+        라운드/상태로 거른 경기 목록
+        status="NS"(시작 전)는 마지막 갱신 뒤 이미 킥오프한 경기를 제외
+        """
+        matches = self.fixtures
+        if round_name:
+            matches = [f for f in matches if f["round"] == round_name]
+        if status:
+            matches = [f for f in matches if f["status"] == status]
+            if status == "NS":
+                now = time.time()
+                matches = [f for f in matches if f["timestamp"] > now]
+        return matches
+
+    def is_stale(self, max_age=REFRESH_INTERVAL_SECONDS) -> bool:
+        return self.built_at is None or time.time() - self.built_at > max_age
+
+    def is_final(self) -> bool:
+        """지난 시즌이거나 모든 경기가 끝나 다시 받아도 바뀌지 않는 캘린더인지"""
+        if self.season is not None and int(self.season) < current_season():
+            return True
+        return bool(self.fixtures) and all(f["status"] in FINISHED_STATUSES for f in self.fixtures)
+
+    def to_dict(self):
+        return {
+            "league": self.league,
+            "season": self.season,
+            "built_at": self.built_at,
+            "fixtures": self.fixtures
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["fixtures"], d.get("league", DEFAULT_LEAGUE), d.get("season"), d.get("built_at"))
+
+    def save(self, path=None):
+        path = path or calendar_path(self.league, self.season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, league=DEFAULT_LEAGUE, season=None, path=None):
+        """저장된 캘린더 (없거나 읽을 수 없으면 빈 캘린더)"""
+        season = season or current_season()
+        try:
+            with open(path or calendar_path(league, season), encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return cls(league=league, season=season)
+
+    @classmethod
+    def build(cls, fetch, league=DEFAULT_LEAGUE, season=None):
+        """
+        API-Football에서 리그의 시즌 전체 경기 일정을 받아 캘린더를 만듭니다.
+
+        Parameters
+        ----------
+        fetch : callable
+            fetch(params) -> fixtures 엔드포인트의 response 항목 목록
+        league : int
+            API-Football 리그 ID
+        season : int, optional
+            시즌 시작 연도 (없으면 진행 중인 시즌)
+        """
+        league = league_id(league)
+        season = season or current_season()
+        fixtures = [_parse_fixture(item) for item in fetch({"league": league, "season": season})]
+        return cls(fixtures, league, season, time.time())
+
+
+def get_calendar(fetch, league=DEFAULT_LEAGUE, season=None) -> FixtureCalendar:
+    """
+    리그/시즌 캘린더 (메모리 > 디스크 순으로 찾고, 둘 다 없을 때만 API에서 받음)
+    디스크의 캘린더가 오래되었어도 일단 사용하고 갱신은 백그라운드 스레드에 맡김
+    """
+    key = (league_id(league), season or current_season())
+    calendar = _calendars.get(key)
+    if calendar is not None:
+        return calendar
+
+    calendar = FixtureCalendar.load(*key)
+    if not len(calendar):
+        # 같은 요청이 동시에 들어와도 api_scheduler가 호출 한 번으로 합침
+        return refresh_calendar(fetch, *key)
+    with _calendar_lock:
+        return _calendars.setdefault(key, calendar)
+
+
+def loaded_calendars() -> list:
+    with _calendar_lock:
+        return list(_calendars)
+
+
+def refresh_calendar(fetch, league=DEFAULT_LEAGUE, season=None) -> FixtureCalendar:
+    """캘린더를 새로 받아 저장하고 전역 참조를 한 번에 교체 (받지 못하면 기존 캘린더 유지)"""
+    key = (league_id(league), season or current_season())
+    try:
+        calendar = FixtureCalendar.build(fetch, *key)
+    except Exception as e:
+        print(f"경기 일정 갱신 중 오류 발생 (리그 {key[0]}, {key[1]} 시즌): {e}")
+        calendar = FixtureCalendar(league=key[0], season=key[1])
+
+    if not len(calendar):
+        with _calendar_lock:
+            return _calendars.get(key) or FixtureCalendar.load(*key)
+    try:
+        calendar.save()
+    except OSError as e:
+        print(f"경기 일정 저장 중 오류 발생: {e}")
+    with _calendar_lock:
+        _calendars[key] = calendar
+    print(f"경기 일정 갱신 (리그 {key[0]}, {key[1]} 시즌): {len(calendar)}경기")
+    return calendar
+
+
+def _refresh_loop(fetch, interval):
+    # 일정 갱신은 사용자 질문보다 뒤에 호출 한도를 받음
+    with api_scheduler.lane(api_scheduler.BACKGROUND):
+        # 시작 시에는 기본 리그만 미리 로드 (다른 리그는 처음 요청될 때 로드)
+        try:
+            calendar = get_calendar(fetch)
+            if calendar.is_stale(interval) and not calendar.is_final():
+                refresh_calendar(fetch, calendar.league, calendar.season)
+        except Exception as e:
+            print(f"경기 일정 로드 중 오류 발생: {e}")
+        while True:
+            time.sleep(interval)
+            for key in loaded_calendars():
+                calendar = _calendars.get(key)
+                if calendar is not None and calendar.is_final():
+                    continue
+                refresh_calendar(fetch, *key)
+
+
+def start_background_refresh(fetch, interval=REFRESH_INTERVAL_SECONDS):
+    """
+    기본 리그의 캘린더를 미리 준비하고, 로드된 캘린더를 주기적으로 갱신하는 데몬 스레드를 시작합니다.
+    여러 번 호출해도 스레드는 하나만 실행됩니다.
+    """
+    global _refresh_thread
+    with _calendar_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return _refresh_thread
+        _refresh_thread = threading.Thread(
+            target=_refresh_loop, args=(fetch, interval), name="fixture-calendar-refresh", daemon=True
+        )
+        _refresh_thread.start()
+    return _refresh_thread
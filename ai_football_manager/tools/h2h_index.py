@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+'''
+Understat 경기 기록으로 만든 상대 전적(Head-to-Head) 인덱스
+- 두 팀의 순서와 관계없는 (팀1, 팀2) 키로 맞대결 기록을 날짜순 배열로 보관 -> 조회는 딕셔너리 한 번
+- 최근 N경기 결과, 득점/xG 합계, 홈/원정별 전적을 조회 시점 기준(as-of)으로 계산
+- 새 경기는 해당 팀 쌍만 다시 만들어 증분 반영
+'''
+
+LAST_N = 5
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+# 팀 쌍별로 보관하는 배열 (팀1/팀2는 이름 순서로 앞/뒤 팀)
+MEETING_FIELDS = ['day', 'game_id', 'team1_home', 'goals1', 'goals2', 'xg1', 'xg2']
+
+
+def pair_key(team_a, team_b):
+    """두 팀의 순서와 관계없는 키"""
+    return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+
+def _meeting_arrays(matches: pd.DataFrame) -> pd.DataFrame:
+    """경기 단위 결과(home_team, away_team, home_goals, ...)를 팀1/팀2 기준 배열 프레임으로 변환"""
+    home = matches['home_team'].astype(object).to_numpy()
+    away = matches['away_team'].astype(object).to_numpy()
+    first_home = home <= away
+
+    def side(home_col, away_col):
+        h = matches[home_col].to_numpy(dtype=np.float64)
+        a = matches[away_col].to_numpy(dtype=np.float64)
+        return np.where(first_home, h, a), np.where(first_home, a, h)
+
+    goals1, goals2 = side('home_goals', 'away_goals')
+    xg1, xg2 = side('home_xg', 'away_xg')
+    days = (pd.to_datetime(matches['date']).values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+    return pd.DataFrame({
+        'team1': np.where(first_home, home, away),
+        'team2': np.where(first_home, away, home),
+        'day': days,
+        'game_id': matches['game_id'].to_numpy(),
+        'team1_home': first_home,
+        'goals1': goals1, 'goals2': goals2,
+        'xg1': xg1, 'xg2': xg2
+    })
+
+
+def _record(goals_for, goals_against, xg_for, xg_against) -> dict:
+    return {
+        'matches': int(len(goals_for)),
+        'wins': int((goals_for > goals_against).sum()),
+        'draws': int((goals_for == goals_against).sum()),
+        'losses': int((goals_for < goals_against).sum()),
+        'goals_for': int(goals_for.sum()),
+        'goals_against': int(goals_against.sum()),
+        'xg_for': float(np.nansum(xg_for)),
+        'xg_against': float(np.nansum(xg_against))
+    }
+
+
+class HeadToHeadIndex:
+    def __init__(self, matches: pd.DataFrame = None):
+        '''
+        matches: feature_engine.to_match_format()과 같은 컬럼의 경기 결과
+        (game_id, date, home_team, away_team, home_goals, away_goals, home_xg, away_xg)
+        '''
+        self._pairs = {}        # (팀1, 팀2) -> {필드: 날짜순 배열}
+        self.game_ids = set()   # 이미 반영한 경기
+        if matches is not None:
+            self.update(matches)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, teams):
+        return pair_key(*teams) in self._pairs
+
+    def copy(self):
+        """팀 쌍 배열을 공유하는 복사본 (update는 팀 쌍 단위로 교체하므로 원본은 바뀌지 않음)"""
+        other = HeadToHeadIndex()
+        other._pairs = dict(self._pairs)
+        other.game_ids = set(self.game_ids)
+        return other
+
+    def update(self, matches: pd.DataFrame) -> int:
+        """
+        새 경기들을 반영합니다. 이미 반영된 game_id와 결과가 없는 경기는 무시하고,
+        새 경기가 있는 팀 쌍만 배열을 다시 만들어 교체합니다.
+
+        Returns
+        -------
+        int
+            실제로 반영된 경기 수
+        """
+        m = matches.dropna(subset=['home_goals', 'away_goals'])
+        m = m[~m['game_id'].isin(self.game_ids)].drop_duplicates('game_id')
+        if m.empty:
+            return 0
+
+        new = _meeting_arrays(m)
+        for key, pos in new.groupby(['team1', 'team2'], sort=False).indices.items():
+            rows = new.iloc[pos]
+            old = self._pairs.get(key)
+            merged = {
+                f: rows[f].to_numpy() if old is None else np.concatenate((old[f], rows[f].to_numpy()))
+                for f in MEETING_FIELDS
+            }
+            order = np.lexsort((merged['game_id'], merged['day']))
+            # 팀 쌍 단위로 한 번에 교체 (조회 중인 스레드는 이전 배열을 끝까지 사용)
+            self._pairs[key] = {f: v[order] for f, v in merged.items()}
+
+        self.game_ids.update(m['game_id'].tolist())
+        return len(m)
+
+    def lookup(self, team_a, team_b, match_date=None, last_n: int = LAST_N):
+        """
+        team_a 기준 team_b와의 상대 전적을 반환합니다.
+
+        Parameters
+        ----------
+        team_a, team_b : str
+            Understat 기준 팀 이름
+        match_date : optional
+            주어지면 이 날짜 이전의 맞대결만 사용 (경기 당일 결과는 포함하지 않음)
+        last_n : int
+            최근 맞대결 목록의 길이
+
+        Returns
+        -------
+        dict or None
+            overall / at_home(team_a 홈) / away(team_a 원정)별 승/무/패, 득실, xG 합계와
+            최근 맞대결 목록(recent, 최신순). 맞대결 기록이 없으면 None
+        """
+        key = pair_key(team_a, team_b)
+        pair = self._pairs.get(key)
+        if pair is None:
+            return None
+
+        n = len(pair['day'])
+        if match_date is not None:
+            day = (np.datetime64(pd.Timestamp(match_date).date(), 'D') - _EPOCH).astype(np.int64)
+            n = int(np.searchsorted(pair['day'], day, side='left'))
+        if n == 0:
+            return None
+
+        # team_a 관점으로 변환
+        a_first = key[0] == team_a
+        goals_for = pair['goals1'][:n] if a_first else pair['goals2'][:n]
+        goals_against = pair['goals2'][:n] if a_first else pair['goals1'][:n]
+        xg_for = pair['xg1'][:n] if a_first else pair['xg2'][:n]
+        xg_against = pair['xg2'][:n] if a_first else pair['xg1'][:n]
+        a_home = pair['team1_home'][:n] if a_first else ~pair['team1_home'][:n]
+
+        recent = []
+        for i in range(n - 1, max(n - last_n, 0) - 1, -1):
+            home, away = (team_a, team_b) if a_home[i] else (team_b, team_a)
+            home_goals, away_goals = (goals_for[i], goals_against[i]) if a_home[i] else (goals_against[i], goals_for[i])
+            home_xg, away_xg = (xg_for[i], xg_against[i]) if a_home[i] else (xg_against[i], xg_for[i])
+            recent.append({
+                'date': str(_EPOCH + np.timedelta64(int(pair['day'][i]), 'D')),
+                'home_team': home,
+                'away_team': away,
+                'home_goals': int(home_goals),
+                'away_goals': int(away_goals),
+                'home_xg': float(home_xg),
+                'away_xg': float(away_xg)
+            })
+
+        return {
+            'team': team_a,
+            'opponent': team_b,
+            'overall': _record(goals_for, goals_against, xg_for, xg_against),
+            'at_home': _record(goals_for[a_home], goals_against[a_home], xg_for[a_home], xg_against[a_home]),
+            'away': _record(goals_for[~a_home], goals_against[~a_home], xg_for[~a_home], xg_against[~a_home]),
+            'recent': recent
+        }
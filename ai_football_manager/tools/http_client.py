@@ -0,0 +1,160 @@
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+'''
+외부 API(API-Football, NewsAPI) 호출용 공용 HTTP 클라이언트
+- 프로세스 전역 Session 하나로 keep-alive 연결 풀을 공유 (요청마다 TLS 연결을 새로 맺지 않음)
+- 엔드포인트별 타임아웃 (연결, 읽기)
+- 429/5xx 응답과 연결 오류는 지수 백오프 + 지터로 재시도 (429의 Retry-After 존중)
+- 엔드포인트별 요청 수, 재시도 수, 상태 코드, 지연 시간 집계
+'''
+
+POOL_SIZE = 10               # 호스트별로 유지할 연결 수
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5           # 첫 재시도 대기 시간(초), 재시도마다 2배
+BACKOFF_MAX = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# (연결, 읽기) 타임아웃(초)
+DEFAULT_TIMEOUT = (3.05, 15)
+TIMEOUTS = {
+    "fixtures": (3.05, 15),
+    "teams": (3.05, 10),
+    "players": (3.05, 15),
+    "teams/statistics": (3.05, 20),
+    "news": (3.05, 10),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """프로세스 전역에서 공유하는 Session (처음 호출될 때 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # 재시도는 get()에서 직접 처리 (백오프/집계를 위해)
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _record(endpoint, status, elapsed, retried=False):
+    with _stats_lock:
+        s = _stats.setdefault(endpoint, {
+            "requests": 0, "retries": 0, "errors": 0,
+            "status": {}, "total_sec": 0.0, "max_sec": 0.0
+        })
+        if retried:
+            s["retries"] += 1
+            return
+        s["requests"] += 1
+        s["total_sec"] += elapsed
+        s["max_sec"] = max(s["max_sec"], elapsed)
+        if status is None:
+            s["errors"] += 1
+        else:
+            s["status"][status] = s["status"].get(status, 0) + 1
+
+
+def retry_after(response):
+    """429 응답의 Retry-After(초, 최대 BACKOFF_MAX), 없거나 읽을 수 없으면 None"""
+    if response is None or response.status_code != 429:
+        return None
+    try:
+        return min(float(response.headers.get("Retry-After")), BACKOFF_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, response=None):
+    """재시도 전 대기 시간(초): 429의 Retry-After가 있으면 그만큼, 없으면 지수 백오프에 지터(50~100%)를 곱함"""
+    delay = retry_after(response)
+    if delay is not None:
+        return delay
+    return min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def get(url: str, params: dict = None, headers: dict = None, endpoint: str = None,
+        timeout=None, max_retries: int = MAX_RETRIES) -> requests.Response:
+    """
+    공용 Session으로 GET 요청을 보냅니다.
+
+    Parameters
+    ----------
+    url : str
+        요청 URL
+    params, headers : dict, optional
+        쿼리 파라미터와 헤더
+    endpoint : str, optional
+        타임아웃과 집계에 사용할 엔드포인트 이름 (예: "fixtures", "news")
+    timeout : float or tuple, optional
+        지정하면 TIMEOUTS 대신 사용
+    max_retries : int
+        429/5xx 응답이나 연결 오류 시 재시도 횟수
+        (호출 한도를 관리하는 api_scheduler를 거치는 요청은 0으로 두고 스케줄러가 재시도)
+
+    Returns
+    -------
+    requests.Response
+        마지막 응답 (재시도 후에도 429/5xx면 그대로 반환하므로 호출하는 쪽에서 raise_for_status)
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        재시도 후에도 연결/타임아웃 오류가 나면
+    """
+    endpoint = endpoint or url
+    timeout = timeout or TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    session = get_session()
+
+    for attempt in range(max_retries + 1):
+        t0 = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            _record(endpoint, None, time.perf_counter() - t0)
+            if attempt == max_retries:
+                raise
+            _record(endpoint, None, 0.0, retried=True)
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        _record(endpoint, response.status_code, time.perf_counter() - t0)
+        if response.status_code not in RETRY_STATUS or attempt == max_retries:
+            return response
+        _record(endpoint, None, 0.0, retried=True)
+        time.sleep(backoff_delay(attempt, response))
+
+
+def stats() -> dict:
+    """엔드포인트별 요청 수, 재시도 수, 오류 수, 상태 코드 분포, 평균/최대 지연 시간(ms)"""
+    with _stats_lock:
+        out = {}
+        for endpoint, s in _stats.items():
+            out[endpoint] = {
+                "requests": s["requests"],
+                "retries": s["retries"],
+                "errors": s["errors"],
+                "status": dict(s["status"]),
+                "avg_ms": s["total_sec"] / s["requests"] * 1000 if s["requests"] else 0.0,
+                "max_ms": s["max_sec"] * 1000
+            }
+        return out
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
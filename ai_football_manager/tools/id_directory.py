@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import threading
+
+import api_scheduler
+from leagues import LEAGUES, current_season, normalize_name, fold_accents
+
+'''
+API-Football 팀/선수 ID 디렉터리
+- 지원 리그의 전체 팀과 선수 명단을 (페이지 단위 호출로) 한 번에 받아 data/id_directory.json에 저장
+- 이름 -> ID 인덱스를 메모리에 두고 정확히 일치 > 정규화(대소문자/구두점) > 악센트 무시 > 단어 순서 무시 순으로 찾음
+  (예: "Son Heung-min" -> firstname "Heung-Min" + lastname "Son", "Odegaard" -> "Ødegaard")
+- 백그라운드 스레드가 주기적으로 다시 받아 교체 (api_scheduler의 BACKGROUND 레인)
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+DIRECTORY_PATH = os.path.join(PROJECT_ROOT, "data", "id_directory.json")
+
+REFRESH_INTERVAL_SECONDS = 24 * 60 * 60  # 하루에 한 번 명단 갱신
+MAX_PAGES = 60                           # 리그당 선수 목록 최대 페이지 수 (한 페이지 20명)
+
+_directory = None
+_directory_lock = threading.Lock()
+_refresh_thread = None
+
+
+def _token_key(name) -> str:
+    return " ".join(sorted(fold_accents(name).split()))
+
+
+class _NameIndex:
+    """정확히 일치 / 정규화 / 악센트 무시 / 단어 순서 무시 네 단계의 이름 -> 레코드 목록 인덱스"""
+
+    LEVELS = (str, normalize_name, fold_accents, _token_key)
+
+    def __init__(self):
+        self._maps = [{} for _ in self.LEVELS]
+
+    def add(self, name, record):
+        if not name:
+            return
+        for key_fn, index in zip(self.LEVELS, self._maps):
+            matches = index.setdefault(key_fn(name), [])
+            if record not in matches:
+                matches.append(record)
+
+    def find(self, name, accept=None) -> list:
+        """가장 엄격한 단계부터 찾아 처음으로 일치하는 레코드 목록 (accept로 거른 뒤 비면 다음 단계)"""
+        if not name:
+            return []
+        for key_fn, index in zip(self.LEVELS, self._maps):
+            matches = index.get(key_fn(name), [])
+            if accept is not None:
+                matches = [r for r in matches if accept(r)]
+            if matches:
+                return matches
+        return []
+
+
+class IdDirectory:
+    def __init__(self, teams=(), players=(), season=None, leagues=(), built_at=None):
+        '''
+        teams: [{id, name, code, country, league}]
+        players: [{id, name, firstname, lastname, team_id, team, league}]
+        '''
+        self.teams = list(teams)
+        self.players = list(players)
+        self.season = season
+        self.leagues = list(leagues)
+        self.built_at = built_at
+
+        self._teams = _NameIndex()
+        for team in self.teams:
+            self._teams.add(team["name"], team)
+            self._teams.add(team.get("code"), team)
+
+        self._players = _NameIndex()
+        self._lastnames = _NameIndex()   # 성만으로 물었을 때 (한 명일 때만 사용)
+        for player in self.players:
+            self._players.add(player["name"], player)
+            full_name = f"{player.get('firstname') or ''} {player.get('lastname') or ''}".strip()
+            self._players.add(full_name, player)
+            self._lastnames.add(player.get("lastname"), player)
+
+    def __len__(self):
+        return len(self.teams) + len(self.players)
+
+    def find_team(self, name, league=None):
+        """팀 이름(또는 약칭 코드)으로 팀 레코드 찾기 (없으면 None)"""
+        accept = (lambda t: t["league"] == league) if league is not None else None
+        matches = self._teams.find(name, accept)
+        return matches[0] if matches else None
+
+    def find_player(self, name, team_id=None, league=None):
+        """
+        선수 이름으로 선수 레코드 찾기 (없으면 None)
+        team_id/league가 주어지면 그 팀/리그 선수를 우선하고, 없으면 전체에서 찾음
+        """
+        for accept in (
+            (lambda p: p["team_id"] == team_id) if team_id is not None else None,
+            (lambda p: p["league"] == league) if league is not None else None,
+        ):
+            if accept is not None:
+                matches = self._players.find(name, accept)
+                if matches:
+                    return matches[0]
+        matches = self._players.find(name)
+        if matches:
+            return matches[0]
+        matches = self._lastnames.find(name)
+        return matches[0] if len({p["id"] for p in matches}) == 1 else None
+
+    def is_stale(self, season=None, leagues=None, max_age=REFRESH_INTERVAL_SECONDS) -> bool:
+        """시즌/리그 구성이 다르거나 max_age보다 오래되었으면 True"""
+        season = season or current_season()
+        leagues = sorted(leagues or LEAGUES)
+        return (
+            self.built_at is None
+            or self.season != season
+            or sorted(self.leagues) != leagues
+            or time.time() - self.built_at > max_age
+        )
+
+    def to_dict(self):
+        return {
+            "season": self.season,
+            "leagues": self.leagues,
+            "built_at": self.built_at,
+            "teams": self.teams,
+            "players": self.players
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["teams"], d["players"], d.get("season"), d.get("leagues", []), d.get("built_at"))
+
+    def save(self, path=DIRECTORY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DIRECTORY_PATH):
+        """저장된 디렉터리 (없거나 읽을 수 없으면 빈 디렉터리)"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+    @classmethod
+    def build(cls, fetch_pages, leagues=None, season=None):
+        """
+        API-Football에서 리그별 팀 목록과 선수 명단을 받아 디렉터리를 만듭니다.
+
+        Parameters
+        ----------
+        fetch_pages : callable
+            fetch_pages(endpoint, params) -> 모든 페이지의 response 항목 목록
+            (한 페이지라도 받지 못하면 예외를 발생시켜야 함)
+        leagues : list, optional
+            리그 ID 목록 (없으면 지원하는 모든 리그)
+        season : int, optional
+            시즌 시작 연도 (없으면 진행 중인 시즌)
+        """
+        leagues = list(leagues or LEAGUES)
+        season = season or current_season()
+        teams, players = [], []
+
+        for league in leagues:
+            for item in fetch_pages("teams", {"league": league, "season": season}):
+                team = item.get("team", {})
+                if team.get("id") is not None:
+                    teams.append({
+                        "id": team["id"], "name": team.get("name"), "code": team.get("code"),
+                        "country": team.get("country"), "league": league
+                    })
+
+            for item in fetch_pages("players", {"league": league, "season": season}):
+                player = item.get("player", {})
+                if player.get("id") is None:
+                    continue
+                stats = item.get("statistics") or [{}]
+                team = stats[0].get("team") or {}
+                players.append({
+                    "id": player["id"], "name": player.get("name"),
+                    "firstname": player.get("firstname"), "lastname": player.get("lastname"),
+                    "team_id": team.get("id"), "team": team.get("name"), "league": league
+                })
+
+        return cls(teams, players, season, leagues, time.time())
+
+
+def get_directory() -> IdDirectory:
+    """프로세스 전역 디렉터리 (처음 호출될 때 디스크에서 로드, 없으면 빈 디렉터리)"""
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = IdDirectory.load()
+    return _directory
+
+
+def refresh_directory(fetch_pages, leagues=None, season=None) -> IdDirectory:
+    """디렉터리를 새로 받아 저장하고 전역 참조를 한 번에 교체 (일부 페이지라도 받지 못하면 기존 디렉터리 유지)"""
+    global _directory
+    try:
+        directory = IdDirectory.build(fetch_pages, leagues, season)
+    except Exception as e:
+        print(f"ID 디렉터리 갱신 실패, 기존 디렉터리 사용: {e}")
+        return get_directory()
+    if not directory.teams:
+        # API를 쓸 수 없으면 기존 디렉터리를 그대로 사용
+        print("ID 디렉터리 갱신 실패: 팀 목록을 받지 못함")
+        return get_directory()
+    try:
+        directory.save()
+    except OSError as e:
+        print(f"ID 디렉터리 저장 중 오류 발생: {e}")
+    _directory = directory
+    print(f"ID 디렉터리 갱신: 팀 {len(directory.teams)}개, 선수 {len(directory.players)}명")
+    return directory
+
+
+def _refresh_loop(fetch_pages, interval):
+    while True:
+        try:
+            if get_directory().is_stale(max_age=interval):
+                # 명단 갱신은 사용자 질문보다 뒤에 호출 한도를 받음
+                with api_scheduler.lane(api_scheduler.BACKGROUND):
+                    refresh_directory(fetch_pages)
+        except Exception as e:
+            print(f"ID 디렉터리 갱신 중 오류 발생: {e}")
+        time.sleep(interval)
+
+
+def start_background_refresh(fetch_pages, interval=REFRESH_INTERVAL_SECONDS):
+    """
+    저장된 디렉터리가 없거나 오래되었으면 백그라운드에서 받아 두고, 이후 주기적으로 갱신하는 데몬 스레드를 시작합니다.
+    여러 번 호출해도 스레드는 하나만 실행됩니다.
+    """
+    global _refresh_thread
+    with _directory_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return _refresh_thread
+        _refresh_thread = threading.Thread(
+            target=_refresh_loop, args=(fetch_pages, interval), name="id-directory-refresh", daemon=True
+        )
+        _refresh_thread.start()
+    return _refresh_thread
@@ -0,0 +1,190 @@
+import re
+import unicodedata
+from datetime import date
+
+import pandas as pd
+
+'''
+지원하는 리그 설정과 시즌 계산
+- 키는 API-Football 리그 ID, 각 리그의 Understat 이름과 데이터 폴더 이름(code)을 함께 보관
+- 리그별 팀 이름 표: 기준 이름(Understat) -> 별칭 목록 (API-Football, ClubElo, 줄임말 등)
+  악센트/대소문자/구두점을 무시하고 비교하므로 "Atlético Madrid"처럼 악센트만 다른 이름은 따로 적지 않음
+'''
+
+DEFAULT_LEAGUE = 39
+
+LEAGUES = {
+    39: {
+        "code": "EPL", "name": "Premier League", "country": "England",
+        "understat": "ENG-Premier League", "relegation_spots": 3,
+        "aliases": ["프리미어리그", "프리미어 리그", "EPL"],
+        "teams": {
+            "Arsenal": [], "Aston Villa": [], "Bournemouth": ["AFC Bournemouth"], "Brentford": [],
+            "Brighton": ["Brighton & Hove Albion", "Brighton and Hove Albion"], "Burnley": [],
+            "Cardiff": ["Cardiff City"], "Chelsea": [], "Crystal Palace": [], "Everton": [], "Fulham": [],
+            "Huddersfield": ["Huddersfield Town"], "Hull": ["Hull City"], "Ipswich": ["Ipswich Town"],
+            "Leeds United": ["Leeds"], "Leicester": ["Leicester City"], "Liverpool": [], "Luton": ["Luton Town"],
+            "Manchester City": ["Man City"], "Manchester United": ["Man United", "Man Utd"],
+            "Middlesbrough": [], "Newcastle United": ["Newcastle"], "Norwich": ["Norwich City"],
+            "Nottingham Forest": ["Nottm Forest", "Nott'm Forest"], "Queens Park Rangers": ["QPR"],
+            "Sheffield United": ["Sheffield Utd"], "Southampton": [], "Stoke": ["Stoke City"], "Sunderland": [],
+            "Swansea": ["Swansea City"], "Tottenham": ["Tottenham Hotspur", "Spurs"], "Watford": [],
+            "West Bromwich Albion": ["West Brom"], "West Ham": ["West Ham United"],
+            "Wolverhampton Wanderers": ["Wolves"]
+        }
+    },
+    140: {
+        "code": "LaLiga", "name": "La Liga", "country": "Spain",
+        "understat": "ESP-La Liga", "relegation_spots": 3,
+        "aliases": ["라리가", "라 리가", "LaLiga", "La Liga", "프리메라리가"],
+        "teams": {
+            "Alaves": ["Deportivo Alaves"], "Almeria": ["UD Almeria"], "Athletic Club": ["Athletic Bilbao"],
+            "Atletico Madrid": ["Atletico de Madrid"], "Barcelona": ["FC Barcelona"], "Cadiz": ["Cadiz CF"],
+            "Celta Vigo": ["Celta de Vigo", "Celta"], "Deportivo La Coruna": ["Deportivo"], "Eibar": ["SD Eibar"],
+            "Elche": [], "Espanyol": [], "Getafe": [], "Girona": [], "Granada": ["Granada CF"],
+            "Huesca": ["SD Huesca"], "Las Palmas": ["UD Las Palmas"], "Leganes": [], "Levante": [],
+            "Malaga": [], "Mallorca": ["RCD Mallorca"], "Osasuna": ["CA Osasuna"], "Rayo Vallecano": [],
+            "Real Betis": ["Betis"], "Real Madrid": [], "Real Oviedo": ["Oviedo"], "Real Sociedad": [],
+            "Real Valladolid": ["Valladolid"], "Sevilla": [], "Sporting Gijon": [], "Valencia": [], "Villarreal": []
+        }
+    },
+    135: {
+        "code": "SerieA", "name": "Serie A", "country": "Italy",
+        "understat": "ITA-Serie A", "relegation_spots": 3,
+        "aliases": ["세리에", "세리에A", "세리에 A", "Serie A"],
+        "teams": {
+            "AC Milan": ["Milan"], "Atalanta": [], "Benevento": [], "Bologna": [], "Brescia": [], "Cagliari": [],
+            "Chievo": ["Chievo Verona"], "Como": [], "Cremonese": [], "Crotone": [], "Empoli": [],
+            "Fiorentina": [], "Frosinone": [], "Genoa": [], "Inter": ["Internazionale", "Inter Milan"],
+            "Juventus": [], "Lazio": [], "Lecce": [], "Monza": [], "Napoli": [], "Parma Calcio 1913": ["Parma"],
+            "Pisa": [], "Roma": ["AS Roma"], "Salernitana": [], "Sampdoria": [], "Sassuolo": [],
+            "SPAL 2013": ["Spal"], "Spezia": [], "Torino": [], "Udinese": [], "Venezia": [],
+            "Verona": ["Hellas Verona"]
+        }
+    },
+    78: {
+        # 16위는 승강 플레이오프, 자동 강등은 2팀
+        "code": "Bundesliga", "name": "Bundesliga", "country": "Germany",
+        "understat": "GER-Bundesliga", "relegation_spots": 2,
+        "aliases": ["분데스리가", "분데스", "Bundesliga"],
+        "teams": {
+            "Arminia Bielefeld": [], "Augsburg": ["FC Augsburg"], "Bayer Leverkusen": [],
+            "Bayern Munich": ["Bayern München", "FC Bayern München"], "Bochum": ["VfL Bochum"],
+            "Borussia Dortmund": [], "Borussia M.Gladbach": ["Borussia Mönchengladbach"],
+            "Darmstadt": ["SV Darmstadt 98"], "Eintracht Frankfurt": [], "FC Cologne": ["1. FC Köln", "1. FC Koeln"],
+            "Fortuna Duesseldorf": ["Fortuna Düsseldorf"], "Freiburg": ["SC Freiburg"],
+            "Greuther Fuerth": ["SpVgg Greuther Fürth", "Greuther Fürth"], "Hamburger SV": [], "Hannover 96": [],
+            "Heidenheim": ["1. FC Heidenheim", "1. FC Heidenheim 1846"], "Hertha Berlin": ["Hertha BSC"],
+            "Hoffenheim": ["1899 Hoffenheim", "TSG Hoffenheim"], "Holstein Kiel": [], "Mainz 05": ["FSV Mainz 05"],
+            "Nuernberg": ["1. FC Nürnberg"], "Paderborn": ["SC Paderborn 07"],
+            "RasenBallsport Leipzig": ["RB Leipzig"], "Schalke 04": ["FC Schalke 04"], "St. Pauli": ["FC St. Pauli"],
+            "Union Berlin": ["1. FC Union Berlin", "FC Union Berlin"], "VfB Stuttgart": [], "Werder Bremen": [],
+            "Wolfsburg": ["VfL Wolfsburg"]
+        }
+    },
+}
+
+# NFKD로 분해되지 않는 라틴 문자
+_TRANSLITERATE = str.maketrans({
+    "ø": "o", "Ø": "o", "æ": "ae", "Æ": "ae", "ß": "ss", "đ": "d", "Đ": "d",
+    "ł": "l", "Ł": "l", "ı": "i", "œ": "oe", "Œ": "oe", "þ": "th", "ð": "d"
+})
+
+
+def normalize_name(name) -> str:
+    """소문자, 구두점/하이픈은 공백으로, 연속 공백은 하나로"""
+    name = unicodedata.normalize("NFKC", str(name)).lower()
+    return " ".join(re.sub(r"[\W_]+", " ", name).split())
+
+
+def fold_accents(name) -> str:
+    """악센트를 제거한 정규화 이름 (예: "Ødegaard" -> "odegaard", "Müller" -> "muller")"""
+    decomposed = unicodedata.normalize("NFKD", str(name).translate(_TRANSLITERATE))
+    return normalize_name("".join(c for c in decomposed if not unicodedata.combining(c)))
+
+
+def _build_team_index(teams) -> dict:
+    index = {}
+    for canonical, aliases in teams.items():
+        for name in [canonical, *aliases]:
+            index[fold_accents(name)] = canonical
+    return index
+
+
+# 리그 ID -> {악센트 무시 이름: 기준 이름}, 리그를 모를 때 쓰는 전체 리그 통합 인덱스
+_TEAM_INDEX = {lid: _build_team_index(info["teams"]) for lid, info in LEAGUES.items()}
+_ALL_TEAMS_INDEX = {k: v for index in _TEAM_INDEX.values() for k, v in index.items()}
+
+
+def canonical_team(team_name, league=None):
+    """
+    팀 이름을 리그 팀 표의 기준 이름(Understat 이름)으로 통일합니다.
+    표에 없는 이름은 그대로 반환합니다 (league가 없으면 모든 리그에서 찾음).
+    """
+    if not isinstance(team_name, str):
+        return team_name
+    index = _TEAM_INDEX[league_id(league)] if league is not None else _ALL_TEAMS_INDEX
+    return index.get(fold_accents(team_name), team_name)
+
+
+def league_teams(league=None) -> list:
+    """리그 팀 표의 기준 이름 목록"""
+    return list(LEAGUES[league_id(league)]["teams"])
+
+
+def league_id(league=None) -> int:
+    """
+    API-Football 리그 ID, code("EPL"), 이름("La Liga"), Understat 이름 중 무엇이든 리그 ID로 변환합니다.
+    None이면 기본 리그(프리미어리그)
+    """
+    if league is None:
+        return DEFAULT_LEAGUE
+    if isinstance(league, str) and league.isdigit():
+        league = int(league)
+    if league in LEAGUES:
+        return league
+    key = str(league).lower()
+    for lid, info in LEAGUES.items():
+        if key in (info["code"].lower(), info["name"].lower(), info["understat"].lower()):
+            return lid
+    raise ValueError(f"지원하지 않는 리그: {league}")
+
+
+def get_league(league=None) -> dict:
+    """리그 설정 (id 포함)"""
+    lid = league_id(league)
+    return dict(LEAGUES[lid], id=lid)
+
+
+def league_in_text(text):
+    """문장에 언급된 리그 ID (예: "라리가 우승 확률" -> 140, 없으면 None)"""
+    lowered = str(text).lower()
+    for lid, info in LEAGUES.items():
+        if any(alias.lower() in lowered for alias in info["aliases"]):
+            return lid
+    return None
+
+
+def league_for_country(country):
+    """국가 이름으로 리그 ID 찾기 (없으면 None)"""
+    for lid, info in LEAGUES.items():
+        if country and info["country"].lower() == str(country).lower():
+            return lid
+    return None
+
+
+def current_season(today=None) -> int:
+    """진행 중인 시즌의 시작 연도 (7월부터 새 시즌)"""
+    today = today or date.today()
+    return today.year if today.month >= 7 else today.year - 1
+
+
+def season_of(match_date):
+    """
+    경기 날짜가 속한 시즌의 시작 연도 (7월 이전 경기는 전년도 시즌)
+    날짜 하나면 int, 날짜 목록/Series면 시즌 배열(np.ndarray)
+    """
+    if pd.api.types.is_scalar(match_date):
+        return current_season(pd.Timestamp(match_date).date())
+    dates = pd.DatetimeIndex(pd.to_datetime(match_date))
+    return (dates.year - (dates.month < 7)).to_numpy()
@@ -1,21 +1,32 @@
-import requests
 from datetime import datetime
 from dateutil.parser import parse
 from dotenv import load_dotenv
 import os
+import time
+
+import http_client
+import api_scheduler
+import fixture_calendar
+from leagues import DEFAULT_LEAGUE, league_id, league_in_text, current_season, season_of
 
 load_dotenv()
 api_key = os.getenv("X_RAPIDAPI_KEY")
 
-def get_fixture_info(api_key, match_date, team_name):
-    """
-    API-Football를 사용하여 프리미어리그 경기 정보를 가져오는 함수.
-    특정 날짜에 주어진 팀이 관련된 경기의 홈/어웨이 팀 정보를 반환합니다.
+# 1이면 파라미터 추출 과정을 출력 (기본: 출력하지 않음)
+DEBUG = os.getenv("MATCH_PARSER_DEBUG") == "1"
 
-    - match_date: 경기 날짜 (YYYY-MM-DD 형식)
-    - team_name: 검색할 팀의 이름 (영문)
 
-    - 반환값: 홈팀과 어웨이팀의 이름을 포함한 딕셔너리, 없으면 None
+def _debug(message):
+    if DEBUG:
+        print(f"[DEBUG] {message}")
+
+
+def _get_fixtures(api_key, params):
+    """
+    API-Football fixtures 엔드포인트 호출 (api_scheduler의 호출 한도 안에서).
+    같은 파라미터의 요청이 이미 진행 중이면 그 결과를 함께 사용합니다.
+
+    - 반환값: response 항목 목록
     """
     url = "https://api-football-v1.p.rapidapi.com/v3/fixtures"
 
@@ -24,33 +35,93 @@ def get_fixture_info(api_key, match_date, team_name):
         "X-RapidAPI-Host": "api-football-v1.p.rapidapi.com"
     }
 
-    params = {
-        "date": match_date,
-        "league": 39,  # 프리미어리그의 리그 ID
-        "season": 2024 # Assuming current season is 2024-2025, so season parameter should be 2024
-    }
+    def send():
+        return http_client.get(url, params=params, headers=headers, endpoint="fixtures", max_retries=0)
 
-    response = requests.get(url, headers=headers, params=params)
+    key = ("fixtures", tuple(sorted(params.items())))
+    response = api_scheduler.scheduler.request(key, send)
     response.raise_for_status() # Raise an exception for HTTP errors
-    data = response.json()
+    return response.json()["response"]
+
 
-    for fixture in data["response"]:
-        home = fixture["teams"]["home"]["name"].lower()
-        away = fixture["teams"]["away"]["name"].lower()
+def get_fixture_info(api_key, match_date, team_name, league=DEFAULT_LEAGUE, season=None):
+    """
+    시즌 경기 일정 캘린더에서 리그 경기 정보를 찾는 함수 (캘린더가 로드되어 있으면 네트워크 호출 없음).
+    특정 날짜에 주어진 팀이 관련된 경기의 홈/어웨이 팀 정보를 반환합니다.
+
+    - match_date: 경기 날짜 (YYYY-MM-DD 형식)
+    - team_name: 검색할 팀의 이름 (영문)
+    - league: API-Football 리그 ID (기본: 프리미어리그)
+    - season: 시즌 시작 연도 (없으면 경기 날짜가 속한 시즌)
 
-        if team_name.lower() in [home, away]:
-            return {
-                "home_team": fixture["teams"]["home"]["name"],
-                "away_team": fixture["teams"]["away"]["name"]
-            }
+    - 반환값: 홈팀과 어웨이팀의 이름을 포함한 딕셔너리, 없으면 None
+    """
+    calendar = get_calendar(api_key, league, season or season_of(match_date))
+    fixture = calendar.find(match_date, team_name)
+    if fixture:
+        return {
+            "home_team": fixture["home_team"],
+            "away_team": fixture["away_team"]
+        }
 
     return None
 
 
-def extract_match_parameters(user_input: str, chat_history: list) -> dict:
+def get_next_fixtures(api_key, team_name, league=DEFAULT_LEAGUE, n=1):
+    """
+    진행 중인 시즌에서 주어진 팀의 다음 경기 n개를 캘린더에서 찾는 함수.
+
+    - 반환값: [{"match_date", "home_team", "away_team"}, ...] (킥오프 순)
+    """
+    return [
+        {"match_date": f["match_date"], "home_team": f["home_team"], "away_team": f["away_team"]}
+        for f in get_calendar(api_key, league).next_matches(team_name, n)
+    ]
+
+
+def get_calendar(api_key, league=DEFAULT_LEAGUE, season=None):
+    """리그/시즌 경기 일정 캘린더 (처음 한 번만 시즌 전체 일정을 받아 옴)"""
+    return fixture_calendar.get_calendar(lambda params: _get_fixtures(api_key, params), league, season)
+
+
+def start_calendar_refresh():
+    """기본 리그의 경기 일정을 미리 받아 두고 주기적으로 갱신하는 백그라운드 스레드 시작"""
+    return fixture_calendar.start_background_refresh(lambda params: _get_fixtures(api_key, params))
+
+
+def get_league_fixtures(api_key, league=DEFAULT_LEAGUE, season=None, round_name=None, next_n=None, status=None):
+    """
+    시즌 경기 일정 캘린더에서 리그 경기 목록을 가져오는 함수.
+
+    - season: 시즌 시작 연도 (없으면 진행 중인 시즌)
+    - round_name: 라운드 이름 (예: "Regular Season - 38"), 없으면 시즌 전체
+    - next_n: 지정하면 앞으로 열릴 경기 n개만
+    - status: 경기 상태 필터 (예: "NS" = 아직 시작하지 않은 경기)
+
+    - 반환값: [{"match_date", "home_team", "away_team"}, ...]
+    """
+    calendar = get_calendar(api_key, league, season or current_season())
+    fixtures = calendar.select(round_name=round_name, status=status)
+    if next_n:
+        now = time.time()
+        fixtures = [f for f in fixtures if f["timestamp"] > now][:next_n]
+
+    return [
+        {
+            "match_date": fixture["match_date"],
+            "home_team": fixture["home_team"],
+            "away_team": fixture["away_team"]
+        }
+        for fixture in fixtures
+    ]
+
+
+def extract_match_parameters(user_input: str, chat_history: list, league: int = None) -> dict:
     """
     사용자 입력에서 경기 날짜와 팀 정보를 파싱하고,
     API를 통해 홈/어웨이 팀을 확정하여 반환합니다.
+    리그는 league 인자 > 문장에 언급된 리그 > 찾은 팀의 소속 리그 순으로 정합니다.
+    날짜가 없으면 (예: "토트넘 다음 경기") 캘린더에서 그 팀의 다음 경기를 찾습니다.
     """
 
     team_kor_to_eng = {
@@ -59,24 +130,36 @@ def extract_match_parameters(user_input: str, chat_history: list) -> dict:
         "풀럼": "Fulham", "리즈": "Leeds United", "리버풀": "Liverpool", "맨시티": "Man City",
         "맨체스터 시티": "Man City", "맨유": "Man Utd", "맨체스터 유나이티드": "Man Utd",
         "뉴캐슬": "Newcastle", "노팅엄 포레스트": "Nottingham Forest", "사우샘프턴": "Southampton",
-        "토트넘": "Tottenham", "스퍼스": "Spurs", "웨스트햄": "West Ham", "울브스": "Wolves", "울버햄튼": "Wolves"
+        "토트넘": "Tottenham", "스퍼스": "Spurs", "웨스트햄": "West Ham", "울브스": "Wolves", "울버햄튼": "Wolves",
+        # 라리가 / 세리에 A / 분데스리가
+        "레알 마드리드": "Real Madrid", "바르셀로나": "Barcelona", "바르사": "Barcelona",
+        "아틀레티코": "Atletico Madrid", "인테르": "Inter", "인터 밀란": "Inter", "AC 밀란": "AC Milan",
+        "유벤투스": "Juventus", "나폴리": "Napoli", "바이에른": "Bayern München", "뮌헨": "Bayern München",
+        "도르트문트": "Borussia Dortmund", "레버쿠젠": "Bayer Leverkusen"
     }
 
-    # 날짜 파싱
+    # 프리미어리그가 아닌 팀의 리그 ID
+    team_league = {
+        "Real Madrid": 140, "Barcelona": 140, "Atletico Madrid": 140,
+        "Inter": 135, "AC Milan": 135, "Juventus": 135, "Napoli": 135,
+        "Bayern München": 78, "Borussia Dortmund": 78, "Bayer Leverkusen": 78
+    }
+
+    # 날짜 파싱 (없으면 팀을 찾은 뒤 다음 경기 날짜를 사용)
     try:
         match_date = parse(user_input, fuzzy=True).date()
     except Exception:
-        return {"match_date": None, "home_team": None, "away_team": None}
+        match_date = None
 
     # 1. 참조 표현 확인 ("그 팀", "그팀", "해당 팀" 등)
     reference_keywords = ["그 팀", "그팀", "해당 팀", "그 클럽", "그클럽"]
     has_reference = any(keyword in user_input for keyword in reference_keywords)
     
     if has_reference:
-        print("[DEBUG] 참조 표현 감지, chat_history에서 팀 검색 중...")
+        _debug("참조 표현 감지, chat_history에서 팀 검색 중...")
         # chat_history에서 가장 최근에 언급된 팀 찾기
         found_team = find_team_from_history(chat_history, team_kor_to_eng)
-        print(f"[DEBUG] chat_history에서 찾은 팀: {found_team}")
+        _debug(f"chat_history에서 찾은 팀: {found_team}")
     else :
         found_team = None
     
@@ -87,26 +170,37 @@ def extract_match_parameters(user_input: str, chat_history: list) -> dict:
                 found_team = eng
                 break
     
-    print(f"[DEBUG] 파싱된 날짜: {match_date}, 찾은 팀: {found_team}")
+    _debug(f"파싱된 날짜: {match_date}, 찾은 팀: {found_team}")
 
     if not found_team:
-        return {"match_date": str(match_date), "home_team": None, "away_team": None}
+        return {"match_date": str(match_date) if match_date else None, "home_team": None, "away_team": None, "league": None}
+
+    league = league_id(league or league_in_text(user_input) or team_league.get(found_team))
 
-    # API를 통해 홈/어웨이 정보 확정
+    if match_date is None:
+        next_fixtures = get_next_fixtures(api_key, found_team, league=league)
+        if not next_fixtures:
+            return {"match_date": None, "home_team": None, "away_team": None, "league": league}
+        match_date = next_fixtures[0]["match_date"]
+        _debug(f"날짜가 없어 다음 경기 날짜 사용: {match_date}")
+
+    # 경기 일정 캘린더에서 홈/어웨이 정보 확정
     # team1 대신 found_team을 전달하여 해당 팀이 포함된 경기를 검색
-    fixture = get_fixture_info(api_key, str(match_date), found_team)
+    fixture = get_fixture_info(api_key, str(match_date), found_team, league=league)
     if fixture:
-        print(f"[DEBUG] API에서 찾은 경기 정보: {fixture}")
+        _debug(f"캘린더에서 찾은 경기 정보: {fixture}")
         return {
             "match_date": str(match_date),
             "home_team": fixture["home_team"],
-            "away_team": fixture["away_team"]
+            "away_team": fixture["away_team"],
+            "league": league
         }
     else:
         return {
             "match_date": str(match_date),
             "home_team": None,
-            "away_team": None
+            "away_team": None,
+            "league": league
         }
     
 def find_team_from_history(chat_history: list, team_kor_to_eng: dict) -> str:
@@ -125,11 +219,11 @@ def find_team_from_history(chat_history: list, team_kor_to_eng: dict) -> str:
         # 한국어 팀명 찾기
         for kor_name, eng_name in team_kor_to_eng.items():
             if kor_name in content:
-                print(f"[DEBUG] '{kor_name}' 팀을 chat_history에서 발견")
+                _debug(f"'{kor_name}' 팀을 chat_history에서 발견")
                 return eng_name
         
         # 영어 팀명도 찾기 (API 응답에서 나온 경우)
         for eng_name in team_kor_to_eng.values():
             if eng_name.lower() in content.lower():
-                print(f"[DEBUG] '{eng_name}' 팀을 chat_history에서 발견")
+                _debug(f"'{eng_name}' 팀을 chat_history에서 발견")
                 return eng_name
\ No newline at end of file
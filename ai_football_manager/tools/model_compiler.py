@@ -0,0 +1,351 @@
+import os
+import sys
+import json
+import numpy as np
+
+'''
+학습된 sklearn 모델을 NumPy 배열만으로 추론하는 함수로 변환(컴파일)하는 모듈
+- 전처리(컬럼 선택, 스케일링, 결측치 대체)와 최종 분류기(로지스틱 회귀, 결정 트리 계열)를
+  고정된 컬럼 순서의 배열 연산으로 바꿔 DataFrame/검증 오버헤드 없이 예측
+- 변환 시 원래 모델의 predict_proba와 결과가 허용 오차 안에서 같은지 반드시 확인
+- 전처리 후 NaN/inf가 남는 입력은 NaN 확률을 내지 않고 NonFiniteInputError로 거부 (호출한 쪽이 sklearn 경로로 대체)
+'''
+
+VERIFY_ATOL = 1e-9
+
+
+class UnsupportedModelError(ValueError):
+    pass
+
+
+class NonFiniteInputError(ValueError):
+    pass
+
+
+def _expit(z):
+    # 1 / (1 + exp(-z))를 overflow 없이 계산
+    return np.exp(-np.logaddexp(0.0, -z))
+
+
+class CompiledModel:
+    """
+    컴파일된 모델. input_columns 순서의 float64 행렬을 받아 클래스 1의 확률을 반환합니다.
+
+    ops: 전처리 단계 목록 [(종류, {배열})], head: 최종 분류기 (종류, {배열})
+    """
+
+    def __init__(self, input_columns, ops, head, checksum=None):
+        self.input_columns = list(input_columns)
+        self.ops = ops
+        self.head = head
+        self.checksum = checksum
+
+    def transform(self, X):
+        for kind, p in self.ops:
+            if kind == "gather":
+                X = X[:, p["index"]]
+            elif kind == "impute":
+                X = np.where(np.isnan(X), p["fill"], X)
+            elif kind == "standard":
+                X = (X - p["mean"]) / p["scale"]
+            elif kind == "minmax":
+                X = X * p["scale"] + p["min"]
+        return X
+
+    def predict_proba(self, X) -> np.ndarray:
+        """클래스 1의 확률 (n,)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        Z = self.transform(X)
+        if not np.isfinite(Z).all():
+            # 결측치 대체 단계가 없는 모델에 NaN/inf가 들어오면 sklearn처럼 거부
+            bad = [c for c, ok in zip(self.input_columns, np.isfinite(X).all(axis=0)) if not ok]
+            raise NonFiniteInputError(f"입력에 NaN/inf 값이 있습니다: {bad}")
+        X = Z
+        kind, p = self.head
+
+        if kind == "linear":
+            return _expit(X @ p["coef"] + p["intercept"])
+
+        # 결정 트리 계열: sklearn과 같이 float32로 비교
+        leaf_values = _eval_trees(X.astype(np.float32), p)
+        if kind == "forest":
+            return leaf_values.mean(axis=0)
+        if kind == "boosting":
+            return _expit(p["init"] + p["learning_rate"] * leaf_values.sum(axis=0))
+        raise UnsupportedModelError(kind)
+
+    def save(self, path):
+        arrays = {}
+        spec = {"input_columns": self.input_columns, "checksum": self.checksum, "ops": [], "head": None}
+        for i, (kind, p) in enumerate(self.ops):
+            spec["ops"].append({"kind": kind, "keys": list(p)})
+            for k, v in p.items():
+                arrays[f"op{i}_{k}"] = np.asarray(v)
+        kind, p = self.head
+        spec["head"] = {"kind": kind, "keys": list(p)}
+        for k, v in p.items():
+            arrays[f"head_{k}"] = np.asarray(v)
+        arrays["spec"] = np.frombuffer(json.dumps(spec).encode("utf-8"), dtype=np.uint8)
+
+        tmp = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(data["spec"].tobytes().decode("utf-8"))
+            ops = [
+                (op["kind"], {k: _scalar(data[f"op{i}_{k}"]) for k in op["keys"]})
+                for i, op in enumerate(spec["ops"])
+            ]
+            head = (spec["head"]["kind"], {k: _scalar(data[f"head_{k}"]) for k in spec["head"]["keys"]})
+        return cls(spec["input_columns"], ops, head, spec.get("checksum"))
+
+
+def _scalar(a):
+    return a.item() if a.ndim == 0 else a
+
+
+def _eval_trees(X, p):
+    """여러 트리를 한꺼번에 내려가며 각 트리의 리프 값을 반환 (트리 수 x 샘플 수)"""
+    n = X.shape[0]
+    nodes = np.repeat(p["roots"][:, None], n, axis=1)
+    rows = np.arange(n)[None, :]
+    for _ in range(int(p["max_depth"])):
+        leaf = p["left"][nodes] < 0
+        if leaf.all():
+            break
+        x = X[rows, p["feature"][nodes]]
+        go_left = np.where(np.isnan(x), p["missing_left"][nodes], x <= p["threshold"][nodes])
+        nodes = np.where(leaf, nodes, np.where(go_left, p["left"][nodes], p["right"][nodes]))
+    return p["value"][nodes]
+
+
+def _pack_trees(trees, leaf_value):
+    """sklearn Tree 객체 목록을 오프셋을 더한 하나의 노드 배열로 합침"""
+    feature, threshold, left, right, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for t in trees:
+        roots.append(offset)
+        is_leaf = t.children_left < 0
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        left.append(np.where(is_leaf, -1, t.children_left + offset))
+        right.append(np.where(is_leaf, -1, t.children_right + offset))
+        missing = getattr(t, "missing_go_to_left", None)
+        missing_left.append(np.asarray(missing, dtype=bool) if missing is not None else np.zeros(t.node_count, dtype=bool))
+        value.append(leaf_value(t))
+        offset += t.node_count
+        max_depth = max(max_depth, t.max_depth)
+
+    return {
+        "roots": np.asarray(roots, dtype=np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.concatenate(value).astype(np.float64),
+        "max_depth": max_depth + 1,
+    }
+
+
+def _class1_fraction(t):
+    # 분류 트리 리프의 클래스 1 비율 (sklearn predict_proba와 같은 정규화)
+    v = t.value[:, 0, :]
+    total = v.sum(axis=1)
+    total[total == 0] = 1.0
+    return v[:, 1] / total
+
+
+def _compile_head(est):
+    name = type(est).__name__
+    classes = getattr(est, "classes_", None)
+    if classes is not None and len(classes) != 2:
+        raise UnsupportedModelError(f"이진 분류 모델만 지원합니다: {name}")
+
+    if name == "LogisticRegression":
+        return ("linear", {"coef": est.coef_[0].astype(np.float64), "intercept": float(est.intercept_[0])})
+
+    if name == "DecisionTreeClassifier":
+        return ("forest", _pack_trees([est.tree_], _class1_fraction))
+
+    if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        return ("forest", _pack_trees([e.tree_ for e in est.estimators_], _class1_fraction))
+
+    if name == "GradientBoostingClassifier":
+        if est.init_ == "zero":
+            init = 0.0
+        else:
+            init = float(est._raw_predict_init(np.zeros((1, est.n_features_in_), dtype=np.float32))[0, 0])
+        p = _pack_trees([e.tree_ for e in est.estimators_[:, 0]], lambda t: t.value[:, 0, 0])
+        p.update({"init": init, "learning_rate": float(est.learning_rate)})
+        return ("boosting", p)
+
+    raise UnsupportedModelError(f"지원하지 않는 분류기: {name}")
+
+
+def _compile_transformer(tr):
+    if tr is None or isinstance(tr, str):
+        if tr in (None, "passthrough"):
+            return []
+        raise UnsupportedModelError(f"지원하지 않는 전처리: {tr}")
+    name = type(tr).__name__
+    if name == "StandardScaler":
+        mean = tr.mean_ if tr.with_mean else np.zeros(tr.n_features_in_)
+        scale = tr.scale_ if tr.with_std else np.ones(tr.n_features_in_)
+        return [("standard", {"mean": np.asarray(mean, dtype=np.float64), "scale": np.asarray(scale, dtype=np.float64)})]
+    if name == "MinMaxScaler" and not tr.clip:
+        return [("minmax", {"scale": tr.scale_.astype(np.float64), "min": tr.min_.astype(np.float64)})]
+    if name == "SimpleImputer" and not tr.add_indicator and np.isnan(tr.missing_values):
+        return [("impute", {"fill": tr.statistics_.astype(np.float64)})]
+    raise UnsupportedModelError(f"지원하지 않는 전처리: {name}")
+
+
+def _compile_column_transformer(ct, input_names):
+    """
+    ColumnTransformer를 '필요한 컬럼만 모아서(gather) 컬럼별 affine 변환'으로 바꿈.
+    각 변환기의 출력이 입력 컬럼과 1:1로 대응하는 경우만 지원
+    """
+    gather, mean, scale, mul, add, fill = [], [], [], [], [], []
+    for _, tr, cols in ct.transformers_:
+        if isinstance(tr, str) and tr == "drop":
+            continue
+        cols = np.asarray(cols)
+        if cols.dtype == bool:
+            idx = np.flatnonzero(cols).tolist()
+        elif np.issubdtype(cols.dtype, np.integer):
+            idx = cols.tolist()
+        else:
+            idx = [input_names.index(str(c)) for c in cols]
+        k = len(idx)
+        m, s, a, b, f = np.zeros(k), np.ones(k), np.ones(k), np.zeros(k), np.full(k, np.nan)
+        for kind, p in _compile_transformer(tr):
+            if kind == "standard":
+                m, s = p["mean"], p["scale"]
+            elif kind == "minmax":
+                a, b = p["scale"], p["min"]
+            elif kind == "impute":
+                f = p["fill"]
+        gather += idx
+        mean.append(m); scale.append(s); mul.append(a); add.append(b); fill.append(f)
+
+    ops = [("gather", {"index": np.asarray(gather, dtype=np.int64)})]
+    fill = np.concatenate(fill)
+    if not np.isnan(fill).all():
+        ops.append(("impute", {"fill": np.where(np.isnan(fill), 0.0, fill)}))
+    ops.append(("standard", {"mean": np.concatenate(mean), "scale": np.concatenate(scale)}))
+    ops.append(("minmax", {"scale": np.concatenate(mul), "min": np.concatenate(add)}))
+    return ops
+
+
+def compile_model(model, feature_names=None) -> CompiledModel:
+    """
+    sklearn 모델(또는 Pipeline)을 CompiledModel로 변환합니다.
+
+    Parameters
+    ----------
+    model : estimator
+        학습된 모델
+    feature_names : list, optional
+        모델 입력 컬럼 이름 (없으면 model.feature_names_in_ 사용)
+
+    Raises
+    ------
+    UnsupportedModelError
+        지원하지 않는 구성 요소가 있을 때
+    """
+    if feature_names is None:
+        if not hasattr(model, "feature_names_in_"):
+            raise UnsupportedModelError("입력 컬럼 이름을 알 수 없습니다.")
+        feature_names = [str(c) for c in model.feature_names_in_]
+    names = list(feature_names)
+
+    steps = [s for _, s in model.steps] if type(model).__name__ == "Pipeline" else [model]
+    ops = []
+    for step in steps[:-1]:
+        if type(step).__name__ == "ColumnTransformer":
+            if ops:
+                raise UnsupportedModelError("ColumnTransformer는 첫 단계에서만 지원합니다.")
+            ops += _compile_column_transformer(step, names)
+        else:
+            ops += _compile_transformer(step)
+    head = _compile_head(steps[-1])
+
+    # 실제로 사용하는 컬럼만 입력으로 받도록 gather를 입력 단계로 옮김
+    input_columns = names
+    if ops and ops[0][0] == "gather":
+        index = ops[0][1]["index"]
+        used = sorted(set(index.tolist()))
+        input_columns = [names[i] for i in used]
+        remap = {old: new for new, old in enumerate(used)}
+        ops[0] = ("gather", {"index": np.asarray([remap[i] for i in index], dtype=np.int64)})
+
+    return CompiledModel(input_columns, ops, head)
+
+
+def _verification_sample(compiled, n=2000, seed=0):
+    # 트리 분기점 주변과 넓은 범위의 값을 섞어 검증용 입력 생성
+    rng = np.random.default_rng(seed)
+    k = len(compiled.input_columns)
+    X = rng.normal(0, 10, size=(n, k)) + rng.choice([0.0, 1.0, 8.0, 1500.0], size=(n, k))
+    return X
+
+
+def verify(model, compiled, X, atol=VERIFY_ATOL) -> float:
+    """
+    원래 모델과 컴파일된 모델의 클래스 1 확률을 비교해 최대 오차를 반환합니다.
+    X는 compiled.input_columns 순서의 행렬이며, 허용 오차를 넘으면 예외를 발생시킵니다.
+    """
+    import pandas as pd
+
+    names = [str(c) for c in getattr(model, "feature_names_in_", compiled.input_columns)]
+    frame = pd.DataFrame(0.0, index=range(len(X)), columns=names)
+    for j, c in enumerate(compiled.input_columns):
+        frame[c] = X[:, j]
+    if not hasattr(model, "feature_names_in_"):
+        frame = frame.to_numpy()
+
+    expected = model.predict_proba(frame)[:, 1]
+    got = compiled.predict_proba(X)
+    max_err = float(np.max(np.abs(expected - got))) if len(X) else 0.0
+    if max_err > atol:
+        raise UnsupportedModelError(f"컴파일 결과가 원래 모델과 다릅니다 (최대 오차 {max_err:.3g})")
+    return max_err
+
+
+def compile_and_verify(model, feature_names=None, X=None, checksum=None) -> CompiledModel:
+    """컴파일 후 검증 샘플(또는 주어진 X)로 결과가 같은지 확인"""
+    compiled = compile_model(model, feature_names)
+    compiled.checksum = checksum
+    verify(model, compiled, X if X is not None else _verification_sample(compiled))
+    return compiled
+
+
+def compiled_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def export_compiled(model_path: str, X=None) -> str:
+    """모델 파일을 컴파일해 같은 이름의 .npz로 저장 (모델 체크섬을 함께 기록)"""
+    import joblib
+    from model_registry import file_checksum
+
+    model = joblib.load(model_path)
+    compiled = compile_and_verify(model, X=X, checksum=file_checksum(model_path))
+    path = compiled_path(model_path)
+    compiled.save(path)
+    return path
+
+
+if __name__ == "__main__":
+    # 사용법: python model_compiler.py [모델 파일 경로]
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from model_registry import MODEL_PATH
+
+    target = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    print(f"컴파일 완료: {export_compiled(target)}")
@@ -1,39 +1,79 @@
 import numpy as np
 import pandas as pd
-import joblib
-import os
 
-# 모델 파일 경로를 프로젝트 루트 기준으로 설정
-PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
-MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "model_final.pkl")
+from model_registry import registry, MODEL_PATH
+from model_compiler import NonFiniteInputError
 
-_model = None
 log_columns = ['HomeElo', 'AwayElo']
 
 def load_model():
-    global _model
-    if _model is None:
-        _model = joblib.load(MODEL_PATH)
-    return _model
+    return registry.current().model
 
-def predict_match_result(df_input: pd.DataFrame) -> pd.DataFrame:
-    """
-    학습된 모델을 이용해 경기 정보를 받아 승부 예측 결과를 반환
-    """
-    df = df_input.copy()
+def warm_up():
+    """앱 시작 시 모델을 미리 로드하고, 파일이 바뀌면 자동 교체되도록 감시 시작"""
+    try:
+        registry.current()
+    except Exception as e:
+        print(f"모델 사전 로드 중 오류 발생: {e}")
+    registry.start_watcher()
 
-    # 전처리: 로그변환 및 파생 변수
+def get_model_version() -> str:
+    """현재 서비스 중인 모델 버전 (로드할 수 없으면 "missing")"""
+    try:
+        return registry.current().version
+    except Exception:
+        return "missing"
+
+def preprocess(df_input: pd.DataFrame) -> pd.DataFrame:
+    """모델 입력 전처리: Elo 로그변환 및 파생 변수 (학습과 예측에서 공통으로 사용)"""
+    df = df_input.copy()
     df[log_columns] = np.log1p(df[log_columns])
     df['elo_diff'] = df['HomeElo'] - df['AwayElo']
+    return df
 
-    # 예측
-    model = load_model()
-    proba = model.predict_proba(df)[:, 1]
+def build_input_matrix(df_input: pd.DataFrame, columns: list) -> np.ndarray:
+    """
+    컴파일된 모델의 입력 컬럼 순서대로 float64 행렬을 만듭니다.
+    전처리는 sklearn 경로와 같음: Elo 로그변환, elo_diff는 로그변환된 Elo의 차이
+    """
+    log_elo = {c: np.log1p(df_input[c].to_numpy(dtype=np.float64)) for c in log_columns}
+    X = np.empty((len(df_input), len(columns)))
+    for j, col in enumerate(columns):
+        if col in log_elo:
+            X[:, j] = log_elo[col]
+        elif col == 'elo_diff':
+            X[:, j] = log_elo['HomeElo'] - log_elo['AwayElo']
+        else:
+            X[:, j] = df_input[col].to_numpy(dtype=np.float64)
+    return X
+
+def predict_proba(df_input: pd.DataFrame, current=None) -> np.ndarray:
+    """원정팀 승리 확률 (컴파일된 모델이 있으면 NumPy 경로, 없으면 sklearn 경로)"""
+    current = current or registry.current()
+
+    if current.compiled is not None:
+        X = build_input_matrix(df_input, current.compiled.input_columns)
+        try:
+            return current.compiled.predict_proba(X)
+        except NonFiniteInputError as e:
+            # NaN 확률을 내지 않고 sklearn 경로로 (sklearn도 처리할 수 없으면 예외)
+            print(f"컴파일된 모델 입력 오류, sklearn 추론 경로 사용: {e}")
+
+    return current.model.predict_proba(preprocess(df_input))[:, 1]
+
+def predict_match_result(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    학습된 모델을 이용해 경기 정보를 받아 승부 예측 결과를 반환
+    """
+    # 예측 (예측 도중 모델이 교체되어도 같은 모델과 버전을 사용)
+    current = registry.current()
+    proba = predict_proba(df_input, current)
     pred = (proba > 0.5).astype(int)
 
     result_df = df_input.copy()
     result_df["AwayWin_Prob"] = proba
     result_df["Pred_Label"] = pred
     result_df["Pred_Result"] = result_df["Pred_Label"].map({0: "Home Win", 1: "Away Win"})
+    result_df["Model_Version"] = current.version
 
     return result_df
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import joblib
+
+import model_compiler
+
+'''
+예측 모델 레지스트리
+- models/model_<버전>.pkl + model_<버전>.json(메타데이터)로 버전별 모델 보관
+- models/model_final.pkl(+ .json)이 현재 서비스 중인 모델
+- 시작 시 미리 로드하고, 파일이 바뀌면 새 모델을 다 읽은 뒤 한 번에 교체
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+MODEL_PATH = os.path.join(MODELS_DIR, "model_final.pkl")
+WATCH_INTERVAL_SECONDS = 30
+
+# compiled: NumPy 추론용으로 컴파일된 모델 (지원하지 않는 모델이면 None)
+LoadedModel = namedtuple("LoadedModel", ["model", "version", "metadata", "compiled"])
+
+
+def file_checksum(path: str) -> str:
+    """파일의 sha256 체크섬"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _meta_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".json"
+
+
+def read_metadata(model_path: str) -> dict:
+    """모델 옆의 메타데이터(.json)를 읽음 (없으면 빈 딕셔너리)"""
+    try:
+        with open(_meta_path(model_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def register_model(model, metadata: dict = None, activate: bool = True, models_dir: str = MODELS_DIR) -> str:
+    """
+    학습된 모델을 버전 파일로 저장하고, activate=True면 서비스 모델로 교체합니다.
+
+    Parameters
+    ----------
+    model : estimator
+        joblib으로 저장할 학습된 모델
+    metadata : dict, optional
+        features(피처 목록), training_window(학습 기간) 등 추가 정보
+
+    Returns
+    -------
+    str
+        모델 버전 (체크섬 앞 12자리)
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    tmp_path = os.path.join(models_dir, f".model-{os.getpid()}.pkl")
+    joblib.dump(model, tmp_path)
+
+    checksum = file_checksum(tmp_path)
+    version = checksum[:12]
+    meta = dict(metadata or {})
+    if "features" not in meta and hasattr(model, "feature_names_in_"):
+        meta["features"] = [str(c) for c in model.feature_names_in_]
+    meta.update({
+        "version": version,
+        "checksum": checksum,
+        "created_at": datetime.now().isoformat(timespec="seconds")
+    })
+
+    path = os.path.join(models_dir, f"model_{version}.pkl")
+    os.replace(tmp_path, path)
+    with open(_meta_path(path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    # NumPy 추론용 컴파일 결과도 함께 저장 (지원하지 않는 모델이면 생략)
+    try:
+        model_compiler.export_compiled(path)
+    except model_compiler.UnsupportedModelError as e:
+        print(f"모델 컴파일 생략: {e}")
+
+    if activate:
+        activate_model(version, models_dir)
+    return version
+
+
+def activate_model(version: str, models_dir: str = MODELS_DIR):
+    """저장된 버전을 서비스 모델(model_final.pkl)로 지정 (메타데이터 먼저, 모델은 rename으로 교체)"""
+    src = os.path.join(models_dir, f"model_{version}.pkl")
+    dst = os.path.join(models_dir, "model_final.pkl")
+
+    pairs = [(_meta_path(src), _meta_path(dst)), (src, dst)]
+    if os.path.exists(model_compiler.compiled_path(src)):
+        pairs.insert(1, (model_compiler.compiled_path(src), model_compiler.compiled_path(dst)))
+
+    for s, d in pairs:
+        tmp = f"{d}.tmp-{os.getpid()}"
+        shutil.copyfile(s, tmp)
+        os.replace(tmp, d)
+
+
+def list_versions(models_dir: str = MODELS_DIR) -> list:
+    """저장된 모델 버전들의 메타데이터 목록 (최신순)"""
+    versions = []
+    for name in os.listdir(models_dir) if os.path.isdir(models_dir) else []:
+        if name.startswith("model_") and name.endswith(".pkl") and name != "model_final.pkl":
+            meta = read_metadata(os.path.join(models_dir, name))
+            if meta:
+                versions.append(meta)
+    return sorted(versions, key=lambda m: m.get("created_at", ""), reverse=True)
+
+
+class ModelRegistry:
+    def __init__(self, model_path: str = MODEL_PATH):
+        self.model_path = model_path
+        self._current = None
+        self._stat = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def _file_stat(self):
+        st = os.stat(self.model_path)
+        return (st.st_size, st.st_mtime_ns)
+
+    def _load(self):
+        stat = self._file_stat()
+        model = joblib.load(self.model_path)
+        metadata = read_metadata(self.model_path)
+
+        # 메타데이터가 없거나 다른 파일의 것이면 체크섬을 직접 계산
+        checksum = file_checksum(self.model_path)
+        if metadata.get("checksum") != checksum:
+            metadata = {"checksum": checksum}
+        metadata.setdefault("version", checksum[:12])
+        if "features" not in metadata and hasattr(model, "feature_names_in_"):
+            metadata["features"] = [str(c) for c in model.feature_names_in_]
+
+        compiled = self._load_compiled(model, metadata, checksum)
+
+        # 새 모델을 다 읽은 뒤 참조만 교체
+        self._current = LoadedModel(model, metadata["version"], metadata, compiled)
+        self._stat = stat
+        print(f"모델 로드 완료: 버전 {metadata['version']}")
+        return self._current
+
+    def _load_compiled(self, model, metadata, checksum):
+        # 저장된 컴파일 결과가 이 모델의 것이면 사용, 아니면 지금 컴파일 (요청 경로가 아닌 로드 시점)
+        path = model_compiler.compiled_path(self.model_path)
+        try:
+            compiled = model_compiler.CompiledModel.load(path)
+            if compiled.checksum == checksum:
+                return compiled
+        except (OSError, ValueError, KeyError):
+            pass
+
+        try:
+            features = None if hasattr(model, "feature_names_in_") else metadata.get("features")
+            return model_compiler.compile_and_verify(model, features, checksum=checksum)
+        except model_compiler.UnsupportedModelError as e:
+            print(f"모델 컴파일 불가, sklearn 추론 경로 사용: {e}")
+            return None
+
+    def current(self) -> LoadedModel:
+        """현재 서비스 중인 모델 (아직 없으면 로드)"""
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._load()
+                current = self._current
+        return current
+
+    def reload_if_changed(self) -> bool:
+        """모델 파일이 바뀌었으면 다시 로드해 교체 (바뀌었으면 True)"""
+        try:
+            stat = self._file_stat()
+        except OSError:
+            return False
+        if stat == self._stat:
+            return False
+        with self._lock:
+            if self._file_stat() == self._stat:
+                return False
+            self._load()
+        return True
+
+    def _watch_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # 교체에 실패하면 기존 모델을 계속 사용
+                print(f"모델 교체 중 오류 발생: {e}")
+
+    def start_watcher(self, interval=WATCH_INTERVAL_SECONDS):
+        """모델 파일 변경을 주기적으로 확인하는 데몬 스레드 시작 (한 번만)"""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return self._watcher
+            self._watcher = threading.Thread(
+                target=self._watch_loop, args=(interval,), name="model-watcher", daemon=True
+            )
+            self._watcher.start()
+        return self._watcher
+
+
+registry = ModelRegistry()
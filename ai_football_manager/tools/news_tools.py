@@ -1,8 +1,16 @@
+import os
+import sys
 import requests
 import json
 from openai import OpenAI
 from config import OPENAI_API_KEY, NEWS_API_KEY
 
+# 같은 tools 폴더의 모듈을 import하기 위한 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import http_client
+
 client = OpenAI(api_key=OPENAI_API_KEY)
 
 def extract_search_query(user_input: str) -> str:
@@ -42,7 +50,7 @@ def search_news(query: str, n: int = 5) -> list:
 	url = f"https://newsapi.org/v2/everything?q={query}&language=ko&sortBy=publishedAt&pageSize={n}&apiKey={NEWS_API_KEY}"
 
 	try:
-		response = requests.get(url, timeout=10)
+		response = http_client.get(url, endpoint="news")
 		response.raise_for_status()    # HTTP 오류 발생시 예외 발생
 		data = response.json()
 		# print(f"[DEBUG] 뉴스 API 응답: {data}")  # 디버깅용 로그
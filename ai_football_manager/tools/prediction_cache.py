@@ -0,0 +1,92 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+'''
+경기 예측 결과 캐시 (TTL + LRU)
+- 같은 키로 동시에 들어온 요청은 한 번만 계산하고 결과를 나눠 받음 (single-flight)
+'''
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 512, ttl: float = 15 * 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (만료 시각, 결과)
+        self._inflight = {}             # key -> 계산 중인 Future
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        캐시에 있으면 바로 반환하고, 없으면 compute()로 계산해 저장합니다.
+        같은 key를 계산 중인 요청이 있으면 새로 계산하지 않고 그 결과를 기다립니다.
+        None(예측 실패)은 캐시하지 않습니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[1])
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return _copy(future.result())
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if value is not None:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return _copy(value)
+
+    def invalidate(self, predicate=None):
+        """
+        저장된 결과를 비웁니다 (계산 중인 요청은 그대로 완료)
+        predicate(key)가 주어지면 True인 키만 지움
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced
+            }
+
+
+def _copy(value):
+    # 호출한 쪽에서 결과를 수정해도 캐시가 바뀌지 않도록 얕은 복사
+    return dict(value) if isinstance(value, dict) else value
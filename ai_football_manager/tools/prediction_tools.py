@@ -14,6 +14,23 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
+from prediction_cache import PredictionCache
+
+# (리그, 경기 날짜, 홈팀, 원정팀, 모델 버전, 피처 버전) -> 예측 결과
+_prediction_cache = PredictionCache(maxsize=512, ttl=15 * 60)
+_cache_versions = {}   # 리그 ID -> 마지막으로 본 (모델 버전, 피처 버전, ...)
+
+def warm_up():
+    """
+    앱 시작 시 DataCollector, 예측 모델, 경기 일정 캘린더를 미리 준비하고 주기적으로 갱신하도록 설정하는 함수
+    """
+    from data_collector_tools import start_background_refresh
+    from match_parser import start_calendar_refresh
+    import model_predictor
+    model_predictor.warm_up()
+    start_background_refresh()
+    start_calendar_refresh()
+
 def get_match_prediction(user_input: str, chat_history: list = None) -> dict:
     """
     사용자 입력을 받아 경기 예측을 수행하는 함수
@@ -31,9 +48,7 @@ def get_match_prediction(user_input: str, chat_history: list = None) -> dict:
         예측 결과 딕셔너리 또는 실패 시 None
     """
     try:
-        from data_collector_tools import DataCollector
         from match_parser import extract_match_parameters
-        from model_predictor import predict_match_result
         
         # 1. 사용자 입력에서 경기 정보 추출
         params = extract_match_parameters(user_input, chat_history)
@@ -43,30 +58,258 @@ def get_match_prediction(user_input: str, chat_history: list = None) -> dict:
         if not params["match_date"] or not params["home_team"] or not params["away_team"]:
             return None
         
-        # 2. 데이터 수집
-        # print(f"[DEBUG] 데이터 수집 시작: {params['match_date']} - {params['home_team']} vs {params['away_team']}")
-        collector = DataCollector()
-        df_final = collector.collect_features(
-            match_date=params["match_date"],
-            home_team=params["home_team"],
-            away_team=params["away_team"]
-        )
-
-        # print(f"[DEBUG] 수집된 데이터: {df_final}")
-        # df_final.to_csv("collected_features.csv", index=False)  # 디버깅용 CSV 저장
-        # 4. 모델 예측
-        result_df = predict_match_result(df_final)
-        
-        if result_df is None or result_df.empty:
+        # 2~4. 데이터 수집 및 모델 예측 (캐시)
+        result = predict_fixture(params["match_date"], params["home_team"], params["away_team"], params.get("league"))
+        if result is None:
             return None
-            
-        # DataFrame을 딕셔너리로 변환하여 반환
-        result_dict = result_df.iloc[0].to_dict()
-        
-        # print(f"[DEBUG] 예측 결과: {result_dict}")
 
-        return result_dict
-        
+        # 5. 두 팀의 상대 전적 (네트워크 호출 없이 메모리 인덱스에서 조회, 캐시된 결과는 수정하지 않음)
+        h2h = get_head_to_head(params["home_team"], params["away_team"], params["match_date"], params.get("league"))
+        return dict(result, H2H=h2h)
+
     except Exception as e:
         print(f"예측 중 오류 발생: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def predict_fixture(match_date, home_team: str, away_team: str, league: int = None) -> dict:
+    """
+    한 경기의 예측 결과를 캐시를 거쳐 반환하는 함수
+
+    캐시 키에 리그, 모델 버전과 피처 스냅샷 버전이 포함되므로, 둘 중 하나가 바뀌면
+    이전 결과는 더 이상 사용되지 않습니다. 같은 경기에 대한 동시 요청은 한 번만 계산합니다.
+
+    Parameters
+    ----------
+    league : int, optional
+        API-Football 리그 ID (없으면 프리미어리그)
+
+    Returns
+    -------
+    dict or None
+        예측 결과 딕셔너리 또는 실패 시 None
+    """
+    import pandas as pd
+    from data_collector_tools import get_collector, canonical_team_name, FEATURE_VERSION
+    from model_predictor import get_model_version
+
+    collector = get_collector(league)
+    versions = (get_model_version(), FEATURE_VERSION, collector.feature_fingerprint, collector.elo_source)
+    previous = _cache_versions.get(collector.league)
+    if previous is not None and versions != previous:
+        # 모델이나 피처가 바뀌면 이 리그의 이전 결과만 버림
+        # (다른 리그 결과는 키에 든 버전으로 구분되므로 그대로 둠)
+        _prediction_cache.invalidate(lambda key: key[0] == collector.league)
+    _cache_versions[collector.league] = versions
+
+    key = (
+        collector.league,
+        str(pd.Timestamp(match_date).date()),
+        canonical_team_name(home_team, collector.league),
+        canonical_team_name(away_team, collector.league),
+    ) + versions
+
+    return _prediction_cache.get_or_compute(
+        key, lambda: _compute_prediction(collector, match_date, home_team, away_team)
+    )
+
+
+def _compute_prediction(collector, match_date, home_team, away_team):
+    from model_predictor import predict_match_result
+
+    # print(f"[DEBUG] 데이터 수집 시작: {match_date} - {home_team} vs {away_team}")
+    unknown = collector.unknown_teams([home_team, away_team])
+    if unknown:
+        print(f"경고: Understat 기록에서 찾을 수 없는 팀 (리그 {collector.league}): {unknown}")
+    df_final = collector.collect_features(
+        match_date=match_date,
+        home_team=home_team,
+        away_team=away_team
+    )
+
+    # print(f"[DEBUG] 수집된 데이터: {df_final}")
+    # df_final.to_csv("collected_features.csv", index=False)  # 디버깅용 CSV 저장
+    result_df = predict_match_result(df_final)
+
+    if result_df is None or result_df.empty:
+        return None
+    result_df = add_scoreline_predictions(result_df, collector)
+
+    # DataFrame을 딕셔너리로 변환하여 반환
+    return result_df.iloc[0].to_dict()
+
+
+def get_head_to_head(home_team: str, away_team: str, match_date=None, league: int = None, last_n: int = 5):
+    """
+    홈팀 기준 두 팀의 상대 전적을 반환하는 함수
+
+    Parameters
+    ----------
+    match_date : optional
+        이 날짜 이전의 맞대결만 사용 (없으면 전체)
+    league : int, optional
+        API-Football 리그 ID (없으면 프리미어리그)
+    last_n : int
+        최근 맞대결 목록의 길이
+
+    Returns
+    -------
+    dict or None
+        overall / at_home / away별 승/무/패, 득실, xG 합계와 최근 맞대결 목록(recent).
+        맞대결 기록이 없거나 실패하면 None
+    """
+    from data_collector_tools import get_collector
+
+    try:
+        return get_collector(league).head_to_head(home_team, away_team, match_date, last_n)
+    except Exception as e:
+        print(f"상대 전적 조회 중 오류 발생: {e}")
+        return None
+
+
+def predict_fixtures(fixtures=None, league: int = 39, season: int = None, round_name: str = None, next_n: int = None):
+    """
+    여러 경기를 한 번에 예측하는 배치 함수
+
+    피처 수집과 모델 추론을 경기 수와 관계없이 각각 한 번씩만 수행합니다.
+
+    Parameters
+    ----------
+    fixtures : list or DataFrame, optional
+        (date, home, away) 튜플 목록 또는 MatchDate/HomeTeam/AwayTeam 컬럼을 가진 DataFrame.
+        없으면 league/season/round_name/next_n으로 API-Football에서 경기 목록을 가져옴
+    league : int
+        API-Football 리그 ID (기본: 프리미어리그). 피처도 이 리그의 데이터로 수집
+    season : int, optional
+        시즌 시작 연도 (없으면 진행 중인 시즌)
+    round_name : str, optional
+        라운드 이름 (예: "Regular Season - 38")
+    next_n : int, optional
+        앞으로 열릴 경기 n개
+
+    Returns
+    -------
+    DataFrame or None
+        경기별 피처와 예측 결과 (AwayWin_Prob, Pred_Label, Pred_Result)와 스코어 모델 결과
+        (Home_Prob, Draw_Prob, Away_Prob, Likely_Score 등), 경기가 없으면 None
+    """
+    import pandas as pd
+    from data_collector_tools import get_collector
+    from model_predictor import predict_match_result
+
+    if fixtures is None:
+        from match_parser import get_league_fixtures, api_key
+        fixtures = get_league_fixtures(api_key, league=league, season=season,
+                                       round_name=round_name, next_n=next_n)
+        fixtures = [(f["match_date"], f["home_team"], f["away_team"]) for f in fixtures]
+
+    if isinstance(fixtures, pd.DataFrame):
+        df = fixtures[["MatchDate", "HomeTeam", "AwayTeam"]]
+    else:
+        df = pd.DataFrame(list(fixtures), columns=["MatchDate", "HomeTeam", "AwayTeam"])
+
+    if df.empty:
+        return None
+
+    collector = get_collector(league)
+    unknown = collector.unknown_teams(pd.concat([df["HomeTeam"], df["AwayTeam"]]).unique())
+    if unknown:
+        # 피처가 모두 0으로 채워지므로 팀 표(leagues.py)에 별칭을 추가해야 함
+        print(f"경고: Understat 기록에서 찾을 수 없는 팀 (리그 {collector.league}): {unknown}")
+    df_final = collector.collect_features_batch(df)
+    return add_scoreline_predictions(predict_match_result(df_final), collector)
+
+
+def add_scoreline_predictions(result_df, collector):
+    """
+    예측 결과에 스코어 모델(Poisson/Dixon-Coles)의 홈 승/무/원정 승 확률, 기대 득점,
+    가장 가능성 높은 스코어를 붙이는 함수 (여러 경기를 한 번에 계산)
+
+    Returns
+    -------
+    DataFrame
+        Home_Prob, Draw_Prob, Away_Prob, Exp_HomeGoals, Exp_AwayGoals, Likely_Score 컬럼이 추가된 결과
+        (스코어 모델을 사용할 수 없으면 입력 그대로)
+    """
+    import pandas as pd
+    from scoreline_model import get_scoreline_model
+
+    try:
+        scores = get_scoreline_model(collector).predict(result_df["HomeTeam"], result_df["AwayTeam"])
+    except Exception as e:
+        print(f"스코어 예측 중 오류 발생: {e}")
+        return result_df
+    scores.index = result_df.index
+    return pd.concat([result_df, scores], axis=1)
+
+
+def simulate_season(league: int = 39, season: int = None, n_sims: int = 100_000, seed: int = None):
+    """
+    남은 경기를 모델 예측 확률로 몬테카를로 시뮬레이션해 팀별 최종 순위 분포를 구하는 함수
+
+    이미 치른 경기는 Understat 기록으로 현재 순위표를 만들고, 남은 경기는 predict_fixtures()의
+    원정 승리 확률과 과거 무승부 비율로 (홈 승, 무, 원정 승) 확률을 정합니다.
+
+    Parameters
+    ----------
+    league : int
+        API-Football 리그 ID (기본: 프리미어리그). 강등 팀 수는 리그 설정을 따름
+    season : int, optional
+        시즌 시작 연도 (없으면 진행 중인 시즌)
+    n_sims : int
+        시뮬레이션할 시즌 수
+    seed : int, optional
+        난수 시드
+
+    Returns
+    -------
+    DataFrame or None
+        팀별 1~N위 확률, exp_points(기대 승점), title/top4/relegation 확률 (실패 시 None)
+    """
+    import pandas as pd
+    import feature_engine
+    import season_simulator
+    from data_collector_tools import get_collector
+    from match_parser import get_league_fixtures, api_key
+    from leagues import get_league, current_season
+
+    try:
+        info = get_league(league)
+        season = season or current_season()
+        collector = get_collector(info["id"])
+        results = feature_engine.to_match_format(collector.long_features)
+        in_season = (results['date'] >= pd.Timestamp(f"{season}-07-01")) & (results['date'] < pd.Timestamp(f"{season + 1}-07-01"))
+        table = season_simulator.current_table(results[in_season])
+        draw_share = season_simulator.draw_share_from_results(results['home_goals'], results['away_goals'])
+
+        remaining = get_league_fixtures(api_key, league=info["id"], season=season, status="NS")
+        predictions = predict_fixtures([(f["match_date"], f["home_team"], f["away_team"]) for f in remaining],
+                                       league=info["id"])
+        if predictions is None:
+            # 남은 경기가 없으면 현재 순위가 최종 순위
+            predictions = pd.DataFrame({"HomeTeam": [], "AwayTeam": [], "AwayWin_Prob": []})
+
+        probs = season_simulator.outcome_probabilities(predictions["AwayWin_Prob"].to_numpy(), draw_share)
+        return season_simulator.simulate_season(
+            table, predictions[["HomeTeam", "AwayTeam"]], probs, n_sims=n_sims, seed=seed,
+            relegation_spots=info["relegation_spots"]
+        )
+
+    except Exception as e:
+        print(f"시즌 시뮬레이션 중 오류 발생: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # 앞으로 열릴 프리미어리그 경기 전체를 예측해 CSV로 저장 (야간 배치용)
+    import time
+
+    t0 = time.perf_counter()
+    results = predict_fixtures(next_n=99)
+    elapsed = time.perf_counter() - t0
+
+    if results is None:
+        print("예측할 경기가 없습니다.")
+    else:
+        results.to_csv("upcoming_predictions.csv", index=False)
+        print(f"{len(results)}경기 예측 완료 ({elapsed:.2f}초) -> upcoming_predictions.csv")
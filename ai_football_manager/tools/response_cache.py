@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+import api_scheduler
+from leagues import current_season
+
+'''
+외부 스포츠 API 응답을 디스크(SQLite)에 보관하는 TTL 캐시
+- 키: 엔드포인트 + 정규화한 파라미터 (순서/대소문자/공백과 무관)
+- 엔드포인트 종류별 TTL: 팀 검색/끝난 시즌 통계는 사실상 영구, 진행 중인 시즌 통계는 몇 분, 경기 일정은 몇 시간
+- 만료 후 stale_window(TTL) 이내면 기존 값을 바로 반환하고 백그라운드에서 새로 받음 (stale-while-revalidate)
+  만료 값을 쓸 수 있는 기간은 TTL에 비례 (진행 중인 시즌 통계는 몇 분, 끝난 시즌 기록은 최대 MAX_STALE_SECONDS)
+- 적중/만료 적중/미스 횟수 집계
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "api_cache.sqlite")
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+PERMANENT_TTL = 30 * DAY       # 팀 정보, 끝난 시즌 기록 (이름 변경 등을 위해 한 달에 한 번은 확인)
+LIVE_STATS_TTL = 10 * MINUTE   # 진행 중인 시즌 통계
+SEARCH_TTL = 7 * DAY           # 선수 검색 (ID는 거의 바뀌지 않음)
+FIXTURES_TTL = 3 * HOUR        # 진행 중인 시즌 경기 일정
+DEFAULT_TTL = HOUR
+STALE_RATIO = 1.0              # 만료된 값을 대신 반환할 수 있는 기간 = TTL x STALE_RATIO
+MAX_STALE_SECONDS = DAY        # 그 기간의 상한
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+_inflight = set()              # 백그라운드 갱신 중인 키
+_inflight_lock = threading.Lock()
+
+_stats = {"hits": 0, "stale": 0, "misses": 0, "revalidations": 0}
+_stats_lock = threading.Lock()
+
+
+def _connect(path=None):
+    # 스레드마다 연결 하나 (sqlite3 연결은 스레드 간 공유하지 않음)
+    path = path or CACHE_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        with _init_lock:
+            if path not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY, endpoint TEXT, body TEXT,"
+                    " fetched_at REAL, expires_at REAL)"
+                )
+                conn.commit()
+                _initialized.add(path)
+        conns[path] = conn
+    return conn
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """엔드포인트 + 정규화한 파라미터 (키 정렬, 문자열 값은 소문자/앞뒤 공백 제거)"""
+    normalized = {
+        str(k).lower(): str(v).strip().lower()
+        for k, v in (params or {}).items() if v is not None
+    }
+    return f"{endpoint}?{json.dumps(normalized, sort_keys=True, ensure_ascii=False)}"
+
+
+def ttl_for(endpoint: str, params: dict) -> int:
+    """엔드포인트 종류와 시즌으로 TTL(초)을 정함"""
+    params = params or {}
+    try:
+        finished = int(params["season"]) < current_season()
+    except (KeyError, TypeError, ValueError):
+        finished = False
+
+    if endpoint == "teams":
+        return PERMANENT_TTL
+    if endpoint == "players" and "search" in params:
+        return PERMANENT_TTL if finished else SEARCH_TTL
+    if endpoint in ("players", "teams/statistics"):
+        return PERMANENT_TTL if finished else LIVE_STATS_TTL
+    if endpoint == "fixtures":
+        return PERMANENT_TTL if finished else FIXTURES_TTL
+    return DEFAULT_TTL
+
+
+def stale_window(ttl: float) -> float:
+    """TTL이 ttl인 항목을 만료 후에도 대신 반환할 수 있는 기간(초)"""
+    return min(ttl * STALE_RATIO, MAX_STALE_SECONDS)
+
+
+def get(endpoint: str, params: dict, path: str = None):
+    """
+    캐시된 응답을 조회합니다.
+
+    Returns
+    -------
+    (value, state)
+        state는 "fresh"(TTL 이내), "stale"(만료 후 stale_window(TTL) 이내), "miss"(없음 또는 너무 오래됨)
+    """
+    row = _connect(path).execute(
+        "SELECT body, fetched_at, expires_at FROM responses WHERE key = ?", (cache_key(endpoint, params),)
+    ).fetchone()
+    if row is None:
+        return None, "miss"
+    body, fetched_at, expires_at = row
+    now = time.time()
+    if now < expires_at:
+        return json.loads(body), "fresh"
+    # 저장할 때의 TTL 기준 (put에 ttl을 직접 준 항목도 같은 비율)
+    if now < expires_at + stale_window(expires_at - fetched_at):
+        return json.loads(body), "stale"
+    return None, "miss"
+
+
+def put(endpoint: str, params: dict, value, ttl: int = None, path: str = None):
+    """응답을 저장 (ttl이 없으면 ttl_for 기준)"""
+    now = time.time()
+    ttl = ttl_for(endpoint, params) if ttl is None else ttl
+    conn = _connect(path)
+    conn.execute(
+        "INSERT OR REPLACE INTO responses (key, endpoint, body, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        (cache_key(endpoint, params), endpoint, json.dumps(value, ensure_ascii=False), now, now + ttl)
+    )
+    conn.commit()
+
+
+def _revalidate(endpoint, params, fetch, key, path):
+    try:
+        # 만료 값 갱신은 사용자 질문보다 뒤에 호출 한도를 받음
+        with api_scheduler.lane(api_scheduler.BACKGROUND):
+            value = fetch()
+        if value:
+            put(endpoint, params, value, path=path)
+        _count("revalidations")
+    except Exception as e:
+        print(f"캐시 갱신 중 오류 발생 ({endpoint}): {e}")
+    finally:
+        with _inflight_lock:
+            _inflight.discard(key)
+
+
+def cached_call(endpoint: str, params: dict, fetch, path: str = None):
+    """
+    캐시를 거쳐 API 응답을 반환합니다.
+
+    - TTL 이내: 저장된 값 (네트워크 호출 없음)
+    - 만료 직후(stale_window(TTL) 이내): 저장된 값을 바로 반환하고 백그라운드 스레드에서 fetch()로 갱신
+    - 없음: fetch()를 호출하고, 비어 있지 않은 응답만 저장 (오류 응답 {}는 저장하지 않음)
+
+    Parameters
+    ----------
+    endpoint : str
+        API 엔드포인트 (예: "players", "teams/statistics")
+    params : dict
+        요청 파라미터
+    fetch : callable
+        인자 없이 호출하면 실제 API 응답을 반환하는 함수
+    """
+    try:
+        value, state = get(endpoint, params, path)
+    except (sqlite3.Error, OSError) as e:
+        # 캐시를 쓸 수 없으면 그냥 API를 호출
+        print(f"응답 캐시 조회 중 오류 발생: {e}")
+        return fetch()
+
+    if state == "fresh":
+        _count("hits")
+        return value
+
+    if state == "stale":
+        _count("stale")
+        key = cache_key(endpoint, params)
+        with _inflight_lock:
+            start = key not in _inflight
+            _inflight.add(key)
+        if start:
+            threading.Thread(
+                target=_revalidate, args=(endpoint, params, fetch, key, path),
+                name="api-cache-revalidate", daemon=True
+            ).start()
+        return value
+
+    _count("misses")
+    value = fetch()
+    if value:
+        try:
+            put(endpoint, params, value, path=path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"응답 캐시 저장 중 오류 발생: {e}")
+    return value
+
+
+def purge_expired(path: str = None) -> int:
+    """만료 후 stale_window(TTL)까지 지난 항목을 삭제하고 삭제한 개수를 반환"""
+    conn = _connect(path)
+    cur = conn.execute(
+        "DELETE FROM responses WHERE expires_at + MIN((expires_at - fetched_at) * ?, ?) < ?",
+        (STALE_RATIO, MAX_STALE_SECONDS, time.time())
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def stats(path: str = None) -> dict:
+    """적중(hits), 만료 적중(stale), 미스(misses), 백그라운드 갱신 횟수와 적중률, 저장된 항목 수"""
+    with _stats_lock:
+        out = dict(_stats)
+    total = out["hits"] + out["stale"] + out["misses"]
+    out["hit_rate"] = (out["hits"] + out["stale"]) / total if total else 0.0
+    try:
+        out["entries"] = _connect(path).execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    except sqlite3.Error:
+        out["entries"] = None
+    return out
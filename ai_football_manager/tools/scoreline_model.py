@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+'''
+Understat 득점/xG 기록으로 학습하는 스코어 분포 모델 (Poisson + Dixon-Coles 보정)
+- 팀별 공격력/수비력과 홈 어드밴티지를 시간 가중 Maher 반복 추정으로 계산
+- 여러 경기의 스코어 행렬(0~MAX_GOALS골)과 홈 승/무/원정 승 확률을 브로드캐스팅으로 한 번에 계산
+- 학습된 파라미터는 피처 스냅샷 지문 기준으로 메모리와 디스크에 캐시
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+PARAMS_PATH = os.path.join(PROJECT_ROOT, "data", "scoreline_params_{league}.json")
+
+# 학습 방식이 바뀌면 올려서 캐시된 파라미터를 무효화
+MODEL_VERSION = 1
+
+MAX_GOALS = 10
+XG_WEIGHT = 0.5          # 학습 목표 = (1 - XG_WEIGHT) * 득점 + XG_WEIGHT * xG
+HALF_LIFE_DAYS = 365     # 경기 가중치가 절반이 되는 기간
+RHO_GRID = np.linspace(-0.2, 0.2, 81)
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+_LOG_FACTORIAL = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1)))))
+
+# 리그 code -> ((MODEL_VERSION, 피처 지문), ScorelineModel)
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _poisson_pmf(lam, max_goals=MAX_GOALS) -> np.ndarray:
+    """(n,) 기대 득점 -> (n, max_goals + 1) 포아송 확률"""
+    k = np.arange(max_goals + 1)
+    lam = np.maximum(np.asarray(lam, dtype=np.float64), 1e-12)[:, None]
+    return np.exp(k * np.log(lam) - lam - _LOG_FACTORIAL[:max_goals + 1])
+
+
+def _dc_tau(home_goals, away_goals, lam_h, lam_a, rho):
+    """Dixon-Coles 저득점 보정 계수 (0-0, 0-1, 1-0, 1-1 외에는 1). rho는 마지막 축으로 브로드캐스트"""
+    hg = home_goals[..., None]
+    ag = away_goals[..., None]
+    lh = lam_h[..., None]
+    la = lam_a[..., None]
+    tau = np.ones(np.broadcast(hg, rho).shape)
+    tau = np.where((hg == 0) & (ag == 0), 1 - lh * la * rho, tau)
+    tau = np.where((hg == 0) & (ag == 1), 1 + lh * rho, tau)
+    tau = np.where((hg == 1) & (ag == 0), 1 + la * rho, tau)
+    tau = np.where((hg == 1) & (ag == 1), 1 - rho, tau)
+    return tau
+
+
+class ScorelineModel:
+    """
+    log 기대 득점 = 홈 어드밴티지(홈팀만) + 공격력 + 상대 수비력 (곱셈 형태로 보관)
+
+    attack: 득점력 (평균 1), defence: 실점 경향 (클수록 많이 실점), home_adv: 홈팀 기대 득점 배수
+    """
+
+    def __init__(self, teams, attack, defence, home_adv, rho, fitted_on=None):
+        self.teams = list(teams)
+        self.attack = np.asarray(attack, dtype=np.float64)
+        self.defence = np.asarray(defence, dtype=np.float64)
+        self.home_adv = float(home_adv)
+        self.rho = float(rho)
+        self.fitted_on = fitted_on
+        self._team_ids = {t: i for i, t in enumerate(self.teams)}
+
+    @classmethod
+    def fit(cls, matches: pd.DataFrame, xg_weight=XG_WEIGHT, half_life_days=HALF_LIFE_DAYS,
+            max_iter=200, tol=1e-9):
+        """
+        경기 기록(date, home_team, away_team, home_goals, away_goals, home_xg, away_xg)으로 학습합니다.
+        최근 경기일수록 큰 가중치(반감기 half_life_days)를 줍니다.
+        """
+        m = matches.dropna(subset=['home_goals', 'away_goals'])
+        teams = sorted(set(m['home_team']) | set(m['away_team']))
+        ids = {t: i for i, t in enumerate(teams)}
+        h = m['home_team'].map(ids).to_numpy()
+        a = m['away_team'].map(ids).to_numpy()
+        n_teams = len(teams)
+
+        hg = m['home_goals'].to_numpy(dtype=np.float64)
+        ag = m['away_goals'].to_numpy(dtype=np.float64)
+        # xG가 없는 경기는 실제 득점만 사용
+        hx = np.where(np.isnan(m['home_xg'].to_numpy(dtype=np.float64)), hg, m['home_xg'].to_numpy(dtype=np.float64))
+        ax = np.where(np.isnan(m['away_xg'].to_numpy(dtype=np.float64)), ag, m['away_xg'].to_numpy(dtype=np.float64))
+        y_h = (1 - xg_weight) * hg + xg_weight * hx
+        y_a = (1 - xg_weight) * ag + xg_weight * ax
+
+        days = (pd.to_datetime(m['date']).values.astype('datetime64[D]') - _EPOCH).astype(np.int64)
+        w = np.exp(-np.log(2) * (days.max() - days) / half_life_days)
+
+        # 팀별 득점/실점 합은 반복 중에 바뀌지 않음
+        scored = np.bincount(h, w * y_h, n_teams) + np.bincount(a, w * y_a, n_teams)
+        conceded = np.bincount(h, w * y_a, n_teams) + np.bincount(a, w * y_h, n_teams)
+        home_total = (w * y_h).sum()
+
+        attack = np.ones(n_teams)
+        defence = np.ones(n_teams)
+        home_adv = 1.0
+        for _ in range(max_iter):
+            prev = attack.copy()
+            attack = scored / (
+                np.bincount(h, w * home_adv * defence[a], n_teams) + np.bincount(a, w * defence[h], n_teams)
+            )
+            defence = conceded / (
+                np.bincount(h, w * attack[a], n_teams) + np.bincount(a, w * home_adv * attack[h], n_teams)
+            )
+            home_adv = home_total / (w * attack[h] * defence[a]).sum()
+            # 공격력 평균을 1로 고정 (기대 득점은 변하지 않음)
+            scale = attack.mean()
+            attack /= scale
+            defence *= scale
+            if np.max(np.abs(attack - prev)) < tol:
+                break
+
+        # rho는 실제 득점의 Dixon-Coles 우도를 격자 탐색으로 최대화
+        lam_h = home_adv * attack[h] * defence[a]
+        lam_a = attack[a] * defence[h]
+        low = (hg <= 1) & (ag <= 1)
+        tau = _dc_tau(hg[low], ag[low], lam_h[low], lam_a[low], RHO_GRID)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ll = np.where(tau > 0, np.log(tau), -np.inf)
+        rho = float(RHO_GRID[np.argmax((w[low, None] * ll).sum(axis=0))])
+
+        fitted_on = str(pd.to_datetime(m['date']).max().date()) if len(m) else None
+        return cls(teams, attack, defence, home_adv, rho, fitted_on)
+
+    def expected_goals(self, home_teams, away_teams):
+        """(홈 기대 득점, 원정 기대 득점). 학습 데이터에 없는 팀은 평균 전력으로 계산"""
+        avg_def = self.defence.mean() if len(self.defence) else 1.0
+        h = np.array([self._team_ids.get(t, -1) for t in home_teams], dtype=np.int64)
+        a = np.array([self._team_ids.get(t, -1) for t in away_teams], dtype=np.int64)
+        att = np.append(self.attack, 1.0)      # 인덱스 -1 = 평균 팀
+        dfn = np.append(self.defence, avg_def)
+        return self.home_adv * att[h] * dfn[a], att[a] * dfn[h]
+
+    def score_matrix(self, lam_h, lam_a, max_goals=MAX_GOALS) -> np.ndarray:
+        """(n, max_goals + 1, max_goals + 1) 스코어 확률 행렬 [경기, 홈 득점, 원정 득점]"""
+        lam_h = np.asarray(lam_h, dtype=np.float64)
+        lam_a = np.asarray(lam_a, dtype=np.float64)
+        matrix = _poisson_pmf(lam_h, max_goals)[:, :, None] * _poisson_pmf(lam_a, max_goals)[:, None, :]
+
+        # 저득점 칸만 Dixon-Coles 보정
+        matrix[:, 0, 0] *= 1 - lam_h * lam_a * self.rho
+        matrix[:, 0, 1] *= 1 + lam_h * self.rho
+        matrix[:, 1, 0] *= 1 + lam_a * self.rho
+        matrix[:, 1, 1] *= 1 - self.rho
+        np.clip(matrix, 0.0, None, out=matrix)
+        # max_goals 초과 스코어는 잘라내고 다시 정규화
+        matrix /= matrix.sum(axis=(1, 2), keepdims=True)
+        return matrix
+
+    def predict(self, home_teams, away_teams, max_goals=MAX_GOALS) -> pd.DataFrame:
+        """
+        여러 경기의 홈 승/무/원정 승 확률, 기대 득점, 가장 가능성 높은 스코어를 한 번에 계산
+
+        Returns
+        -------
+        DataFrame
+            Home_Prob, Draw_Prob, Away_Prob, Exp_HomeGoals, Exp_AwayGoals, Likely_Score
+        """
+        home_teams = list(home_teams)
+        lam_h, lam_a = self.expected_goals(home_teams, away_teams)
+        matrix = self.score_matrix(lam_h, lam_a, max_goals)
+
+        size = max_goals + 1
+        diff = np.arange(size)[:, None] - np.arange(size)[None, :]
+        home_p = (matrix * (diff > 0)).sum(axis=(1, 2))
+        draw_p = np.trace(matrix, axis1=1, axis2=2)
+        best = matrix.reshape(len(home_teams), -1).argmax(axis=1)
+
+        return pd.DataFrame({
+            'Home_Prob': home_p,
+            'Draw_Prob': draw_p,
+            'Away_Prob': 1.0 - home_p - draw_p,
+            'Exp_HomeGoals': lam_h,
+            'Exp_AwayGoals': lam_a,
+            'Likely_Score': [f"{i}-{j}" for i, j in zip(best // size, best % size)]
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            'teams': self.teams,
+            'attack': self.attack.tolist(),
+            'defence': self.defence.tolist(),
+            'home_adv': self.home_adv,
+            'rho': self.rho,
+            'fitted_on': self.fitted_on
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['teams'], d['attack'], d['defence'], d['home_adv'], d['rho'], d.get('fitted_on'))
+
+
+def _load_params(key, path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('key') != list(key):
+        return None
+    return ScorelineModel.from_dict(state['params'])
+
+
+def _save_params(key, model, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'key': list(key), 'params': model.to_dict()}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def get_scoreline_model(collector) -> ScorelineModel:
+    """
+    DataCollector(리그)의 현재 피처 스냅샷으로 학습된 스코어 모델을 반환합니다.
+    같은 스냅샷이면 메모리/디스크에 캐시된 파라미터를 재사용하고, 바뀌었으면 다시 학습합니다.
+    """
+    import feature_engine
+
+    league = collector.league_code
+    key = (MODEL_VERSION, collector.feature_fingerprint)
+    cached = _models.get(league)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    path = PARAMS_PATH.format(league=league)
+    with _models_lock:
+        cached = _models.get(league)
+        model = cached[1] if cached is not None and cached[0] == key else None
+        if model is None:
+            model = _load_params(key, path)
+        if model is None:
+            model = ScorelineModel.fit(feature_engine.to_match_format(collector.long_features))
+            try:
+                _save_params(key, model, path)
+            except OSError as e:
+                print(f"스코어 모델 파라미터 저장 중 오류 발생: {e}")
+        # 같은 리그의 이전 스냅샷 모델은 교체
+        _models[league] = (key, model)
+    return model
+
+
+if __name__ == "__main__":
+    # EPL 2014~2025 시즌으로 학습 시간과 대량 예측 시간 측정
+    from soccerdata import Understat
+
+    us = Understat(leagues=["ENG-Premier League"], seasons=range(2014, 2026))
+    matches = us.read_team_match_stats()[[
+        'date', 'home_team', 'away_team', 'home_goals', 'away_goals', 'home_xg', 'away_xg'
+    ]].reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    model = ScorelineModel.fit(matches)
+    fit_sec = time.perf_counter() - t0
+
+    rng = np.random.default_rng(0)
+    home = rng.choice(model.teams, 10_000)
+    away = rng.choice(model.teams, 10_000)
+    t0 = time.perf_counter()
+    model.predict(home, away)
+    predict_sec = time.perf_counter() - t0
+
+    print(f"{len(matches)}경기 학습: {fit_sec * 1000:.1f} ms (홈 어드밴티지 {model.home_adv:.3f}, rho {model.rho:.3f})")
+    print(f"10,000경기 스코어 분포 계산: {predict_sec * 1000:.1f} ms")
@@ -0,0 +1,165 @@
+import time
+import numpy as np
+import pandas as pd
+
+'''
+남은 경기의 승/무/패 확률로 시즌을 몬테카를로 시뮬레이션하는 모듈
+- 경기마다 파이썬 루프를 돌지 않고, (시뮬레이션 수 x 경기 수) 난수 행렬과
+  경기-팀 행렬곱으로 수만~수십만 시즌의 최종 승점을 한 번에 계산
+- 팀별 최종 순위 분포(우승, 4위 이내, 강등 확률 등)를 반환
+'''
+
+DEFAULT_SIMULATIONS = 100_000
+CHUNK_SIZE = 20_000      # 한 번에 계산할 시뮬레이션 수 (메모리 사용량 제한)
+TOP_N = 4                # 챔피언스리그 진출권
+RELEGATION_SPOTS = 3
+
+
+def outcome_probabilities(p_away, draw_share) -> np.ndarray:
+    """
+    원정 승리 확률만 주는 모델 출력을 (홈 승, 무, 원정 승) 확률로 나눕니다.
+    원정 승리가 아닌 확률 중 draw_share만큼을 무승부로 봅니다.
+    """
+    p_away = np.clip(np.asarray(p_away, dtype=np.float64), 0.0, 1.0)
+    p_draw = (1.0 - p_away) * draw_share
+    return np.column_stack((1.0 - p_away - p_draw, p_draw, p_away))
+
+
+def draw_share_from_results(home_goals, away_goals) -> float:
+    """과거 경기에서 '원정 승리가 아닌 경기' 중 무승부 비율"""
+    hg = np.asarray(home_goals, dtype=np.float64)
+    ag = np.asarray(away_goals, dtype=np.float64)
+    not_away = hg >= ag
+    return float((hg == ag).sum() / max(not_away.sum(), 1))
+
+
+def current_table(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    이미 치른 경기(home_team, away_team, home_goals, away_goals)로 현재 순위표를 만듭니다.
+
+    Returns
+    -------
+    DataFrame
+        team 인덱스, points/goal_diff/goals_for 컬럼
+    """
+    hg = results['home_goals'].to_numpy(dtype=np.float64)
+    ag = results['away_goals'].to_numpy(dtype=np.float64)
+    rows = pd.DataFrame({
+        'team': np.concatenate((results['home_team'].to_numpy(), results['away_team'].to_numpy())),
+        'points': np.concatenate((np.select([hg > ag, hg == ag], [3, 1], 0), np.select([ag > hg, hg == ag], [3, 1], 0))),
+        'goal_diff': np.concatenate((hg - ag, ag - hg)),
+        'goals_for': np.concatenate((hg, ag))
+    })
+    return rows.groupby('team').sum()
+
+
+def simulate_season(table: pd.DataFrame, fixtures: pd.DataFrame, probs,
+                    n_sims: int = DEFAULT_SIMULATIONS, seed=None, chunk_size: int = CHUNK_SIZE,
+                    top_n: int = TOP_N, relegation_spots: int = RELEGATION_SPOTS) -> pd.DataFrame:
+    """
+    남은 경기들을 n_sims번 시뮬레이션해 팀별 최종 순위 분포를 구합니다.
+
+    Parameters
+    ----------
+    table : DataFrame
+        current_table()의 현재 순위표 (team 인덱스, points, goal_diff, goals_for)
+    fixtures : DataFrame
+        남은 경기 (HomeTeam, AwayTeam)
+    probs : array-like
+        경기별 (홈 승, 무, 원정 승) 확률, shape (경기 수, 3)
+    n_sims : int
+        시뮬레이션할 시즌 수
+    seed : int, optional
+        난수 시드
+    top_n : int
+        top4 컬럼에 합산할 상위 순위 수 (챔피언스리그 진출권)
+    relegation_spots : int
+        강등되는 하위 팀 수 (리그마다 다름)
+
+    Returns
+    -------
+    DataFrame
+        팀별 1~N위 확률, 기대 승점(exp_points), 우승(title)/top_n위 이내(top4)/강등(relegation) 확률.
+        동률은 현재 득실차, 다득점 순으로 가릅니다 (남은 경기의 득점은 시뮬레이션하지 않음)
+    """
+    teams = sorted(set(table.index) | set(fixtures['HomeTeam']) | set(fixtures['AwayTeam']))
+    table = table.reindex(teams).fillna(0)
+    n_teams = len(teams)
+    team_pos = {t: i for i, t in enumerate(teams)}
+    home = fixtures['HomeTeam'].map(team_pos).to_numpy()
+    away = fixtures['AwayTeam'].map(team_pos).to_numpy()
+    n_fixtures = len(fixtures)
+
+    probs = np.asarray(probs, dtype=np.float64).reshape(n_fixtures, 3)
+    c_home = probs[:, 0].astype(np.float32)
+    c_draw = (probs[:, 0] + probs[:, 1]).astype(np.float32)
+
+    # 경기 x 팀 행렬: 경기별 홈/원정 승점을 팀 승점으로 합산
+    home_inc = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_inc = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_inc[np.arange(n_fixtures), home] = 1.0
+    away_inc[np.arange(n_fixtures), away] = 1.0
+
+    # 같은 승점이면 현재 득실차, 다득점 순 (0~1 사이의 값을 더해 승점 순서는 바꾸지 않음)
+    tiebreak_rank = np.empty(n_teams)
+    tiebreak_rank[np.lexsort((table['goals_for'].to_numpy(), table['goal_diff'].to_numpy()))] = np.arange(n_teams)
+    base = (table['points'].to_numpy() + tiebreak_rank / n_teams).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+    points_sum = np.zeros(n_teams)
+    position = np.arange(n_teams)
+
+    done = 0
+    while done < n_sims:
+        size = min(chunk_size, n_sims - done)
+        u = rng.random((size, n_fixtures), dtype=np.float32)
+        home_win = u < c_home
+        not_away = u < c_draw
+        # 홈 승 3점 / 무 1점 / 원정 승 0점, 원정팀은 그 반대
+        home_pts = 2.0 * home_win + not_away
+        away_pts = 3.0 * ~not_away + (not_away & ~home_win)
+        points = base + home_pts @ home_inc + away_pts @ away_inc
+
+        order = np.argsort(-points, axis=1, kind='stable')
+        counts += np.bincount((order * n_teams + position).ravel(), minlength=n_teams * n_teams)
+        points_sum += np.floor(points).sum(axis=0)
+        done += size
+
+    dist = counts.reshape(n_teams, n_teams) / n_sims
+    out = pd.DataFrame(dist, index=pd.Index(teams, name='team'), columns=range(1, n_teams + 1))
+    out['exp_points'] = points_sum / n_sims
+    out['title'] = dist[:, 0]
+    out['top4'] = dist[:, :top_n].sum(axis=1)
+    out['relegation'] = dist[:, n_teams - relegation_spots:].sum(axis=1)
+    return out.sort_values('exp_points', ascending=False)
+
+
+def benchmark(n_sims: int = DEFAULT_SIMULATIONS, n_teams: int = 20, remaining_rounds: int = 19, seed: int = 0) -> dict:
+    """가상의 리그(팀 n_teams개, 남은 라운드 remaining_rounds개)로 초당 시뮬레이션 수를 측정"""
+    rng = np.random.default_rng(seed)
+    teams = [f"Team{i:02d}" for i in range(n_teams)]
+    pairs = [(teams[i], teams[j]) for i in range(n_teams) for j in range(n_teams) if i != j]
+    idx = rng.choice(len(pairs), size=remaining_rounds * n_teams // 2, replace=False)
+    fixtures = pd.DataFrame([pairs[i] for i in idx], columns=['HomeTeam', 'AwayTeam'])
+    probs = outcome_probabilities(rng.uniform(0.1, 0.6, len(fixtures)), 0.45)
+    table = pd.DataFrame({
+        'points': rng.integers(10, 50, n_teams), 'goal_diff': rng.integers(-20, 20, n_teams),
+        'goals_for': rng.integers(10, 40, n_teams)
+    }, index=teams)
+
+    t0 = time.perf_counter()
+    simulate_season(table, fixtures, probs, n_sims=n_sims, seed=seed)
+    elapsed = time.perf_counter() - t0
+    return {
+        'simulations': n_sims,
+        'fixtures': len(fixtures),
+        'seconds': elapsed,
+        'sims_per_sec': n_sims / elapsed
+    }
+
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"남은 경기 {result['fixtures']}개, 시뮬레이션 {result['simulations']:,}회: "
+          f"{result['seconds']:.2f}초 ({result['sims_per_sec']:,.0f} 시즌/초)")
@@ -1,16 +1,58 @@
 # print는 확인을 위해서 사용
 
+import os
+import sys
 import requests
 import json
 # from datetime import datetime
 from config import X_RAPIDAPI_KEY
 
+# 같은 tools 폴더의 모듈을 import하기 위한 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import http_client
+import api_scheduler
+import response_cache
+import id_directory
+from leagues import DEFAULT_LEAGUE, league_id, league_for_country, current_season
+
 API_FOOTBALL_BASE_URL = "https://api-football-v1.p.rapidapi.com/v3"
 API_FOOTBALL_HOST = "api-football-v1.p.rapidapi.com"
 
 
-def _call_api_football(endpoint: str, params: dict) -> dict:
+class ApiFootballError(Exception):
+    """여러 페이지 응답 중 일부를 받지 못함 (일부만 받은 결과를 쓰지 않도록)"""
+
+
+def _call_api_football(endpoint: str, params: dict, use_cache: bool = True) -> dict:
     # RapidAPI의 API-Football을 호출하는 내부 함수
+    # 응답은 엔드포인트별 TTL로 디스크에 캐시 (팀/끝난 시즌은 사실상 영구, 진행 중인 시즌 통계는 몇 분)
+    if use_cache:
+        return response_cache.cached_call(endpoint, params, lambda: _fetch_api_football(endpoint, params))
+    return _fetch_api_football(endpoint, params)
+
+def _fetch_api_football(endpoint: str, params: dict) -> dict:
+    # 캐시 없이 API-Football을 실제로 호출
+    return _request_api_football(endpoint, params).get("response", {})
+
+def _fetch_api_football_pages(endpoint: str, params: dict, max_pages: int = id_directory.MAX_PAGES) -> list:
+    # 페이지로 나뉜 응답(paging.total)을 모두 받아 response 항목을 합침 (ID 디렉터리 적재용)
+    # 한 페이지라도 받지 못하면 ApiFootballError (실패한 호출은 {}를 반환하므로 마지막 페이지와 구분)
+    items = []
+    page = 1
+    while page <= max_pages:
+        data = _request_api_football(endpoint, params if page == 1 else dict(params, page=page))
+        if not data:
+            raise ApiFootballError(f"{endpoint} {page}페이지 응답을 받지 못함 (params: {params})")
+        items.extend(data.get("response", []))
+        if page >= data.get("paging", {}).get("total", 1):
+            break
+        page += 1
+    return items
+
+def _request_api_football(endpoint: str, params: dict) -> dict:
+    # API-Football 응답 전체(response, paging 등)를 반환, 실패하면 {}
     api_key = X_RAPIDAPI_KEY
 
     if not api_key:
@@ -24,9 +66,14 @@ def _call_api_football(endpoint: str, params: dict) -> dict:
 
     url = f"{API_FOOTBALL_BASE_URL}/{endpoint}"
 
-    try:
+    def send():
         print(f"API-Football 요청: {url} (params: {params})")
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        # 공용 연결 풀 사용, 재시도는 스케줄러가 시도마다 호출 한도를 받아 처리
+        return http_client.get(url, params=params, headers=headers, endpoint=endpoint, max_retries=0)
+
+    try:
+        # 요금제 한도 안에서 순서대로 호출 (몰리면 잠시 대기), 같은 요청이 진행 중이면 그 결과를 나눠 받음
+        response = api_scheduler.scheduler.request(response_cache.cache_key(endpoint, params), send)
         response.raise_for_status()
         data = response.json()
 
@@ -34,7 +81,11 @@ def _call_api_football(endpoint: str, params: dict) -> dict:
             print(f"API-Football 오류 응답: {data['errors']}")
             return {}
 
-        return data.get("response", {})
+        return data
+
+    except api_scheduler.RateLimitTimeout as e:
+        print(f"API-Football 호출 한도 초과: {e}")
+        return {}
 
     except requests.exceptions.RequestException as e:
         print(f"API-Football 호출 중 오류 발생: {e}")
@@ -48,34 +99,52 @@ def _call_api_football(endpoint: str, params: dict) -> dict:
         print(f"API-Football 호출 중 예상치 못한 오류 발생: {e}")
         return {}
 
-def get_player_stats(player_name: str, season: int = None, team_name: str = None) -> dict:
+def warm_up():
+    # 앱 시작 시 팀/선수 ID 디렉터리를 불러오고 (없거나 오래되었으면 백그라운드에서 받아 둠) 주기적으로 갱신
+    id_directory.get_directory()
+    id_directory.start_background_refresh(_fetch_api_football_pages)
+
+def get_player_stats(player_name: str, season: int = None, team_name: str = None, league: int = None) -> dict:
     # 선수 이름 기반으로 해당 선수의 통계 조회
     # 선수 ID를 먼저 찾은 후 해당 ID로 통계를 가져옴
+    # season이 없으면 진행 중인 시즌, 팀을 모를 때는 league(없으면 프리미어리그)에서 검색
+    # ID는 먼저 로컬 ID 디렉터리에서 찾고, 없을 때만 검색 API를 호출
     team_id = None
+    season = season or current_season()
+    directory = id_directory.get_directory()
 
     if team_name:
+        team = directory.find_team(team_name)
+        if team:
+            team_id = team["id"]
+            print(f"팀 '{team_name}', ID({team_id})를 디렉터리에서 찾음")
+
+    if team_name and not team_id:
         team_search_params = {"search": team_name}
         team_search_results = _call_api_football("teams", team_search_params)
         if team_search_results and len(team_search_results) > 0 and team_search_results[0].get("team"):
             team_id = team_search_results[0].get("team", {}).get("id")
             print(f"팀 '{team_name}', ID({team_id})를 선수 검색에 활용")
 
+    player_id = None
+    player = directory.find_player(player_name, team_id, league_id(league) if league is not None else None)
+    if player:
+        player_id = player["id"]
+        print(f"선수 '{player_name}' ID를 디렉터리에서 찾음: {player_id}")
+        return _player_stats_by_id(player_id, season)
+
     sanitized_player_name = player_name.replace("-", " ")
     search_params = {"search": sanitized_player_name}
 
     if team_id:
         search_params["team"] = team_id
     else:
-        search_params["league"] = 39
+        search_params["league"] = league_id(league)
 
-    if season:
-        search_params["season"] = season
-    else:
-        search_params["season"] = 2024
+    search_params["season"] = season
     
     player_search_results = _call_api_football("players", search_params)
 
-    player_id = None
     if player_search_results:
         for player_info in player_search_results:
             if player_info.get("player", {}).get("name").lower() == sanitized_player_name.lower():
@@ -91,8 +160,12 @@ def get_player_stats(player_name: str, season: int = None, team_name: str = None
         print(f"선수 '{player_name}'의 ID를 찾을 수 없음.")
         return {}
 
+    return _player_stats_by_id(player_id, season)
+
+def _player_stats_by_id(player_id: int, season: int) -> dict:
+    # 선수 ID로 시즌 통계 조회
     stats_params = {"id": player_id}
-    stats_params["season"] = season if season else 2024
+    stats_params["season"] = season
         
     player_stats_results = _call_api_football("players", stats_params)
 
@@ -133,40 +206,55 @@ def get_player_stats(player_name: str, season: int = None, team_name: str = None
         return parsed_stats
     return {}
 
-def get_team_stats(team_name: str, season: int = 2024) -> dict:
+def get_team_stats(team_name: str, season: int = None, league: int = None) -> dict:
     # 팀 이름을 기반으로 해당 팀의 통계 조회
     # 팀 ID를 먼저 찾은 후 해당 ID로 통계를 가져옴
-    
-    search_params = {"search": team_name}
-    team_search_results = _call_api_football("teams", search_params)
-
+    # league가 없으면 팀의 국가로 리그를 정함 (지원하지 않는 국가면 프리미어리그)
+    # 팀 ID는 먼저 로컬 ID 디렉터리에서 찾고, 없을 때만 검색 API를 호출
     team_id = None
+    team_country = None
+    team = id_directory.get_directory().find_team(team_name)
+    if team:
+        team_id = team["id"]
+        team_country = team["country"]
+        if league is None:
+            league = team["league"]
+        print(f"팀 '{team_name}' ID를 디렉터리에서 찾음: {team_id}")
+
+    team_search_results = None
+    if not team_id:
+        search_params = {"search": team_name}
+        team_search_results = _call_api_football("teams", search_params)
+
     if team_search_results:
         for team_info in team_search_results:
             if team_info.get("team", {}).get("name").lower() == team_name.lower():
                 team_id = team_info.get("team",{}).get("id")
+                team_country = team_info.get("team", {}).get("country")
                 print(f"팀 '{team_name}' ID 발견: {team_id}")
                 break
         
         if not team_id and team_search_results:
             team_id = team_search_results[0].get("team", {}).get("id")
+            team_country = team_search_results[0].get("team", {}).get("country")
             print(f"팀 '{team_name}'의 정확한 ID를 찾지 못하여 첫번째 결과 ID: {team_id} 사용")
 
     if not team_id:
         print(f"팀 '{team_name}'의 ID를 찾을 수 없음.")
         return {}
 
-    current_season = season if season else 2024
+    if league is None:
+        league = league_for_country(team_country) or DEFAULT_LEAGUE
 
     stats_params = {
         "team": team_id,
-        "season": current_season,
-        "league": 39
+        "season": season or current_season(),
+        "league": league_id(league)
     }
     
     team_stats_results = _call_api_football("teams/statistics", stats_params)
 
-    if team_search_results:
+    if team_stats_results:
         stats = team_stats_results
 
         parsed_stats = {
@@ -0,0 +1,227 @@
+import warnings
+import logging
+warnings.filterwarnings('ignore')
+logging.getLogger().setLevel(logging.ERROR)
+
+# soccerdata 로그 차단
+logging.getLogger('soccerdata').disabled = True
+logging.getLogger('understat').disabled = True
+
+import os
+import sys
+import time
+import resource
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# 같은 tools 폴더의 모듈을 import하기 위한 경로 설정
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+'''
+예측 모델 학습 파이프라인 (models/model_final.pkl 재생성)
+- DataCollector의 피처로 학습 데이터를 만들고 (서비스와 같은 경기 전 피처, 같은 전처리)
+- 시계열 교차 검증(TimeSeriesSplit) + 하이퍼파라미터 탐색을 joblib n_jobs로 모든 코어에서 병렬 실행
+- 최적 모델을 피처 스키마와 함께 버전 파일로 저장하고 서비스 모델로 교체
+- 소요 시간과 최대 메모리 사용량을 보고 (야간 배치용)
+'''
+
+RANDOM_STATE = 42
+CV_SPLITS = 5
+
+# 모델 입력 피처 (전처리 후 컬럼). 경기 당일 xG(h_xg, a_xg 등)는 경기 전에는 알 수 없으므로 제외
+FEATURE_COLUMNS = [
+    'HomeElo', 'AwayElo', 'elo_diff',
+    'rolling_xg_home_5', 'rolling_xg_away_5',
+    'Form3Home', 'Form5Home', 'Form3Away', 'Form5Away',
+    'GF3Home', 'GF5Home', 'GF3Away', 'GF5Away',
+    'GA3Home', 'GA5Home', 'GA3Away', 'GA5Away'
+]
+
+
+def build_training_set(collector, seasons=None):
+    """
+    이미 치른 경기로 학습 데이터(X, y, 경기 날짜)를 만듭니다.
+    피처는 예정 경기 예측과 같은 경기 전 정보(as-of)만 사용하고, 레이블은 원정팀 승리 여부입니다.
+    """
+    import feature_engine
+    from leagues import season_of
+    from model_predictor import preprocess
+
+    m = feature_engine.to_match_format(collector.long_features)
+    m['season'] = season_of(m['date'])
+    if seasons is not None:
+        m = m[m['season'].isin(seasons)]
+    m = m.sort_values(['date', 'game_id'], kind='mergesort', ignore_index=True)
+
+    fixtures = pd.DataFrame({
+        'MatchDate': m['date'].dt.date,
+        'HomeTeam': m['home_team'],
+        'AwayTeam': m['away_team']
+    })
+    X = preprocess(collector.collect_features_batch(fixtures, pre_match=True))
+    y = (m['away_goals'] > m['home_goals']).astype(int).to_numpy()
+    return X, y, m
+
+
+def make_search(n_jobs=-1, cv_splits=CV_SPLITS):
+    """후보 모델과 하이퍼파라미터 격자를 시계열 교차 검증으로 탐색하는 GridSearchCV"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    # 필요한 피처만 골라 스케일링 (그 외 컬럼은 버림) -> model_compiler로 NumPy 추론 가능한 구성
+    pipeline = Pipeline([
+        ('features', ColumnTransformer([('scale', StandardScaler(), FEATURE_COLUMNS)])),
+        ('clf', LogisticRegression(max_iter=1000))
+    ])
+    param_grid = [
+        {
+            'clf': [LogisticRegression(max_iter=1000)],
+            'clf__C': [0.01, 0.1, 1.0, 10.0]
+        },
+        {
+            'clf': [GradientBoostingClassifier(random_state=RANDOM_STATE)],
+            'clf__n_estimators': [100, 300],
+            'clf__learning_rate': [0.03, 0.1],
+            'clf__max_depth': [2, 3]
+        },
+        {
+            'clf': [RandomForestClassifier(random_state=RANDOM_STATE)],
+            'clf__n_estimators': [300],
+            'clf__max_depth': [4, 8],
+            'clf__min_samples_leaf': [5, 20]
+        }
+    ]
+    return GridSearchCV(
+        pipeline, param_grid,
+        scoring='neg_log_loss',
+        cv=TimeSeriesSplit(n_splits=cv_splits),
+        n_jobs=n_jobs,
+        refit=True
+    )
+
+
+def fit(X, y, n_jobs=-1):
+    """후보 모델을 탐색해 학습한 GridSearchCV (best_estimator_가 최적 모델)"""
+    search = make_search(n_jobs=n_jobs)
+    search.fit(X, y)
+    return search
+
+
+def _peak_memory_mb():
+    # ru_maxrss는 Linux에서 KB 단위 (종료된 자식 프로세스는 RUSAGE_CHILDREN에 집계)
+    scale = 1 / 1024 if sys.platform != 'darwin' else 1 / (1024 * 1024)
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    )
+
+
+def train(seasons=None, n_jobs=-1, elo_source=None, activate=True, league=None) -> dict:
+    """
+    학습 데이터 생성 -> 교차 검증/탐색 -> 버전 저장까지 실행합니다.
+
+    Parameters
+    ----------
+    seasons : list, optional
+        학습에 사용할 시즌 시작 연도 (없으면 전체)
+    n_jobs : int
+        joblib 병렬 작업 수 (-1 = 모든 코어)
+    elo_source : str, optional
+        HomeElo/AwayElo 출처 (없으면 서비스 기본값과 같게)
+    activate : bool
+        True면 학습한 모델을 서비스 모델(model_final.pkl)로 교체
+    league : int or str, optional
+        학습 데이터를 만들 리그 (없으면 프리미어리그)
+
+    Returns
+    -------
+    dict
+        version, best_params, cv_log_loss, 단계별 소요 시간(초), 최대 메모리(MB)
+    """
+    import sklearn
+    from data_collector_tools import DataCollector, ELO_SOURCE, FEATURE_VERSION
+    from model_registry import register_model
+
+    elo_source = elo_source or ELO_SOURCE
+    timings = {}
+    tracemalloc.start()
+    t_start = time.perf_counter()
+
+    t0 = time.perf_counter()
+    collector = DataCollector(use_snapshot=True, elo_source=elo_source, league=league)
+    X, y, matches = build_training_set(collector, seasons)
+    timings['features'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    search = fit(X, y, n_jobs=n_jobs)
+    timings['search'] = time.perf_counter() - t0
+
+    best = search.best_estimator_
+    cv = pd.DataFrame(search.cv_results_)
+    metadata = {
+        'features': [str(c) for c in X.columns],
+        'model_features': FEATURE_COLUMNS,
+        'label': 'away_win',
+        'feature_version': FEATURE_VERSION,
+        'feature_fingerprint': collector.feature_fingerprint,
+        'elo_source': elo_source,
+        'league': collector.league,
+        'training_window': [str(matches['date'].min().date()), str(matches['date'].max().date())],
+        'n_samples': int(len(y)),
+        'best_params': {k: str(v) for k, v in search.best_params_.items()},
+        'cv': {
+            'splits': CV_SPLITS,
+            'log_loss': float(-search.best_score_),
+            'log_loss_std': float(cv.loc[search.best_index_, 'std_test_score'])
+        },
+        'random_state': RANDOM_STATE,
+        'sklearn_version': sklearn.__version__,
+        'numpy_version': np.__version__
+    }
+
+    t0 = time.perf_counter()
+    version = register_model(best, metadata, activate=activate)
+    timings['save'] = time.perf_counter() - t0
+    timings['total'] = time.perf_counter() - t_start
+
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_self, rss_children = _peak_memory_mb()
+
+    return {
+        'version': version,
+        'best_params': metadata['best_params'],
+        'cv_log_loss': metadata['cv']['log_loss'],
+        'n_samples': metadata['n_samples'],
+        'n_candidates': len(cv),
+        'timings': timings,
+        'peak_rss_mb': rss_self,
+        'peak_rss_children_mb': rss_children,
+        'peak_python_alloc_mb': python_peak / (1024 * 1024)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예측 모델 학습 (models/model_final.pkl 재생성)")
+    parser.add_argument("--seasons", type=int, nargs="*", help="학습 시즌 시작 연도 (기본: 전체)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="병렬 작업 수 (기본: 모든 코어)")
+    parser.add_argument("--elo-source", choices=["local", "clubelo"])
+    parser.add_argument("--league", help="리그 ID 또는 이름 (기본: EPL)")
+    parser.add_argument("--no-activate", action="store_true", help="버전만 저장하고 서비스 모델은 그대로 둠")
+    args = parser.parse_args()
+
+    report = train(args.seasons, args.n_jobs, args.elo_source, activate=not args.no_activate, league=args.league)
+    t = report['timings']
+    print(f"모델 버전: {report['version']} ({report['n_samples']}경기, 후보 {report['n_candidates']}개)")
+    print(f"최적 파라미터: {report['best_params']}")
+    print(f"교차 검증 log loss: {report['cv_log_loss']:.4f}")
+    print(f"소요 시간: 피처 {t['features']:.1f}초, 탐색 {t['search']:.1f}초, 저장 {t['save']:.1f}초, 전체 {t['total']:.1f}초")
+    print(f"최대 메모리: 프로세스 {report['peak_rss_mb']:.0f} MB, 작업 프로세스 {report['peak_rss_children_mb']:.0f} MB, "
+          f"파이썬 할당 {report['peak_python_alloc_mb']:.0f} MB")
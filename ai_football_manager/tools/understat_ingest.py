@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from leagues import current_season
+
+'''
+Understat 경기 기록 수집 (리그/시즌 단위 파티션)
+- (리그, 시즌)마다 따로 읽어 data/understat/<리그>/<시즌>.pkl 파티션으로 저장
+- 제한된 크기의 스레드 풀에서 여러 시즌을 동시에 수집
+- 끝난 시즌은 manifest.json에 closed로 기록해 다시 읽지 않고, 갱신 시에는 진행 중인 시즌만 새로 받음
+'''
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))  # tools/ 상위 폴더 (프로젝트 루트)
+PARTITION_DIR = os.path.join(PROJECT_ROOT, "data", "understat")
+MANIFEST_PATH = os.path.join(PARTITION_DIR, "manifest.json")
+
+FIRST_SEASON = 2014
+MAX_WORKERS = 4
+
+MATCH_COLUMNS = [
+    'game_id', 'date', 'home_team', 'away_team',
+    'home_goals', 'away_goals',
+    'home_xg', 'away_xg',
+    'home_points', 'away_points'
+]
+
+_manifest_lock = threading.Lock()
+
+
+def _partition_path(league, season):
+    return os.path.join(PARTITION_DIR, league.replace(" ", "_"), f"{season}.pkl")
+
+
+def read_manifest() -> dict:
+    """{리그: {시즌: {rows, fetched_at, closed}}} (없으면 빈 딕셔너리)"""
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_manifest(league, season, entry):
+    # 여러 스레드가 동시에 파티션을 끝내므로 읽기-수정-쓰기를 잠금 안에서
+    with _manifest_lock:
+        manifest = read_manifest()
+        manifest.setdefault(league, {})[str(season)] = entry
+        tmp = f"{MANIFEST_PATH}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, MANIFEST_PATH)
+
+
+def fetch_season(league: str, season: int, no_cache: bool = False) -> pd.DataFrame:
+    """Understat에서 한 리그의 한 시즌 경기 기록을 읽음"""
+    from soccerdata import Understat
+
+    us = Understat(leagues=[league], seasons=[season], no_cache=no_cache)
+    return us.read_team_match_stats()[MATCH_COLUMNS].reset_index(drop=True)
+
+
+def _ingest_partition(league, season, no_cache, closed):
+    t0 = time.perf_counter()
+    m = fetch_season(league, season, no_cache=no_cache)
+
+    path = _partition_path(league, season)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    m.to_pickle(tmp)
+    os.replace(tmp, path)
+
+    _update_manifest(league, season, {
+        "rows": int(len(m)),
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        "closed": closed
+    })
+    return league, season, len(m), time.perf_counter() - t0
+
+
+def ingest(leagues, seasons=None, refresh: bool = False, max_workers: int = MAX_WORKERS, force: bool = False) -> list:
+    """
+    필요한 (리그, 시즌) 파티션만 병렬로 수집합니다.
+
+    - 끝난 시즌(closed): 파티션이 있으면 절대 다시 읽지 않음
+    - 진행 중인 시즌: 파티션이 없거나 refresh=True일 때만 캐시를 무시하고 새로 받음
+
+    Parameters
+    ----------
+    leagues : list
+        soccerdata 리그 이름 목록 (예: ["ENG-Premier League"])
+    seasons : iterable, optional
+        시즌 시작 연도 (없으면 FIRST_SEASON ~ 진행 중인 시즌)
+    refresh : bool
+        진행 중인 시즌을 다시 받을지 여부
+    max_workers : int
+        동시에 수집할 파티션 수
+    force : bool
+        True면 manifest와 soccerdata 캐시를 무시하고 모든 파티션을 새로 받음
+
+    Returns
+    -------
+    list
+        수집한 파티션의 (리그, 시즌, 행 수, 소요 시간) 목록
+    """
+    season_now = current_season()
+    seasons = list(seasons) if seasons is not None else list(range(FIRST_SEASON, season_now + 1))
+    manifest = read_manifest()
+
+    tasks = []
+    for league in leagues:
+        for season in seasons:
+            entry = manifest.get(league, {}).get(str(season))
+            exists = entry is not None and os.path.exists(_partition_path(league, season))
+            closed = season < season_now
+            if exists and not force and (entry.get("closed") or (not closed and not refresh)):
+                continue
+            # 진행 중인 시즌(또는 진행 중에 받아 둔 뒤 끝난 시즌)은 soccerdata 캐시도 무시하고 새로 받음
+            was_open = exists and not entry.get("closed")
+            tasks.append((league, season, force or not closed or was_open, closed))
+
+    if not tasks:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as exe:
+        futures = [exe.submit(_ingest_partition, *task) for task in tasks]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # 실패한 파티션은 기록하지 않으므로 다음 수집 때 다시 시도
+                print(f"Understat 수집 중 오류 발생: {e}")
+    return results
+
+
+def load_partitions(leagues, seasons=None) -> pd.DataFrame:
+    """저장된 파티션들을 읽어 하나의 경기 기록 프레임으로 합침 (없는 파티션은 건너뜀)"""
+    seasons = list(seasons) if seasons is not None else list(range(FIRST_SEASON, current_season() + 1))
+    frames = []
+    for league in leagues:
+        for season in seasons:
+            path = _partition_path(league, season)
+            if os.path.exists(path):
+                frames.append(pd.read_pickle(path))
+    if not frames:
+        return pd.DataFrame(columns=MATCH_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_match_stats(leagues, seasons=None, refresh: bool = False, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """필요한 파티션을 수집한 뒤 전체 경기 기록을 반환"""
+    ingest(leagues, seasons, refresh=refresh, max_workers=max_workers)
+    return load_partitions(leagues, seasons)
+
+
+if __name__ == "__main__":
+    # 순차 수집 대비 병렬 수집 시간 비교 (soccerdata 캐시 없이)
+    leagues = ["ENG-Premier League"]
+    seasons = list(range(FIRST_SEASON, current_season() + 1))
+
+    t0 = time.perf_counter()
+    for season in seasons:
+        fetch_season(leagues[0], season, no_cache=True)
+    sequential = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    done = ingest(leagues, seasons, force=True)
+    parallel = time.perf_counter() - t0
+
+    print(f"{len(seasons)}개 시즌 순차 수집: {sequential:.1f}초")
+    print(f"{len(done)}개 파티션 병렬 수집 (스레드 {MAX_WORKERS}개): {parallel:.1f}초")
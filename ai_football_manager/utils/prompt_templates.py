@@ -17,6 +17,7 @@ ROUTER_SYSTEM_PROMPT = """당신은 축구 관련 질문에 답변하는 AI 어
 - '오늘 프리미어리그 주요 소식을 알려줘.' -> 'analyze_news_tool' 도구 호출 고려
 - '5월 18일 아스널과 뉴캐슬 경기 예측해줘.' -> 'predict_match_tool' 도구 호출 고려
 - '그 경기 더 자세한 분석 부탁해' (경기 예측 후) -> 'predict_match_tool' 도구 호출 고려
+- '이번 시즌 우승 확률은 어느 팀이 제일 높아?' -> 'predict_season_tool' 도구 호출 고려
 - '안녕, 잘 지냈어?' -> 직접 자연어 응답
 - '고마워' -> 직접 자연어 응답
 """